@@ -1,15 +1,26 @@
 # API module for WeHan C端 B端API对接
-from .jobs import get_job_list, get_job_detail
-from .applications import submit_application, get_applications
-from .interviews import save_interview_report, get_interview_report
-from .resumes import save_resume_to_cloud, get_resume_from_cloud
-from .policies import get_policies
-from .conversations import (
-    save_conversation,
-    update_conversation,
-    get_user_conversations,
-    get_conversation_detail
-)
+# 各接口函数在首次访问时才加载对应子模块；自动埋点由各子模块在定义完成后自行调用 instrument_module，
+# 因此 from api.jobs import get_job_detail 与 from api import get_job_detail 拿到的都是带指标统计的版本
+from core.lazy import install_lazy
+
+_LAZY = {
+    'get_job_list': 'jobs',
+    'get_job_detail': 'jobs',
+    'submit_application': 'applications',
+    'get_applications': 'applications',
+    'save_interview_report': 'interviews',
+    'get_interview_report': 'interviews',
+    'save_resume_to_cloud': 'resumes',
+    'get_resume_from_cloud': 'resumes',
+    'get_policies': 'policies',
+    'save_conversation': 'conversations',
+    'update_conversation': 'conversations',
+    'get_user_conversations': 'conversations',
+    'get_conversation_detail': 'conversations',
+    'init_question_session': 'questions',
+    'submit_question_answer': 'questions',
+    'force_finish_question_session': 'questions'
+}
 
 __all__ = [
     'get_job_list',
@@ -24,5 +35,10 @@ __all__ = [
     'save_conversation',
     'update_conversation',
     'get_user_conversations',
-    'get_conversation_detail'
+    'get_conversation_detail',
+    'init_question_session',
+    'submit_question_answer',
+    'force_finish_question_session'
 ]
+
+install_lazy(globals(), _LAZY)
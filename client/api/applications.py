@@ -1,11 +1,20 @@
 """
 B端投递API对接
 """
-import requests
+import sys
+
 from config.settings import B_API_BASE_URL, B_API_KEY, B_API_TIMEOUT
 from core.logger import logger
 from core.exceptions import BApiCallError
+from core.circuit_breaker import circuit_breaker
+from core.scheduler import scheduled, DEFAULT
+from core.http import http, response_json
+from core.metrics import instrument_module
+from api.models import Application
+from api.responses import check_response, response_data
 
+@scheduled(DEFAULT)
+@circuit_breaker("b_api:/applications")
 def submit_application(user_id: str, job_id: str, resume_id: str = None, interview_report_id: str = None):
     """提交投递"""
     url = f"{B_API_BASE_URL}/applications"
@@ -24,24 +33,33 @@ def submit_application(user_id: str, job_id: str, resume_id: str = None, intervi
         payload["interviewReportId"] = interview_report_id
 
     try:
-        response = requests.post(url, json=payload, headers=headers, timeout=B_API_TIMEOUT)
+        response = http.post(url, json=payload, headers=headers, timeout=B_API_TIMEOUT)
         if response.status_code != 200:
             raise BApiCallError("/applications", response.status_code)
-        return response.json()
+        return check_response("POST", "/applications", response_json(response))
     except Exception as e:
         logger.error(f"提交投递失败：{e}")
         raise
 
+@scheduled(DEFAULT)
+@circuit_breaker("b_api:/applications")
 def get_applications(user_id: str):
-    """获取用户投递列表"""
+    """
+    获取用户投递列表
+    :return: Application 记录列表
+    """
     url = f"{B_API_BASE_URL}/applications"
     headers = {"X-API-Key": B_API_KEY}
 
     try:
-        response = requests.get(url, headers=headers, params={"userId": user_id}, timeout=B_API_TIMEOUT)
+        response = http.get(url, headers=headers, params={"userId": user_id}, timeout=B_API_TIMEOUT)
         if response.status_code != 200:
             raise BApiCallError("/applications", response.status_code)
-        return response.json()
+        return Application.from_list(response_data("GET", "/applications", response_json(response), []))
     except Exception as e:
         logger.error(f"获取投递列表失败：{e}")
         raise
+
+
+# 自动埋点：替换本模块公开函数（在其他模块 from-import 之前完成）
+instrument_module(sys.modules[__name__])
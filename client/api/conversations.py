@@ -1,12 +1,20 @@
 """
 B端会话管理API对接
 """
-import requests
+import sys
+
 from config.settings import B_API_BASE_URL, B_API_KEY, B_API_TIMEOUT
-from core.logger import logger
+from core.logger import logger, SAMPLED
 from core.exceptions import BApiCallError
+from core.circuit_breaker import circuit_breaker
+from core.scheduler import scheduled, BATCH, DEFAULT
+from core.http import http, response_json
+from core.metrics import instrument_module
+from api.responses import check_response, response_data
 from datetime import datetime
 
+@scheduled(BATCH)
+@circuit_breaker("b_api:/conversations")
 def save_conversation(user_id: str, conversation_id: str, title: str, status: str, session_data: dict):
     """
     存储会话数据到云端数据库（实时存储，用户每发一条消息就更新）
@@ -26,36 +34,41 @@ def save_conversation(user_id: str, conversation_id: str, title: str, status: st
     }
 
     try:
-        response = requests.post(url, json=save_data, headers=headers, timeout=B_API_TIMEOUT)
+        response = http.post(url, json=save_data, headers=headers, timeout=B_API_TIMEOUT)
         if response.status_code != 200:
             raise BApiCallError("/conversations", response.status_code)
 
-        logger.info(f"用户{user_id}会话{conversation_id}已存储")
-        return response.json()
+        payload = check_response("POST", "/conversations", response_json(response))
+        logger.info("用户%s会话%s已存储", user_id, conversation_id, extra=SAMPLED)
+        return payload
     except Exception as e:
         logger.error(f"保存会话失败：{e}")
         raise
 
-def update_conversation(user_id: str, conversation_id: str, title: str = None, status: str = None, session_data: dict = None):
-    """更新会话数据"""
-    # 先获取数据库会话ID
-    conv_list = get_user_conversations(user_id)
-    db_conv_id = None
-
-    for conv in conv_list:
-        if conv.get("conversationId") == conversation_id:
-            db_conv_id = conv.get("id")
-            break
-
-    if not db_conv_id:
-        raise Exception(f"会话{conversation_id}不存在")
-
+@circuit_breaker("b_api:/conversations/{id}")
+def _put_conversation(db_conv_id, update_data: dict):
+    """PUT /conversations/{id}（会话ID解析不计入该接口的熔断统计）"""
     url = f"{B_API_BASE_URL}/conversations/{db_conv_id}"
     headers = {
         "X-API-Key": B_API_KEY,
         "Content-Type": "application/json"
     }
 
+    response = http.put(url, json=update_data, headers=headers, timeout=B_API_TIMEOUT,
+                        endpoint="/conversations/{id}")
+    if response.status_code != 200:
+        raise BApiCallError(f"/conversations/{db_conv_id}", response.status_code)
+
+    return check_response("PUT", "/conversations/{id}", response_json(response))
+
+@scheduled(BATCH)
+def update_conversation(user_id: str, conversation_id: str, title: str = None, status: str = None, session_data: dict = None):
+    """更新会话数据"""
+    # 先获取数据库会话ID
+    db_conv_id = resolve_conversation_id(user_id, conversation_id)
+    if not db_conv_id:
+        raise Exception(f"会话{conversation_id}不存在")
+
     update_data = {}
     if title is not None:
         update_data["title"] = title
@@ -65,59 +78,75 @@ def update_conversation(user_id: str, conversation_id: str, title: str = None, s
         update_data["sessionData"] = session_data
 
     try:
-        response = requests.put(url, json=update_data, headers=headers, timeout=B_API_TIMEOUT)
-        if response.status_code != 200:
-            raise BApiCallError(f"/conversations/{db_conv_id}", response.status_code)
-
-        logger.info(f"会话{conversation_id}更新成功")
-        return response.json()
+        payload = _put_conversation(db_conv_id, update_data)
+        logger.info("会话%s更新成功", conversation_id, extra=SAMPLED)
+        return payload
     except Exception as e:
         logger.error(f"更新会话失败：{e}")
         raise
 
+@circuit_breaker("b_api:/conversations/user/{userId}")
+def _list_conversations(user_id: str):
+    """查询用户会话列表（不占调度名额，供已持有名额的函数内部调用）"""
+    url = f"{B_API_BASE_URL}/conversations/user/{user_id}"
+    headers = {"X-API-Key": B_API_KEY}
+
+    response = http.get(url, headers=headers, timeout=B_API_TIMEOUT, endpoint="/conversations/user/{userId}")
+    if response.status_code != 200:
+        raise BApiCallError(f"/conversations/user/{user_id}", response.status_code)
+
+    return response_data("GET", "/conversations/user/{userId}", response_json(response), [])
+
+@scheduled(DEFAULT)
 def get_user_conversations(user_id: str):
     """
     获取用户的所有历史会话（供用户选择恢复）
     """
-    url = f"{B_API_BASE_URL}/conversations/user/{user_id}"
-    headers = {"X-API-Key": B_API_KEY}
-
     try:
-        response = requests.get(url, headers=headers, timeout=B_API_TIMEOUT)
-        if response.status_code != 200:
-            raise BApiCallError(f"/conversations/user/{user_id}", response.status_code)
-
-        return response.json().get("data", [])
+        return _list_conversations(user_id)
     except Exception as e:
         logger.error(f"获取用户会话列表失败：{e}")
         raise
 
-def get_conversation_detail(user_id: str, conversation_id: str):
+def resolve_conversation_id(user_id: str, conversation_id: str):
     """
-    获取单个会话的完整数据（恢复会话用）
+    Coze 会话ID 转换为数据库会话ID（在调用方已占用的调度名额内查询，不再单独排队）
+    :return: 数据库会话ID，不存在时为 None
     """
-    conv_list = get_user_conversations(user_id)
-    db_conv_id = None
-
-    for conv in conv_list:
+    for conv in _list_conversations(user_id):
         if conv.get("conversationId") == conversation_id:
-            db_conv_id = conv.get("id")
-            break
-
-    if not db_conv_id:
-        return None
+            return conv.get("id")
+    return None
 
+@circuit_breaker("b_api:/conversations/{id}")
+def _fetch_conversation(user_id: str, db_conv_id):
+    """GET /conversations/{id}，会话不存在时返回 None（会话ID解析不计入该接口的熔断统计）"""
     url = f"{B_API_BASE_URL}/conversations/{db_conv_id}?userId={user_id}"
     headers = {"X-API-Key": B_API_KEY}
 
-    try:
-        response = requests.get(url, headers=headers, timeout=B_API_TIMEOUT)
-        if response.status_code == 404:
-            return None
-        if response.status_code != 200:
-            raise BApiCallError(f"/conversations/{db_conv_id}", response.status_code)
+    response = http.get(url, headers=headers, timeout=B_API_TIMEOUT, endpoint="/conversations/{id}")
+    if response.status_code == 404:
+        return None
+    if response.status_code != 200:
+        raise BApiCallError(f"/conversations/{db_conv_id}", response.status_code)
+
+    return response_data("GET", "/conversations/{id}", response_json(response), {}).get("sessionData")
+
+@scheduled(DEFAULT)
+def get_conversation_detail(user_id: str, conversation_id: str):
+    """
+    获取单个会话的完整数据（恢复会话用）
+    """
+    db_conv_id = resolve_conversation_id(user_id, conversation_id)
+    if not db_conv_id:
+        return None
 
-        return response.json().get("data", {}).get("sessionData")
+    try:
+        return _fetch_conversation(user_id, db_conv_id)
     except Exception as e:
         logger.error(f"获取会话详情失败：{e}")
         raise
+
+
+# 自动埋点：替换本模块公开函数（在其他模块 from-import 之前完成）
+instrument_module(sys.modules[__name__])
@@ -1,11 +1,20 @@
 """
 B端面试报告API对接：你需填充具体的请求逻辑
 """
-import requests
+import sys
+
 from config.settings import B_API_BASE_URL, B_API_KEY, B_API_TIMEOUT
-from core.logger import logger
+from core.logger import logger, SAMPLED
 from core.exceptions import BApiCallError
+from core.circuit_breaker import circuit_breaker
+from core.scheduler import scheduled, BATCH, DEFAULT
+from core.http import http, response_json
+from core.metrics import instrument_module
+from api.models import InterviewReport
+from api.responses import check_response, response_data
 
+@scheduled(BATCH)
+@circuit_breaker("b_api:/interviews")
 def save_interview_report(report_data: dict):
     """保存面试报告"""
     url = f"{B_API_BASE_URL}/interviews"
@@ -15,7 +24,7 @@ def save_interview_report(report_data: dict):
     }
 
     try:
-        response = requests.post(
+        response = http.post(
             url,
             json=report_data,
             headers=headers,
@@ -23,22 +32,32 @@ def save_interview_report(report_data: dict):
         )
         if response.status_code != 200:
             raise BApiCallError("/interviews", response.status_code)
-        logger.info("面试报告保存成功")
-        return response.json()
+        payload = check_response("POST", "/interviews", response_json(response))
+        logger.info("面试报告保存成功", extra=SAMPLED)
+        return payload
     except Exception as e:
         logger.error(f"保存面试报告失败：{e}")
         raise
 
+@scheduled(DEFAULT)
+@circuit_breaker("b_api:/interviews/{id}")
 def get_interview_report(report_id: str):
-    """获取面试报告"""
+    """
+    获取面试报告
+    :return: InterviewReport 记录
+    """
     url = f"{B_API_BASE_URL}/interviews/{report_id}"
     headers = {"X-API-Key": B_API_KEY}
 
     try:
-        response = requests.get(url, headers=headers, timeout=B_API_TIMEOUT)
+        response = http.get(url, headers=headers, timeout=B_API_TIMEOUT, endpoint="/interviews/{id}")
         if response.status_code != 200:
             raise BApiCallError(f"/interviews/{report_id}", response.status_code)
-        return response.json()
+        return InterviewReport.from_dict(response_data("GET", "/interviews/{id}", response_json(response), {}))
     except Exception as e:
         logger.error(f"获取面试报告{report_id}失败：{e}")
         raise
+
+
+# 自动埋点：替换本模块公开函数（在其他模块 from-import 之前完成）
+instrument_module(sys.modules[__name__])
@@ -1,13 +1,25 @@
 """
 B端岗位API对接：你需填充具体的请求逻辑
 """
-import requests
+import sys
+
 from config.settings import B_API_BASE_URL, B_API_KEY, B_API_TIMEOUT
 from core.logger import logger
 from core.exceptions import BApiCallError
+from core.circuit_breaker import circuit_breaker
+from core.scheduler import scheduled, DEFAULT
+from core.http import http, response_json
+from core.metrics import instrument_module
+from api.models import Job
+from api.responses import response_data
 
+@scheduled(DEFAULT)
+@circuit_breaker("b_api:/jobs")
 def get_job_list(keyword: str = None, industry: str = None, location: str = "武汉", limit: int = 10):
-    """获取岗位列表"""
+    """
+    获取岗位列表
+    :return: Job 记录列表
+    """
     url = f"{B_API_BASE_URL}/jobs"
     headers = {"X-API-Key": B_API_KEY}  # 使用 X-API-Key 认证
 
@@ -20,24 +32,33 @@ def get_job_list(keyword: str = None, industry: str = None, location: str = "武
         params["location"] = location
 
     try:
-        response = requests.get(url, headers=headers, params=params, timeout=B_API_TIMEOUT)
+        response = http.get(url, headers=headers, params=params, timeout=B_API_TIMEOUT)
         if response.status_code != 200:
             raise BApiCallError("/jobs", response.status_code)
-        return response.json()
+        return Job.from_list(response_data("GET", "/jobs", response_json(response), []))
     except Exception as e:
         logger.error(f"获取岗位列表失败：{e}")
         raise
 
+@scheduled(DEFAULT)
+@circuit_breaker("b_api:/jobs/{id}")
 def get_job_detail(job_id: str):
-    """获取岗位详情"""
+    """
+    获取岗位详情
+    :return: Job 记录
+    """
     url = f"{B_API_BASE_URL}/jobs/{job_id}"
     headers = {"X-API-Key": B_API_KEY}
 
     try:
-        response = requests.get(url, headers=headers, timeout=B_API_TIMEOUT)
+        response = http.get(url, headers=headers, timeout=B_API_TIMEOUT, endpoint="/jobs/{id}")
         if response.status_code != 200:
             raise BApiCallError(f"/jobs/{job_id}", response.status_code)
-        return response.json()
+        return Job.from_dict(response_data("GET", "/jobs/{id}", response_json(response), {}))
     except Exception as e:
         logger.error(f"获取岗位{job_id}详情失败：{e}")
         raise
+
+
+# 自动埋点：替换本模块公开函数（在其他模块 from-import 之前完成）
+instrument_module(sys.modules[__name__])
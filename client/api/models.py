@@ -0,0 +1,191 @@
+"""
+B端接口数据记录：岗位、企业、政策、投递、面试报告使用 __slots__ 紧凑记录类代替原始字典
+
+- 属性名为 Python 风格（salary_min），from_dict 负责与 B端 JSON 字段（salaryMin）的映射；
+  from_dict 按字段表生成专用构造函数（与 dataclasses 相同的做法），避免逐字段 setattr 循环
+- 取值集合很小的字段（行业、地点、状态等，见 _INTERN）构造时驻留字符串，上万条记录共享同一个字符串对象
+- 无损往返：B端未返回的字段记在“缺失字段集合”中（同一接口的记录共享同一个集合对象），
+  未声明的字段原样保存在 _extra 中，to_dict 还原出与原始 JSON 相等的字典
+"""
+import sys
+
+# 缺失字段集合驻留表：相同的缺失集合只保留一个对象，记录中只存引用
+_absent_sets = {}
+_NONE_ABSENT = frozenset()
+
+
+def _intern_absent(absent: frozenset) -> frozenset:
+    return _absent_sets.setdefault(absent, absent) if absent else _NONE_ABSENT
+
+
+def _compile_from_dict(cls):
+    """按 _FIELDS / _NESTED 生成 cls 的 JSON 构造函数"""
+    lines = ["def from_dict(data):", "    record = new(cls)", "    get = data.get"]
+    for attr, key in cls._FIELDS:
+        nested = cls._NESTED.get(attr)
+        if attr in cls._INTERN:
+            lines.append(f"    value = get({key!r})")
+            lines.append(f"    record.{attr} = intern(value) if type(value) is str else value")
+        elif nested is None:
+            lines.append(f"    record.{attr} = get({key!r})")
+        else:
+            lines.append(f"    value = get({key!r})")
+            lines.append(f"    record.{attr} = None if value is None else nested_{attr}(value)")
+    lines += [
+        "    absent = KEYS.difference(data)",
+        "    record._absent = intern_absent(absent)",
+        # 字段数 + 缺失数 != 声明字段数，说明带有未声明字段
+        "    record._extra = {k: data[k] for k in data.keys() - KEYS} if len(data) + len(absent) != N else None",
+        "    return record"
+    ]
+    namespace = {"new": object.__new__, "cls": cls, "KEYS": cls._KEYS, "N": len(cls._KEYS),
+                 "intern_absent": _intern_absent, "intern": sys.intern}
+    for attr, nested in cls._NESTED.items():
+        namespace[f"nested_{attr}"] = nested.from_dict
+    exec("\n".join(lines), namespace)
+    return namespace["from_dict"]
+
+
+class _Record:
+    """
+    紧凑记录基类：子类以 _FIELDS 声明 (属性名, JSON 字段名)，_NESTED 声明嵌套记录类型 {属性名: 记录类}，
+    _INTERN 声明需要驻留字符串的属性
+    """
+    __slots__ = ("_absent", "_extra")
+    _FIELDS = ()
+    _NESTED = {}
+    _INTERN = ()
+    _KEYS = frozenset()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._KEYS = frozenset(key for _, key in cls._FIELDS)
+        cls._build = staticmethod(_compile_from_dict(cls))
+
+    def __init__(self, **kwargs):
+        for attr, _ in self._FIELDS:
+            setattr(self, attr, kwargs.get(attr))
+        self._absent = _intern_absent(frozenset(key for attr, key in self._FIELDS if attr not in kwargs))
+        self._extra = None
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """
+        由 B端 JSON 对象构造记录
+        :param data: B端返回的对象（缺失字段的属性为 None）
+        """
+        return cls._build(data)
+
+    @classmethod
+    def from_list(cls, items: list) -> list:
+        """由 B端 JSON 数组构造记录列表"""
+        build = cls._build
+        return [build(item) for item in items or ()]
+
+    def to_dict(self) -> dict:
+        """还原为 B端字段名的字典（与构造时的 JSON 对象相等）"""
+        absent = self._absent
+        data = {}
+        for attr, key in self._FIELDS:
+            if key not in absent:
+                value = getattr(self, attr)
+                data[key] = value.to_dict() if attr in self._NESTED and value is not None else value
+        if self._extra:
+            data.update(self._extra)
+        return data
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"{type(self).__name__}(id={getattr(self, 'id', None)!r})"
+
+
+class Enterprise(_Record):
+    """招聘企业"""
+    __slots__ = ("id", "name", "industry", "logo")
+    _FIELDS = (("id", "id"), ("name", "name"), ("industry", "industry"), ("logo", "logo"))
+    _INTERN = ("id", "name", "industry", "logo")
+
+
+class Job(_Record):
+    """
+    岗位（列表与详情共用；详情接口以 responsibilities 返回岗位描述，构造时同时填入 description）
+    """
+    __slots__ = ("id", "title", "industry", "category", "salary_min", "salary_max", "location", "address",
+                 "description", "responsibilities", "requirements", "benefits", "skills", "education_level",
+                 "experience_years", "fresh_graduate", "headcount", "published_at", "enterprise")
+    _FIELDS = (
+        ("id", "id"), ("title", "title"), ("industry", "industry"), ("category", "category"),
+        ("salary_min", "salaryMin"), ("salary_max", "salaryMax"), ("location", "location"), ("address", "address"),
+        ("description", "description"), ("responsibilities", "responsibilities"), ("requirements", "requirements"),
+        ("benefits", "benefits"), ("skills", "skills"), ("education_level", "educationLevel"),
+        ("experience_years", "experienceYears"), ("fresh_graduate", "freshGraduate"), ("headcount", "headcount"),
+        ("published_at", "publishedAt"), ("enterprise", "enterprise")
+    )
+    _NESTED = {"enterprise": Enterprise}
+    _INTERN = ("industry", "category", "location", "education_level")
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        job = cls._build(data)
+        if job.description is None and "description" in job._absent:
+            job.description = job.responsibilities
+        return job
+
+    @classmethod
+    def from_list(cls, items: list) -> list:
+        return [cls.from_dict(item) for item in items or ()]
+
+    @property
+    def company(self):
+        """企业名称"""
+        return self.enterprise.name if self.enterprise is not None else None
+
+
+class Policy(_Record):
+    """人才政策"""
+    __slots__ = ("id", "title", "category", "summary", "content", "conditions", "benefits",
+                 "effective_date", "expiry_date", "created_at")
+    _FIELDS = (
+        ("id", "id"), ("title", "title"), ("category", "category"), ("summary", "summary"), ("content", "content"),
+        ("conditions", "conditions"), ("benefits", "benefits"), ("effective_date", "effectiveDate"),
+        ("expiry_date", "expiryDate"), ("created_at", "createdAt")
+    )
+    _INTERN = ("category",)
+
+
+class JobBrief(_Record):
+    """投递、面试报告中附带的岗位摘要"""
+    __slots__ = ("id", "title", "company", "location", "salary_min", "salary_max")
+    _FIELDS = (
+        ("id", "id"), ("title", "title"), ("company", "company"), ("location", "location"),
+        ("salary_min", "salaryMin"), ("salary_max", "salaryMax")
+    )
+    _INTERN = ("company", "location")
+
+
+class Application(_Record):
+    """岗位投递"""
+    __slots__ = ("id", "job", "status", "created_at", "updated_at")
+    _FIELDS = (("id", "id"), ("job", "job"), ("status", "status"), ("created_at", "createdAt"),
+               ("updated_at", "updatedAt"))
+    _NESTED = {"job": JobBrief}
+    _INTERN = ("status",)
+
+
+class InterviewReport(_Record):
+    """面试报告（题目、回答、维度评分等 JSON 字段原样保存）"""
+    __slots__ = ("id", "job", "outline", "current_index", "answers", "total_score", "dimensions", "highlights",
+                 "improvements", "suggestions", "audio_url", "duration", "status", "created_at", "completed_at")
+    _FIELDS = (
+        ("id", "id"), ("job", "job"), ("outline", "outline"), ("current_index", "currentIndex"),
+        ("answers", "answers"), ("total_score", "totalScore"), ("dimensions", "dimensions"),
+        ("highlights", "highlights"), ("improvements", "improvements"), ("suggestions", "suggestions"),
+        ("audio_url", "audioUrl"), ("duration", "duration"), ("status", "status"), ("created_at", "createdAt"),
+        ("completed_at", "completedAt")
+    )
+    _NESTED = {"job": JobBrief}
+    _INTERN = ("status",)
@@ -1,13 +1,25 @@
 """
 B端政策API对接
 """
-import requests
+import sys
+
 from config.settings import B_API_BASE_URL, B_API_KEY, B_API_TIMEOUT
 from core.logger import logger
 from core.exceptions import BApiCallError
+from core.circuit_breaker import circuit_breaker
+from core.scheduler import scheduled, DEFAULT
+from core.http import http, response_json
+from core.metrics import instrument_module
+from api.models import Policy
+from api.responses import response_data
 
+@scheduled(DEFAULT)
+@circuit_breaker("b_api:/policies")
 def get_policies(category: str = None, limit: int = 10):
-    """获取政策列表"""
+    """
+    获取政策列表
+    :return: Policy 记录列表
+    """
     url = f"{B_API_BASE_URL}/policies"
     headers = {"X-API-Key": B_API_KEY}
 
@@ -16,10 +28,14 @@ def get_policies(category: str = None, limit: int = 10):
         params["category"] = category
 
     try:
-        response = requests.get(url, headers=headers, params=params, timeout=B_API_TIMEOUT)
+        response = http.get(url, headers=headers, params=params, timeout=B_API_TIMEOUT)
         if response.status_code != 200:
             raise BApiCallError("/policies", response.status_code)
-        return response.json()
+        return Policy.from_list(response_data("GET", "/policies", response_json(response), []))
     except Exception as e:
         logger.error(f"获取政策列表失败：{e}")
         raise
+
+
+# 自动埋点：替换本模块公开函数（在其他模块 from-import 之前完成）
+instrument_module(sys.modules[__name__])
@@ -0,0 +1,76 @@
+"""
+B端多轮问询接口对接（/api/coze/question，openapi/question_plugin.yaml）：进程内问询控制器把内存会话快照同步到B端时使用
+"""
+import sys
+
+from config.settings import QUESTION_API_BASE_URL, B_API_KEY, B_API_TIMEOUT
+from core.logger import logger
+from core.exceptions import BApiCallError
+from core.circuit_breaker import circuit_breaker
+from core.scheduler import scheduled, BATCH
+from core.http import http, response_json
+from core.metrics import instrument_module
+
+
+def _post(path: str, payload: dict) -> dict:
+    """调用问询接口，返回 data（状态码非 200 时抛出 BApiCallError）"""
+    headers = {
+        "X-API-Key": B_API_KEY,
+        "Content-Type": "application/json"
+    }
+    response = http.post(f"{QUESTION_API_BASE_URL}{path}", json=payload, headers=headers, timeout=B_API_TIMEOUT,
+                         endpoint=f"/question{path}")
+    if response.status_code != 200:
+        raise BApiCallError(f"/question{path}", response.status_code)
+    return response_json(response).get("data")
+
+
+@scheduled(BATCH)
+@circuit_breaker("b_api:/question/init")
+def init_question_session(session_id: str, questions: list):
+    """
+    初始化（或重置）问询会话
+    :param session_id: Coze 会话ID
+    :param questions: 问题数组
+    :return: 首题信息（current_question / current_idx / is_finish / total_questions）
+    """
+    try:
+        return _post("/init", {"session_id": session_id, "questions": questions})
+    except Exception as e:
+        logger.error(f"初始化问询会话{session_id}失败：{e}")
+        raise
+
+
+@scheduled(BATCH)
+@circuit_breaker("b_api:/question/next")
+def submit_question_answer(session_id: str, answer: str):
+    """
+    记录一条回答
+    :param session_id: Coze 会话ID
+    :param answer: 用户回答
+    :return: 下一题信息，或全部完成时的 questions / answers
+    """
+    try:
+        return _post("/next", {"session_id": session_id, "answer": answer})
+    except Exception as e:
+        logger.error(f"同步问询回答失败：{session_id}，{e}")
+        raise
+
+
+@scheduled(BATCH)
+@circuit_breaker("b_api:/question/force-finish")
+def force_finish_question_session(session_id: str):
+    """
+    强制结束问询会话
+    :param session_id: Coze 会话ID
+    :return: 已完成与未完成的题目
+    """
+    try:
+        return _post("/force-finish", {"session_id": session_id})
+    except Exception as e:
+        logger.error(f"强制结束问询会话{session_id}失败：{e}")
+        raise
+
+
+# 自动埋点：替换本模块公开函数（在其他模块 from-import 之前完成）
+instrument_module(sys.modules[__name__])
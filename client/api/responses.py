@@ -0,0 +1,91 @@
+"""
+B端接口响应校验：各 /api/open/* 接口的响应 Schema 位于 config/schema/b_api
+
+- 快速路径：检查 success/data 外层结构（几次字典查找），B端返回 success=false 或缺少 data 时
+  立即抛出 BApiEnvelopeError（可重试），而不是把残缺数据交给调用方
+- 校验按 B_API_VALIDATE 配置：off 不做任何校验（包括外层结构） / sample 按 B_API_VALIDATE_SAMPLE_RATE 抽样校验，
+  不合格时记录日志与指标 / strict 每次校验，不合格时抛出 BApiResponseError
+- 读取 data 统一用 response_data()：off 模式不检查外层结构，缺少 data 时返回调用方给定的空值而不是抛出 KeyError
+- 完整校验复用 core.schema_validate 缓存的预编译校验器，jsonschema 在第一次需要校验时才导入
+"""
+import os
+import random
+
+from config.settings import PROJECT_ROOT, B_API_VALIDATE, B_API_VALIDATE_SAMPLE_RATE
+from core.logger import logger
+from core.exceptions import BApiEnvelopeError, BApiResponseError
+from core.metrics import counter
+
+if B_API_VALIDATE not in ("off", "sample", "strict"):
+    raise ValueError(f"未知的 B_API_VALIDATE：{B_API_VALIDATE}（可选 off / sample / strict）")
+
+SCHEMA_DIR = os.path.join(PROJECT_ROOT, "config", "schema", "b_api")
+
+# (方法, 接口模板) -> Schema 文件
+RESPONSE_SCHEMAS = {
+    ("GET", "/jobs"): "jobs_list.json",
+    ("GET", "/jobs/{id}"): "job_detail.json",
+    ("GET", "/policies"): "policies_list.json",
+    ("GET", "/resumes/{userId}"): "resume_detail.json",
+    ("POST", "/resumes"): "write_result.json",
+    ("GET", "/applications"): "applications_list.json",
+    ("POST", "/applications"): "write_result.json",
+    ("GET", "/interviews/{id}"): "interview_detail.json",
+    ("POST", "/interviews"): "write_result.json",
+    ("GET", "/conversations/user/{userId}"): "conversations_list.json",
+    ("GET", "/conversations/{id}"): "conversation_detail.json",
+    ("POST", "/conversations"): "write_result.json",
+    ("PUT", "/conversations/{id}"): "write_result.json"
+}
+
+VALIDATIONS = counter("wehan_b_api_validations_total", "B端响应完整 Schema 校验次数（按结果）", ("endpoint", "result"))
+
+
+def schema_path(method: str, endpoint: str) -> str:
+    """接口对应的响应 Schema 文件路径"""
+    return os.path.join(SCHEMA_DIR, RESPONSE_SCHEMAS[(method, endpoint)])
+
+
+def _should_validate(mode: str) -> bool:
+    if mode == "strict":
+        return True
+    return mode == "sample" and random.random() < B_API_VALIDATE_SAMPLE_RATE
+
+
+def check_response(method: str, endpoint: str, payload, mode: str = B_API_VALIDATE):
+    """
+    校验B端接口响应
+    :param method: 请求方法
+    :param endpoint: 接口模板（如 /jobs/{id}）
+    :param payload: 解析后的响应 JSON
+    :param mode: 校验模式（off / sample / strict）
+    :return: 原样返回 payload
+    """
+    if mode == "off":
+        return payload
+    if not isinstance(payload, dict) or payload.get("success") is not True or "data" not in payload:
+        raise BApiEnvelopeError(endpoint, payload.get("error") if isinstance(payload, dict) else None)
+
+    if not _should_validate(mode):
+        return payload
+
+    from core.schema_validate import validate_instance
+    errors = validate_instance(payload, schema_path(method, endpoint), all_errors=True)
+    VALIDATIONS.labels(endpoint, "invalid" if errors else "valid").inc()
+    if errors:
+        if mode == "strict":
+            raise BApiResponseError(endpoint, errors)
+        logger.warning(f"B端响应不符合 Schema：{method} {endpoint}，{'；'.join(errors)}")
+    return payload
+
+
+def response_data(method: str, endpoint: str, payload, default=None, mode: str = B_API_VALIDATE):
+    """
+    校验B端接口响应并取出 data
+    :param default: 响应缺少 data 时的返回值（仅 off 模式会出现，其余模式已由外层结构检查拦截）
+    :return: payload["data"]
+    """
+    payload = check_response(method, endpoint, payload, mode)
+    if not isinstance(payload, dict) or "data" not in payload:
+        return default
+    return payload["data"]
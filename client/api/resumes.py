@@ -1,11 +1,19 @@
 """
 B端简历API对接
 """
-import requests
+import sys
+
 from config.settings import B_API_BASE_URL, B_API_KEY, B_API_TIMEOUT
-from core.logger import logger
+from core.logger import logger, SAMPLED
 from core.exceptions import BApiCallError
+from core.circuit_breaker import circuit_breaker
+from core.scheduler import scheduled, BATCH, DEFAULT
+from core.http import http, response_json
+from core.metrics import instrument_module
+from api.responses import check_response, response_data
 
+@scheduled(BATCH)
+@circuit_breaker("b_api:/resumes")
 def save_resume_to_cloud(user_id: str, resume_text: str, structured_data: dict = None, file_id: str = None):
     """将解析后的简历同步到云端数据库（B端）"""
     url = f"{B_API_BASE_URL}/resumes"
@@ -24,29 +32,36 @@ def save_resume_to_cloud(user_id: str, resume_text: str, structured_data: dict =
         payload["fileId"] = file_id
 
     try:
-        response = requests.post(url, json=payload, headers=headers, timeout=B_API_TIMEOUT)
+        response = http.post(url, json=payload, headers=headers, timeout=B_API_TIMEOUT)
         if response.status_code != 200:
             raise BApiCallError("/resumes", response.status_code)
 
-        logger.info(f"用户{user_id}简历已同步到云端数据库")
-        return response.json()
+        payload = check_response("POST", "/resumes", response_json(response))
+        logger.info("用户%s简历已同步到云端数据库", user_id, extra=SAMPLED)
+        return payload
     except Exception as e:
         logger.error(f"保存简历失败：{e}")
         raise
 
+@scheduled(DEFAULT)
+@circuit_breaker("b_api:/resumes/{userId}")
 def get_resume_from_cloud(user_id: str):
     """从云端数据库获取用户的简历信息"""
     url = f"{B_API_BASE_URL}/resumes/{user_id}"
     headers = {"X-API-Key": B_API_KEY}
 
     try:
-        response = requests.get(url, headers=headers, timeout=B_API_TIMEOUT)
+        response = http.get(url, headers=headers, timeout=B_API_TIMEOUT, endpoint="/resumes/{userId}")
         if response.status_code == 404:
             return None
         if response.status_code != 200:
             raise BApiCallError(f"/resumes/{user_id}", response.status_code)
 
-        return response.json().get("data")
+        return response_data("GET", "/resumes/{userId}", response_json(response))
     except Exception as e:
         logger.error(f"获取简历失败：{e}")
         raise
+
+
+# 自动埋点：替换本模块公开函数（在其他模块 from-import 之前完成）
+instrument_module(sys.modules[__name__])
@@ -0,0 +1 @@
+# Benchmarks for WeHan C端
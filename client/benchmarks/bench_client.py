@@ -0,0 +1,175 @@
+"""
+客户端热路径微基准：SSE 解析、大会话数据 JSON 编解码、重试/缓存包装开销、会话ID 解析、语音帧编码、
+B端响应校验（默认抽样 / 完整 Schema 校验）与岗位记录构造
+（会话ID 解析使用本地 B 端替身服务，不访问外网）
+
+运行：python benchmarks/bench_client.py
+"""
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+N_SSE_EVENTS = 5_000
+N_MESSAGES = 500
+N_CONVERSATIONS = 200
+N_OPS = 100_000
+# 24kHz / 16bit / 单声道下 20ms 的 PCM 帧
+FRAME_BYTES = 960
+N_JOBS = 20
+
+
+def _per_op_us(func, n: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        func()
+    return (time.perf_counter() - start) / n * 1e6
+
+
+class _FakeStreamResponse:
+    """按行回放的流式响应"""
+
+    def __init__(self, lines: list):
+        self._lines = lines
+
+    def iter_lines(self):
+        return iter(self._lines)
+
+
+def _sse_lines(n_events: int) -> list:
+    lines = []
+    for i in range(n_events):
+        data = {"id": "chat_1", "conversation_id": "conv_1", "role": "assistant", "type": "answer",
+                "content": f"第{i}段回答内容", "content_type": "text"}
+        lines += [b"event:conversation.message.delta",
+                  f"data:{json.dumps(data, ensure_ascii=False)}".encode("utf-8"), b""]
+    return lines + [b"event:done", b'data:"[DONE]"', b""]
+
+
+def _session_data(n_messages: int) -> dict:
+    return {
+        "type": "interview",
+        "jobId": "cmm52v1jc00003wuj5mlubj3u",
+        "messages": [
+            {"role": "user" if i % 2 else "assistant",
+             "content": f"第{i}轮：请结合你在项目中负责的模块，说明遇到的性能问题以及排查和优化过程。" * 2,
+             "timestamp": 1_700_000_000 + i}
+            for i in range(n_messages)
+        ],
+        "workflowStatus": {"currentStep": "voice_interview", "completedQuestions": list(range(20))}
+    }
+
+
+def _jobs_payload(n_jobs: int) -> dict:
+    """GET /jobs 的典型响应"""
+    return {"success": True, "meta": {"page": 1, "pageSize": n_jobs, "total": n_jobs}, "data": [
+        {"id": f"job_{i}", "title": "Java 后端开发工程师", "industry": "互联网", "category": "技术",
+         "salaryMin": 8000, "salaryMax": 15000, "location": "武汉", "description": "负责核心业务系统开发" * 5,
+         "requirements": "熟悉 Java、Spring Boot、MySQL", "benefits": "五险一金", "skills": ["Java", "MySQL"],
+         "educationLevel": "本科", "experienceYears": 1, "freshGraduate": True, "headcount": 3,
+         "publishedAt": "2026-03-01T00:00:00.000Z",
+         "enterprise": {"id": "ent_1", "name": "光谷科技", "industry": "互联网"}}
+        for i in range(n_jobs)
+    ]}
+
+
+def _start_b_stand_in(n_conversations: int):
+    """本地 B 端替身：/conversations/user/{userId} 返回 n 条会话"""
+    payload = json.dumps({"success": True, "data": [
+        {"id": f"db_{i}", "conversationId": f"coze_conv_{i}", "title": f"会话{i}", "status": "active"}
+        for i in range(n_conversations)
+    ]}).encode("utf-8")
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        wbufsize = 64 * 1024
+
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run() -> dict:
+    """
+    执行基准测试
+    :return: 指标字典
+    """
+    stand_in = _start_b_stand_in(N_CONVERSATIONS)
+    # 客户端模块在导入时读取配置，需先设置环境变量
+    os.environ["B_API_BASE_URL"] = f"http://127.0.0.1:{stand_in.server_address[1]}/api/open"
+    from coze.agent import CozeAgent
+    from coze.voice import CozeRealtimeVoice
+    from core.retry import retry
+    from core.cache import TTLCache
+    from api.conversations import resolve_conversation_id
+    from api.responses import check_response
+    from api.models import Job
+
+    results = {}
+
+    # SSE 解析（每个事件）
+    agent, lines = CozeAgent("bench_bot"), _sse_lines(N_SSE_EVENTS)
+    start = time.perf_counter()
+    for _ in agent._parse_stream_response(_FakeStreamResponse(lines)):
+        pass
+    results["sse_parse_per_event_us"] = (time.perf_counter() - start) / N_SSE_EVENTS * 1e6
+
+    # 大会话数据 JSON 编解码
+    session_data = _session_data(N_MESSAGES)
+    encoded = json.dumps(session_data, ensure_ascii=False)
+    results["session_json_encode_ms"] = _per_op_us(lambda: json.dumps(session_data, ensure_ascii=False), 50) / 1000
+    results["session_json_decode_ms"] = _per_op_us(lambda: json.loads(encoded), 50) / 1000
+    results["session_json_kb"] = len(encoded.encode("utf-8")) / 1024
+
+    # 重试装饰器（无异常路径）相对直接调用的额外开销
+    def noop():
+        return None
+
+    retried = retry(max_retries=3, delay=0)(noop)
+    results["retry_overhead_us"] = _per_op_us(retried, N_OPS) - _per_op_us(noop, N_OPS)
+
+    # 内存缓存读写
+    cache = TTLCache(ttl=60)
+    cache.set("bots:1", {"items": list(range(20))}, etag='"v1"')
+    results["cache_get_us"] = _per_op_us(lambda: cache.get("bots:1"), N_OPS)
+    results["cache_set_us"] = _per_op_us(lambda: cache.set("bots:1", {"items": []}), N_OPS)
+
+    # 会话ID 解析（拉取会话列表 + 查找，查找最后一条）
+    resolve_conversation_id("bench_user", f"coze_conv_{N_CONVERSATIONS - 1}")
+    results["conversation_resolve_ms"] = _per_op_us(
+        lambda: resolve_conversation_id("bench_user", f"coze_conv_{N_CONVERSATIONS - 1}"), 200) / 1000
+    stand_in.shutdown()
+
+    # 语音帧编码
+    frame = os.urandom(FRAME_BYTES)
+    results["voice_frame_encode_us"] = _per_op_us(lambda: CozeRealtimeVoice.encode_audio_frame(frame), N_OPS)
+
+    # B端响应校验与记录构造（岗位列表，每个响应）
+    jobs = _jobs_payload(N_JOBS)
+    check_response("GET", "/jobs", jobs, mode="strict")
+    # 默认抽样模式：外层结构检查 + 按 B_API_VALIDATE_SAMPLE_RATE 抽中的完整校验（摊销）
+    results["b_api_check_sample_us"] = _per_op_us(lambda: check_response("GET", "/jobs", jobs, mode="sample"), 2000)
+    results["b_api_check_strict_us"] = _per_op_us(lambda: check_response("GET", "/jobs", jobs, mode="strict"), 500)
+    results["job_records_build_us"] = _per_op_us(lambda: Job.from_list(jobs["data"]), 5000)
+
+    return {key: round(value, 4) for key, value in results.items()}
+
+
+if __name__ == "__main__":
+    print("客户端热路径微基准")
+    for key, value in run().items():
+        print(f"  {key}: {value}")
@@ -0,0 +1,80 @@
+"""
+Coze 客户端端到端基准测试（本地模拟服务，不访问外网）：对话首包 / 完整流式耗时、工作流与知识库检索耗时，
+以及客户端各层（重试、调度、限流、熔断、埋点、HTTP 会话）相对模拟服务固定延迟的额外开销
+
+运行：python benchmarks/bench_coze_mock.py [次数]
+"""
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.mock_coze_server import MockCozeServer
+
+N_CALLS = 20
+PROFILE = {"default": {"latency_ms": 10, "jitter_ms": 0, "ttft_ms": 50, "tokens_per_sec": 2000, "tokens": 40}}
+
+
+def _median(values: list) -> float:
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def run(n_calls: int = N_CALLS) -> dict:
+    """
+    执行基准测试
+    :param n_calls: 每个接口的调用次数
+    :return: 指标字典（毫秒，取中位数）
+    """
+    server = MockCozeServer(PROFILE, http_port=0, ws_port=0)
+    api_base, ws_base = server.start()
+    # 客户端模块在导入时读取配置，需先设置环境变量；放开客户端限流，只测各层自身开销
+    os.environ["COZE_API_BASE"], os.environ["COZE_WS_BASE"] = api_base, ws_base
+    os.environ["COZE_RATE_LIMITS"] = "*=10000:10000"
+    from coze.agent import CozeAgent
+    from coze.workflow import CozeWorkflow
+    from coze.knowledge import CozeKnowledge
+
+    agent, workflow, knowledge = CozeAgent("bench_bot"), CozeWorkflow(), CozeKnowledge()
+    conf = PROFILE["default"]
+    ttft, stream_total, workflow_ms, search_ms = [], [], [], []
+    try:
+        for i in range(n_calls):
+            start = time.perf_counter()
+            first = None
+            for event in agent.send_message(f"bench_user_{i}", "你好"):
+                if first is None and event["event"] == "conversation.message.delta":
+                    first = time.perf_counter()
+            ttft.append((first - start) * 1000)
+            stream_total.append((time.perf_counter() - start) * 1000)
+
+            start = time.perf_counter()
+            workflow.run_interview_workflow("job_1", f"bench_user_{i}", "bench_workflow")
+            workflow_ms.append((time.perf_counter() - start) * 1000)
+
+            start = time.perf_counter()
+            knowledge.search("bench_knowledge", "Java 后端")
+            search_ms.append((time.perf_counter() - start) * 1000)
+    finally:
+        server.stop()
+
+    stream_floor = conf["latency_ms"] + conf["ttft_ms"] + conf["tokens"] / conf["tokens_per_sec"] * 1000
+    results = {
+        "coze_chat_ttft_ms": _median(ttft),
+        "coze_chat_ttft_overhead_ms": _median(ttft) - conf["latency_ms"] - conf["ttft_ms"],
+        "coze_chat_stream_ms": _median(stream_total),
+        "coze_chat_stream_overhead_ms": _median(stream_total) - stream_floor,
+        "coze_workflow_run_ms": _median(workflow_ms),
+        "coze_workflow_overhead_ms": _median(workflow_ms) - conf["latency_ms"],
+        "coze_knowledge_search_ms": _median(search_ms),
+        "coze_knowledge_overhead_ms": _median(search_ms) - conf["latency_ms"]
+    }
+    return {key: round(value, 3) for key, value in results.items()}
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else N_CALLS
+    print(f"Coze 客户端基准测试（本地模拟服务，每个接口 {n} 次）")
+    for key, value in run(n).items():
+        print(f"  {key}: {value}")
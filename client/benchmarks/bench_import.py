@@ -0,0 +1,78 @@
+"""
+导入耗时基准：在全新子进程中用 python -X importtime 统计各入口的累计导入耗时（不含解释器自身启动），
+并检查轻量入口不会连带加载重型依赖（jsonschema / websockets 等）
+
+运行：python benchmarks/bench_import.py [次数]
+"""
+import os
+import subprocess
+import sys
+
+CLIENT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(CLIENT_DIR)
+
+N_RUNS = 5
+# 指标名前缀 -> 导入语句
+TARGETS = {
+    "import_core": "import core",
+    "import_core_exceptions": "from core.exceptions import BApiCallError",
+    "import_core_logger": "from core.logger import logger",
+    "import_api": "import api",
+    "import_api_policies": "from api.policies import get_policies",
+    "import_coze": "import coze",
+    "import_coze_agent": "from coze.agent import CozeAgent",
+    "import_coze_voice": "from coze.voice import CozeRealtimeVoice"
+}
+# 只在真正用到时才应加载的重型依赖
+HEAVY_MODULES = ("jsonschema", "websockets", "http.server", "logging.handlers")
+
+
+def _import_time_ms(statement: str) -> float:
+    """
+    单次测量：累加 -c 语句触发的顶层导入的累计耗时
+    :return: 毫秒
+    """
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], cwd=CLIENT_DIR,
+                          capture_output=True, text=True, timeout=60)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{statement} 导入失败：{proc.stderr.strip()[-500:]}")
+    total, after_site = 0, False
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        # 顶层导入的模块名前没有缩进；site 之前为解释器启动阶段的导入
+        if name.startswith("  "):
+            continue
+        if name.strip() == "site":
+            after_site = True
+        elif after_site:
+            total += int(cumulative)
+    return total / 1000
+
+
+def _heavy_loaded(statement: str) -> int:
+    """执行导入语句后已加载的重型依赖个数"""
+    code = f"{statement}; import sys; print(sum(m in sys.modules for m in {HEAVY_MODULES!r}))"
+    proc = subprocess.run([sys.executable, "-c", code], cwd=CLIENT_DIR, capture_output=True, text=True, timeout=60)
+    return int(proc.stdout.strip().splitlines()[-1])
+
+
+def run(n_runs: int = N_RUNS) -> dict:
+    """
+    执行基准测试
+    :param n_runs: 每个入口的测量次数（取最小值，排除磁盘缓存等干扰）
+    :return: 指标字典
+    """
+    results = {}
+    for prefix, statement in TARGETS.items():
+        results[f"{prefix}_ms"] = round(min(_import_time_ms(statement) for _ in range(n_runs)), 3)
+        results[f"{prefix}_heavy_modules"] = _heavy_loaded(statement)
+    return results
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else N_RUNS
+    print(f"导入耗时基准测试（每个入口 {n} 次取最小值）")
+    for key, value in run(n).items():
+        print(f"  {key}: {value}")
@@ -0,0 +1,92 @@
+"""
+日志开销基准测试：同步写文件/控制台 vs 队列异步写入，以及采样、延迟格式化的单次调用开销
+（每种模式在独立子进程中通过环境变量配置，经公开的 setup_logging() / logger 调用；
+日志写入临时文件，控制台输出重定向到 os.devnull）
+
+运行：python benchmarks/bench_logging.py [调用次数]
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+CLIENT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(CLIENT_DIR)
+
+N_CALLS = 20_000
+# 模式名 -> 子进程环境变量
+MODES = {
+    "sync": {"LOG_ASYNC": "false", "LOG_SAMPLE_RATE": "1"},
+    "async": {"LOG_ASYNC": "true", "LOG_SAMPLE_RATE": "1"},
+    "async_sampled_10pct": {"LOG_ASYNC": "true", "LOG_SAMPLE_RATE": "0.1"},
+    "filtered": {"LOG_ASYNC": "true", "LOG_SAMPLE_RATE": "1"}
+}
+
+
+def _per_call_us(func, n: int) -> float:
+    start = time.perf_counter()
+    for i in range(n):
+        func(i)
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def _measure(mode: str, n_calls: int) -> dict:
+    """子进程内执行：按环境变量完成 setup_logging 后测量"""
+    from core.logger import SAMPLED, logger, setup_logging
+
+    # core 包导出的 logger 是日志实例，listener 需从模块本身读取
+    log_module = sys.modules["core.logger"]
+
+    # 控制台 handler 在 setup_logging 时绑定 sys.stdout，先重定向，结果经 sys.__stdout__ 输出
+    sys.stdout = open(os.devnull, "w")
+    setup_logging()
+    results = {}
+    if mode == "filtered":
+        # 级别被过滤的 DEBUG：f-string 先格式化 vs %s 延迟格式化
+        payload = {"user_id": "u1", "messages": list(range(20))}
+        results["log_filtered_eager_us"] = _per_call_us(lambda i: logger.debug(f"会话{i}内容：{payload}"), n_calls)
+        results["log_filtered_lazy_us"] = _per_call_us(lambda i: logger.debug("会话%s内容：%s", i, payload), n_calls)
+        return results
+
+    extra = SAMPLED if mode == "async_sampled_10pct" else None
+    results[f"log_{mode}_us"] = _per_call_us(lambda i: logger.info("会话%s已存储", i, extra=extra), n_calls)
+    if log_module.listener is not None:
+        start = time.perf_counter()
+        log_module.listener.stop()
+        results[f"log_{mode}_drain_ms"] = (time.perf_counter() - start) * 1000
+    return results
+
+
+def _run_mode(mode: str, n_calls: int, log_dir: str) -> dict:
+    env = {**os.environ, **MODES[mode], "LOG_LEVEL": "INFO", "LOG_ROTATE": "", "LOG_JSON": "false",
+           "LOG_FILE": os.path.join(log_dir, f"{mode}.log")}
+    code = (f"import sys, json; sys.path.insert(0, {CLIENT_DIR!r}); "
+            f"from benchmarks.bench_logging import _measure; "
+            f"print(json.dumps(_measure({mode!r}, {n_calls})), file=sys.__stdout__)")
+    proc = subprocess.run([sys.executable, "-c", code], cwd=CLIENT_DIR, env=env,
+                          capture_output=True, text=True, timeout=600)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{mode} 模式执行失败：{proc.stderr.strip()[-500:]}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def run(n_calls: int = N_CALLS) -> dict:
+    """
+    执行基准测试
+    :param n_calls: 每种模式的日志调用次数
+    :return: 指标字典（单次调用耗时，微秒）
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in MODES:
+            results.update(_run_mode(mode, n_calls, tmp))
+    return {key: round(value, 3) for key, value in results.items()}
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else N_CALLS
+    print(f"日志开销基准测试（每种模式 {n} 次调用）")
+    for key, value in run(n).items():
+        print(f"  {key}: {value}")
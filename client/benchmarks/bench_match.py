@@ -0,0 +1,89 @@
+"""
+岗位匹配引擎基准测试：10 万岗位规模下的构建耗时与打分延迟
+岗位数据由 jobs.csv 行随机组合技能/要求合成，结果可复现（固定随机种子）
+
+运行：python benchmarks/bench_match.py [岗位数]
+"""
+import csv
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import KNOWLEDGE_DOCS_DIR
+from search.match import MatchEngine
+
+N_JOBS = 100_000
+N_QUERIES = 50
+
+SKILL_POOL = [
+    "Java", "Python", "Go", "C++", "JavaScript", "TypeScript", "React", "Vue", "MySQL", "Redis",
+    "Kafka", "Docker", "Kubernetes", "Linux", "Spring", "SpringBoot", "PyTorch", "TensorFlow",
+    "数据分析", "机器学习", "嵌入式", "测试", "产品设计", "运营", "Excel", "SQL", "Hadoop", "Spark"
+]
+
+
+def _synthetic_jobs(n: int, seed: int = 42) -> list:
+    with open(os.path.join(KNOWLEDGE_DOCS_DIR, "jobs.csv"), "r", encoding="utf-8-sig", newline="") as f:
+        base = list(csv.DictReader(f))
+    rng = random.Random(seed)
+    jobs = []
+    for _ in range(n):
+        row = dict(rng.choice(base))
+        skills = rng.sample(SKILL_POOL, rng.randint(2, 6))
+        row["skills"] = skills
+        row["requirements"] = f"{row['requirements']};熟悉{'、'.join(skills)}"
+        jobs.append(row)
+    return jobs
+
+
+def _synthetic_resumes(n: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    return [
+        {
+            "resumeText": f"本科，计算机相关专业，熟悉{'、'.join(rng.sample(SKILL_POOL, 4))}，有项目经验",
+            "skills": rng.sample(SKILL_POOL, 3)
+        }
+        for _ in range(n)
+    ]
+
+
+def run(n_jobs: int = N_JOBS) -> dict:
+    """
+    执行基准测试
+    :param n_jobs: 岗位数量
+    :return: 指标字典（耗时单位见键名后缀）
+    """
+    jobs = _synthetic_jobs(n_jobs)
+    resumes = _synthetic_resumes(N_QUERIES)
+
+    start = time.perf_counter()
+    engine = MatchEngine(jobs)
+    build_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for resume in resumes:
+        engine.rank_jobs(resume, top_k=10)
+    rank_jobs_ms = (time.perf_counter() - start) / len(resumes) * 1000
+
+    many = _synthetic_resumes(10_000, seed=11)
+    start = time.perf_counter()
+    engine.rank_resumes(many, job_index=0, top_k=10)
+    rank_resumes_10k_ms = (time.perf_counter() - start) * 1000
+
+    return {
+        "match_build_s": round(build_s, 3),
+        "match_rank_jobs_ms": round(rank_jobs_ms, 3),
+        "match_rank_resumes_10k_ms": round(rank_resumes_10k_ms, 3),
+        "match_nnz": int(len(engine._row_vals)),
+        "match_vocab": len(engine.vocab)
+    }
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else N_JOBS
+    print(f"岗位匹配基准测试（{n} 个岗位）")
+    for key, value in run(n).items():
+        print(f"  {key}: {value}")
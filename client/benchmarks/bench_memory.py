@@ -0,0 +1,106 @@
+"""
+记录类内存基准：每 1 万条岗位 / 政策 / 投递 / 面试报告，原始字典与紧凑记录（api.models）的内存占用、
+构造耗时与还原（to_dict）耗时对比
+
+- 数据先序列化为 JSON 再解析，与真实的 response.json() 一样，每条记录的字符串是独立对象
+- 内存按 tracemalloc 统计构造完成后仍被引用的分配（记录与其引用的字符串等）；
+  构造/还原耗时单独计时（不含 JSON 解析与 tracemalloc 开销）
+
+运行：python benchmarks/bench_memory.py
+"""
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+N_RECORDS = 10_000
+
+
+def _job(i: int) -> dict:
+    return {"id": f"cmm52v1jc{i:016d}", "title": "Java 后端开发工程师", "industry": "互联网", "category": "技术",
+            "salaryMin": 8000 + i % 7 * 1000, "salaryMax": 15000 + i % 5 * 1000, "location": "武汉市东湖高新区",
+            "description": f"负责核心业务系统的设计与开发（{i}）", "requirements": "熟悉 Java、Spring Boot、MySQL",
+            "benefits": "五险一金，双休", "skills": ["Java", "Spring Boot", "MySQL"], "educationLevel": "本科",
+            "experienceYears": i % 4, "freshGraduate": i % 2 == 0, "headcount": 1 + i % 3,
+            "publishedAt": "2026-03-01T08:00:00.000Z",
+            "enterprise": {"id": f"ent_{i % 200}", "name": f"光谷科技{i % 200}", "industry": "互联网"}}
+
+
+def _policy(i: int) -> dict:
+    return {"id": f"pol_{i:08d}", "title": f"武汉市人才安居政策第{i}条", "category": "HOUSING",
+            "summary": "符合条件的高校毕业生可申请租房补贴", "content": f"政策内容（{i}）", "conditions": "本科及以上",
+            "benefits": "每月补贴 1000 元", "effectiveDate": "2026-01-01T00:00:00.000Z", "expiryDate": None,
+            "createdAt": "2025-12-01T00:00:00.000Z"}
+
+
+def _application(i: int) -> dict:
+    return {"id": f"app_{i:08d}", "status": "PENDING", "createdAt": "2026-03-02T10:00:00.000Z",
+            "updatedAt": "2026-03-02T10:00:00.000Z",
+            "job": {"id": f"job_{i % 500}", "title": "Java 后端开发工程师", "company": f"光谷科技{i % 200}",
+                    "location": "武汉", "salaryMin": 8000, "salaryMax": 15000}}
+
+
+def _interview(i: int) -> dict:
+    return {"id": f"itv_{i:08d}", "job": {"id": f"job_{i % 500}", "title": "Java 后端开发工程师", "company": "光谷科技"},
+            "outline": None, "currentIndex": 5, "answers": None, "totalScore": 78.5,
+            "dimensions": [{"name": "专业知识", "score": 85}, {"name": "表达能力", "score": 72}],
+            "highlights": None, "improvements": None, "suggestions": "整体表现良好", "audioUrl": None,
+            "duration": 1200, "status": "COMPLETED", "createdAt": "2026-03-02T10:00:00.000Z",
+            "completedAt": "2026-03-02T10:20:00.000Z"}
+
+
+def _retained_kb(build, blob: str) -> float:
+    """解析 JSON 并构造后仍被引用的内存（KB）"""
+    tracemalloc.start()
+    result = build(json.loads(blob))
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size / 1024
+
+
+def _elapsed_ms(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return (time.perf_counter() - start) * 1000, result
+
+
+def run(n_records: int = N_RECORDS) -> dict:
+    """
+    执行基准测试
+    :param n_records: 每种记录的条数
+    :return: 指标字典
+    """
+    from api.models import Job, Policy, Application, InterviewReport
+
+    cases = {
+        "jobs": (_job, Job.from_list, lambda records: [record.to_dict() for record in records]),
+        "policies": (_policy, Policy.from_list, lambda records: [record.to_dict() for record in records]),
+        "applications": (_application, Application.from_list, lambda records: [r.to_dict() for r in records]),
+        "interviews": (_interview, InterviewReport.from_list, lambda records: [r.to_dict() for r in records])
+    }
+    results = {}
+    for name, (make, from_list, to_list) in cases.items():
+        items = [make(i) for i in range(n_records)]
+        blob = json.dumps(items, ensure_ascii=False)
+        dict_kb = _retained_kb(lambda data: data, blob)
+        record_kb = _retained_kb(from_list, blob)
+        build_ms, records = _elapsed_ms(from_list, json.loads(blob))
+        to_dict_ms, restored = _elapsed_ms(to_list, records)
+        if restored != items:
+            raise AssertionError(f"{name} 还原结果与原始数据不一致")
+        results[f"{name}_dict_kb"] = dict_kb
+        results[f"{name}_record_kb"] = record_kb
+        results[f"{name}_record_saving_ratio"] = 1 - record_kb / dict_kb
+        results[f"{name}_from_json_ms"] = build_ms
+        results[f"{name}_to_json_ms"] = to_dict_ms
+    return {key: round(value, 3) for key, value in results.items()}
+
+
+if __name__ == "__main__":
+    print(f"记录类内存基准测试（每种 {N_RECORDS} 条）")
+    for key, value in run().items():
+        print(f"  {key}: {value}")
@@ -0,0 +1,73 @@
+"""
+指标开销基准测试：计数器 / 直方图单次更新耗时（单线程与多线程），以及自动埋点包装的额外开销
+
+运行：python benchmarks/bench_metrics.py [次数]
+"""
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.metrics import Registry, Counter, Histogram, instrumented
+
+N_OPS = 500_000
+N_THREADS = 4
+
+
+def _per_op_us(func, n: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        func()
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def _threaded_per_op_us(func, n: int, threads: int) -> float:
+    per_thread = n // threads
+    workers = [threading.Thread(target=lambda: [func() for _ in range(per_thread)]) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return (time.perf_counter() - start) / (per_thread * threads) * 1e6
+
+
+def run(n_ops: int = N_OPS) -> dict:
+    """
+    执行基准测试
+    :param n_ops: 每项测试的更新次数
+    :return: 指标字典（单次耗时，微秒）
+    """
+    registry = Registry()
+    requests_total = registry.register("bench_requests_total", "bench", Counter, ("endpoint",))
+    duration = registry.register("bench_duration_seconds", "bench", Histogram, ("endpoint",))
+    child_counter = requests_total.labels("/jobs")
+    child_histogram = duration.labels("/jobs")
+
+    def noop():
+        return None
+
+    wrapped = instrumented(noop, "bench.noop")
+    baseline = _per_op_us(lambda: None, n_ops)
+
+    results = {
+        "metrics_counter_inc_us": _per_op_us(child_counter.inc, n_ops),
+        "metrics_histogram_observe_us": _per_op_us(lambda: child_histogram.observe(0.042), n_ops) - baseline,
+        "metrics_labels_lookup_inc_us": _per_op_us(lambda: requests_total.labels("/jobs").inc(), n_ops) - baseline,
+        "metrics_counter_inc_4threads_us": _threaded_per_op_us(child_counter.inc, n_ops, N_THREADS),
+        "metrics_instrumented_call_overhead_us": _per_op_us(wrapped, n_ops) - _per_op_us(noop, n_ops)
+    }
+
+    start = time.perf_counter()
+    registry.render()
+    results["metrics_render_ms"] = (time.perf_counter() - start) * 1000
+    return {key: round(value, 4) for key, value in results.items()}
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else N_OPS
+    print(f"指标开销基准测试（每项 {n} 次）")
+    for key, value in run(n).items():
+        print(f"  {key}: {value}")
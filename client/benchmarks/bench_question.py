@@ -0,0 +1,139 @@
+"""
+多轮问询控制器基准：进程内 init / next 单次耗时、本地 HTTP 服务（keep-alive）每次回答的往返耗时，
+以及会话增量快照与同步到 B端（本地替身服务，不访问外网）的耗时
+
+运行：python benchmarks/bench_question.py
+"""
+import asyncio
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+N_QUESTIONS = 10
+N_SESSIONS = 2_000
+N_HTTP_SESSIONS = 100
+N_SYNC_SESSIONS = 50
+API_KEY = "bench_key"
+
+
+def _questions(n: int) -> list:
+    return [f"第{i + 1}题：请介绍一个你主导的技术方案及其取舍。" for i in range(n)]
+
+
+def _start_b_stand_in():
+    """本地 B端替身：/api/coze/question/* 一律返回成功，记录收到的请求数"""
+    received = {"count": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        wbufsize = 64 * 1024
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            received["count"] += 1
+            payload = b'{"code":200,"msg":"success","data":{}}'
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, received
+
+
+def _http_round_trips(port: int, n_sessions: int) -> float:
+    """每个会话 init 后逐题 next，返回每次 next 的平均往返耗时（毫秒）"""
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+    headers = {"Content-Type": "application/json", "X-API-Key": API_KEY}
+
+    def post(path: str, body: dict) -> dict:
+        connection.request("POST", f"/api/coze/question/{path}", json.dumps(body), headers)
+        response = connection.getresponse()
+        return json.loads(response.read())
+
+    elapsed, calls = 0.0, 0
+    for i in range(n_sessions):
+        post("init", {"session_id": f"http_{i}", "questions": _questions(N_QUESTIONS)})
+        start = time.perf_counter()
+        for _ in range(N_QUESTIONS):
+            result = post("next", {"session_id": f"http_{i}", "answer": "我负责订单服务的缓存层改造。"})
+        elapsed += time.perf_counter() - start
+        calls += N_QUESTIONS
+        if not result["data"]["is_finish"]:
+            raise AssertionError("最后一题回答后会话应结束")
+    connection.close()
+    return elapsed / calls * 1000
+
+
+def run() -> dict:
+    """
+    执行基准测试
+    :return: 指标字典
+    """
+    stand_in, received = _start_b_stand_in()
+    # 客户端模块在导入时读取配置，需先设置环境变量
+    os.environ["QUESTION_API_BASE_URL"] = f"http://127.0.0.1:{stand_in.server_address[1]}/api/coze/question"
+    os.environ["LOG_LEVEL"] = "WARNING"
+    from question import QuestionController, QuestionServer, flush
+
+    results = {}
+    questions = _questions(N_QUESTIONS)
+
+    # 进程内调用
+    controller = QuestionController(max_sessions=N_SESSIONS)
+    start = time.perf_counter()
+    for i in range(N_SESSIONS):
+        controller.init_session(f"s_{i}", questions)
+    results["controller_init_us"] = (time.perf_counter() - start) / N_SESSIONS * 1e6
+    start = time.perf_counter()
+    for _ in range(N_QUESTIONS):
+        for i in range(N_SESSIONS):
+            controller.next_question(f"s_{i}", "我负责订单服务的缓存层改造。")
+    results["controller_next_us"] = (time.perf_counter() - start) / (N_SESSIONS * N_QUESTIONS) * 1e6
+
+    start = time.perf_counter()
+    snapshots = controller.snapshot()
+    results["snapshot_collect_ms"] = (time.perf_counter() - start) * 1000
+    if len(snapshots) != N_SESSIONS:
+        raise AssertionError("所有会话都应有待同步的增量")
+
+    # 本地 HTTP 服务 + 同步到 B端替身
+    async def serve_and_sync():
+        server = QuestionServer(QuestionController(), api_key=API_KEY, snapshot_interval=0)
+        await server.start("127.0.0.1", 0)
+        next_ms = await asyncio.to_thread(_http_round_trips, server.port, N_HTTP_SESSIONS)
+        sync_controller = QuestionController()
+        for i in range(N_SYNC_SESSIONS):
+            sync_controller.init_session(f"sync_{i}", questions)
+            for _ in range(N_QUESTIONS):
+                sync_controller.next_question(f"sync_{i}", "回答")
+        start = time.perf_counter()
+        synced = await flush(sync_controller)
+        flush_ms = (time.perf_counter() - start) * 1000
+        if synced != N_SYNC_SESSIONS or sync_controller.snapshot():
+            raise AssertionError("同步后不应再有待同步的增量")
+        await server.stop()
+        return next_ms, flush_ms
+
+    results["server_next_ms"], flush_ms = asyncio.run(serve_and_sync())
+    results["snapshot_flush_per_session_ms"] = flush_ms / N_SYNC_SESSIONS
+    results["b_side_requests_per_session"] = received["count"] / N_SYNC_SESSIONS
+    stand_in.shutdown()
+    return {key: round(value, 4) for key, value in results.items()}
+
+
+if __name__ == "__main__":
+    print(f"多轮问询控制器基准测试（每个会话 {N_QUESTIONS} 题）")
+    for key, value in run().items():
+        print(f"  {key}: {value}")
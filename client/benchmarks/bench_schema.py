@@ -0,0 +1,95 @@
+"""
+Schema 校验基准：每次重新读取/编译 Schema 与复用缓存校验器的单次耗时对比，以及批量校验（串行/多线程/多进程）
+
+运行：python benchmarks/bench_schema.py [文件数]
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+N_FILES = 400
+N_CALLS = 500
+
+
+def _write_configs(config_dir: str, n_files: int) -> list:
+    """生成 n 个智能体配置（每 10 个中有 1 个不合法）"""
+    paths = []
+    for i in range(n_files):
+        config = {"name": f"bench_bot_{i}", "description": "岗位推荐与面试模拟" * 10,
+                  "instructions": "你是 WeHan 求职助手，根据用户简历推荐武汉地区岗位。" * 40,
+                  "welcome_message": "你好，我是 WeHan 求职助手", "visibility": "private"}
+        if i % 10 == 0:
+            config["visibility"] = "team"
+        path = os.path.join(config_dir, f"bot_{i:04d}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(config, f, ensure_ascii=False)
+        paths.append(path)
+    return paths
+
+
+def _legacy_validate(config_path: str, schema_path: str) -> bool:
+    """旧实现：每次读取 Schema 并经 jsonschema.validate 重新检查、编译"""
+    from jsonschema import validate, ValidationError
+    with open(schema_path, "r", encoding="utf-8") as f:
+        schema = json.load(f)
+    with open(config_path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    try:
+        validate(instance=config, schema=schema)
+        return True
+    except ValidationError:
+        return False
+
+
+def _elapsed_ms(func) -> float:
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) * 1000
+
+
+def run(n_files: int = N_FILES) -> dict:
+    """
+    执行基准测试
+    :param n_files: 批量校验的文件数
+    :return: 指标字典
+    """
+    # 批量校验会为每个文件写日志，基准只关心校验本身
+    os.environ["LOG_LEVEL"] = "CRITICAL"
+    from config.settings import PROJECT_ROOT
+    from core.schema_validate import validate_config, validate_configs, _check_file
+
+    schema_path = os.path.join(PROJECT_ROOT, "config", "schema", "bot_schema.json")
+    config_dir = tempfile.mkdtemp(prefix="bench_schema_")
+    try:
+        paths = _write_configs(config_dir, n_files)
+        results = {}
+
+        validate_config(paths[1], schema_path)
+        results["validate_legacy_us"] = _elapsed_ms(
+            lambda: [_legacy_validate(paths[1], schema_path) for _ in range(N_CALLS)]) / N_CALLS * 1000
+        results["validate_cached_us"] = _elapsed_ms(
+            lambda: [_check_file(paths[1], schema_path) for _ in range(N_CALLS)]) / N_CALLS * 1000
+        results["validate_cached_all_errors_us"] = _elapsed_ms(
+            lambda: [_check_file(paths[0], schema_path, True) for _ in range(N_CALLS)]) / N_CALLS * 1000
+
+        results["batch_legacy_serial_ms"] = _elapsed_ms(lambda: [_legacy_validate(p, schema_path) for p in paths])
+        results["batch_serial_ms"] = _elapsed_ms(lambda: validate_configs(paths, schema_path, max_workers=1))
+        results["batch_threads_ms"] = _elapsed_ms(lambda: validate_configs(paths, schema_path))
+        results["batch_processes_ms"] = _elapsed_ms(lambda: validate_configs(paths, schema_path, use_processes=True))
+        results["batch_speedup"] = results["batch_legacy_serial_ms"] / min(
+            results["batch_serial_ms"], results["batch_threads_ms"], results["batch_processes_ms"])
+    finally:
+        shutil.rmtree(config_dir, ignore_errors=True)
+    return {key: round(value, 3) for key, value in results.items()}
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else N_FILES
+    print(f"Schema 校验基准测试（批量 {n} 个文件）")
+    for key, value in run(n).items():
+        print(f"  {key}: {value}")
@@ -0,0 +1,125 @@
+"""
+混合检索基准测试：向量索引召回率/延迟 + 三路检索延迟
+- 召回率：IVF 与暴力检索 top-10 的重合率（bundled jobs.csv 与 2 万条合成岗位两档规模）
+- 延迟：词法 / 语义 / 混合检索单次查询耗时（bundled knowledge_docs）
+- 相关性：人工标注的查询 -> 期望文档（标题关键词），统计混合检索 top-1 / top-5 命中率与 MRR
+
+运行：python benchmarks/bench_search.py
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from search.ann import IVFIndex, exact_search
+from search.embedding import HashingEmbedder
+from search.hybrid import HybridSearcher
+from search.index import load_knowledge_docs, open_docs_index
+
+QUERIES = ["后端", "Java开发", "前端 React", "算法工程师", "应届生 软件测试", "嵌入式",
+           "落户条件", "租房补贴", "创业贷款", "人工智能", "数据分析", "产品经理"]
+N_SYNTHETIC = 20_000
+
+# 相关性标注：查询 -> 期望文档标题中包含的关键词（命中任一即相关）
+RELEVANCE = {
+    "后端": ("Java", "java"),
+    "Java开发": ("Java", "java"),
+    "前端 React": ("前端",),
+    "算法工程师": ("算法工程师",),
+    "应届生 软件测试": ("软件测试",),
+    "落户条件": ("落户",),
+    "租房补贴": ("人才租赁房", "青年人才之家"),
+    "创业贷款": ("创业担保贷款",),
+    "人工智能": ("AI工程师", "人工智能"),
+    "产品经理": ("产品经理",)
+}
+
+
+def _recall(index: IVFIndex, vectors, queries, top_k: int = 10, nprobe: int = 8) -> float:
+    approx, _ = index.search(queries, top_k=top_k, nprobe=nprobe)
+    exact, _ = exact_search(vectors, queries, top_k=top_k)
+    hits = sum(len(set(a[a >= 0]) & set(e)) for a, e in zip(approx, exact))
+    return hits / exact.size
+
+
+def _per_query_ms(fn, repeat: int = 5) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for query in QUERIES:
+            fn(query)
+    return (time.perf_counter() - start) / (repeat * len(QUERIES)) * 1000
+
+
+def _relevance(searcher: HybridSearcher, top_k: int = 5) -> dict:
+    """标注查询的 top-1 / top-k 命中率与 MRR（未进入 top-k 记 0）"""
+    hit1 = hitk = rr = 0.0
+    for query, keywords in RELEVANCE.items():
+        titles = [doc["title"] for doc in searcher.search(query, top_k=top_k)]
+        rank = next((i for i, title in enumerate(titles, start=1)
+                     if any(keyword in title for keyword in keywords)), None)
+        if rank:
+            hit1 += rank == 1
+            hitk += 1
+            rr += 1 / rank
+    n = len(RELEVANCE)
+    return {"top1": hit1 / n, f"top{top_k}": hitk / n, "mrr": rr / n}
+
+
+def run() -> dict:
+    """执行基准测试，返回指标字典"""
+    embedder = HashingEmbedder()
+    docs = [d for d in load_knowledge_docs() if d["source"] == "jobs.csv"]
+    texts = [f"{d['title']}\n{d['content']}" for d in docs]
+    query_vectors = embedder.embed(QUERIES)
+
+    vectors = embedder.embed(texts)
+    small = IVFIndex.build(vectors)
+
+    rng = random.Random(3)
+    words = "Java Python Go React Vue MySQL Redis 算法 测试 运维 数据 产品 嵌入式 前端 后端 应届 武汉 江夏".split()
+    synthetic = [f"{rng.choice(texts)} {' '.join(rng.sample(words, 4))}" for _ in range(N_SYNTHETIC)]
+    start = time.perf_counter()
+    big_vectors = embedder.embed(synthetic)
+    embed_ms_per_doc = (time.perf_counter() - start) / N_SYNTHETIC * 1000
+    start = time.perf_counter()
+    big = IVFIndex.build(big_vectors)
+    build_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    big.search(query_vectors, top_k=10)
+    ann_ms = (time.perf_counter() - start) / len(QUERIES) * 1000
+    start = time.perf_counter()
+    exact_search(big_vectors, query_vectors, top_k=10)
+    exact_ms = (time.perf_counter() - start) / len(QUERIES) * 1000
+
+    with tempfile.TemporaryDirectory() as index_dir:
+        lexical = open_docs_index(load_knowledge_docs(), name="bench", index_dir=index_dir)
+        searcher = HybridSearcher(lexical=lexical, embedder=embedder, index_dir=index_dir)
+        lexical_ms = _per_query_ms(lambda q: lexical.search(q, top_k=5))
+        semantic_ms = _per_query_ms(lambda q: searcher.semantic.search(embedder.embed([q]), top_k=5))
+        hybrid_ms = _per_query_ms(lambda q: searcher.search(q, top_k=5))
+        relevance = _relevance(searcher)
+        lexical.close()
+
+    return {
+        "ann_recall_at10_jobs_csv": round(_recall(small, vectors, query_vectors), 4),
+        "ann_recall_at10_20k": round(_recall(big, big_vectors, query_vectors), 4),
+        "ann_recall_at10_20k_nprobe32": round(_recall(big, big_vectors, query_vectors, nprobe=32), 4),
+        "embed_per_doc_ms": round(embed_ms_per_doc, 4),
+        "ann_build_20k_s": round(build_s, 3),
+        "ann_query_20k_ms": round(ann_ms, 3),
+        "exact_query_20k_ms": round(exact_ms, 3),
+        "lexical_query_ms": round(lexical_ms, 3),
+        "semantic_query_ms": round(semantic_ms, 3),
+        "hybrid_query_ms": round(hybrid_ms, 3),
+        **{f"relevance_{key}": round(value, 4) for key, value in relevance.items()}
+    }
+
+
+if __name__ == "__main__":
+    print("混合检索基准测试")
+    for key, value in run().items():
+        print(f"  {key}: {value}")
@@ -0,0 +1,149 @@
+"""
+JSON 序列化基准：100 轮面试会话（session_data）、面试报告与 SSE 事件的编码/解码耗时，
+对比 requests 内置编码（标准库 json，非 ASCII 转义）与 core.serializer 各可用后端（stdlib / orjson）
+
+- 会话恢复：旧做法每次尝试都重新编码（历史消息拼入提示词 + 请求体），
+  新做法提示词与请求体（JsonBody）各编码一次，3 次尝试复用同一份字节
+- 体积：requests 默认把中文转义为 \\uXXXX，core.serializer 直接输出 UTF-8
+
+运行：python benchmarks/bench_serializer.py
+"""
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+N_TURNS = 100
+N_SSE_EVENTS = 2_000
+N_CALLS = 200
+# 会话恢复的尝试次数（send_message 最多重试 3 次时的 1 次首发 + 2 次重试）
+N_ATTEMPTS = 3
+
+
+def _session_data(n_turns: int) -> dict:
+    """n 轮面试会话（每轮一问一答）"""
+    messages = []
+    for i in range(n_turns):
+        messages.append({"role": "assistant", "timestamp": 1_772_000_000 + i * 60,
+                         "content": f"第{i + 1}题：请结合你在项目中负责的模块，说明遇到的性能问题、排查思路和最终的优化效果。"})
+        messages.append({"role": "user", "timestamp": 1_772_000_030 + i * 60,
+                         "content": f"（第{i + 1}轮回答）在订单服务中我负责缓存层改造，通过慢查询日志定位热点 SQL，"
+                                    "引入本地缓存加 Redis 两级缓存，接口 P99 从 800ms 降到 120ms。" * 2})
+    return {
+        "type": "interview",
+        "jobId": "cmm52v1jc00003wuj5mlubj3u",
+        "messages": messages,
+        "workflow_status": {"currentStep": "voice_interview", "currentIndex": n_turns,
+                            "completedQuestions": list(range(n_turns)),
+                            "scores": [{"index": i, "score": 60 + i % 40} for i in range(n_turns)]}
+    }
+
+
+def _report(n_turns: int) -> dict:
+    """POST /interviews 的面试报告"""
+    return {
+        "userId": "bench_user", "jobId": "cmm52v1jc00003wuj5mlubj3u", "status": "COMPLETED", "duration": 3600,
+        "totalScore": 78.5,
+        "outline": [{"index": i, "question": f"第{i + 1}题：请介绍一个你主导的技术方案及其取舍。"} for i in range(n_turns)],
+        "answers": [{"index": i, "answer": "我们对比了消息队列与定时任务两种方案，最终选择……" * 3, "score": 60 + i % 40}
+                    for i in range(n_turns)],
+        "dimensions": [{"name": name, "score": 70 + k * 3} for k, name in enumerate(["专业知识", "表达能力", "逻辑思维", "岗位匹配"])],
+        "highlights": ["项目经验丰富", "能量化优化效果"], "improvements": ["回答可以更简洁"],
+        "suggestions": "整体表现良好，建议加强系统设计方面的准备。"
+    }
+
+
+def _sse_data(n_events: int) -> list:
+    """/v3/chat 流式响应中 data: 行的 JSON 文本"""
+    return [json.dumps({"id": "chat_1", "conversation_id": "conv_1", "bot_id": "bot_1", "role": "assistant",
+                        "type": "answer", "content": f"第{i}段回答内容", "content_type": "text",
+                        "chat_id": "chat_1", "section_id": "sec_1"}, ensure_ascii=False).encode("utf-8")
+            for i in range(n_events)]
+
+
+def _requests_dumps(obj) -> bytes:
+    """requests 处理 json= 参数的方式"""
+    return json.dumps(obj, allow_nan=False).encode("utf-8")
+
+
+def _per_call_us(func, n: int = N_CALLS) -> float:
+    func()
+    start = time.perf_counter()
+    for _ in range(n):
+        func()
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def _resume_prompt(history: str, status: str) -> str:
+    return f"请恢复用户的历史会话，继续之前未完成的操作：\n1. 历史对话记录：{history}\n2. 面试工作流状态：{status}\n"
+
+
+def _chat_payload(content: str) -> dict:
+    return {"bot_id": "bench_bot", "user_id": "bench_user", "stream": False, "auto_save_history": True,
+            "additional_messages": [{"role": "user", "content": content, "content_type": "text"}]}
+
+
+def _backends() -> dict:
+    """可用后端：名称 -> (编码, 解码)"""
+    from core import serializer
+    backends = {"stdlib": (serializer._stdlib_dumps, json.loads)}
+    if serializer.orjson is not None:
+        backends["orjson"] = (lambda obj: serializer.orjson.dumps(obj, option=serializer.orjson.OPT_NON_STR_KEYS),
+                              serializer.orjson.loads)
+    return backends
+
+
+def run(n_turns: int = N_TURNS) -> dict:
+    """
+    执行基准测试
+    :param n_turns: 会话轮数
+    :return: 指标字典
+    """
+    from core.serializer import BACKEND, JsonBody, dumps, dumps_str
+
+    session, report, sse = _session_data(n_turns), _report(n_turns), _sse_data(N_SSE_EVENTS)
+    results = {}
+
+    results["requests_session_encode_us"] = _per_call_us(lambda: _requests_dumps(session))
+    results["requests_report_encode_us"] = _per_call_us(lambda: _requests_dumps(report))
+    results["requests_session_kb"] = len(_requests_dumps(session)) / 1024
+    results["serializer_session_kb"] = len(dumps(session)) / 1024
+
+    for name, (encode, decode) in _backends().items():
+        session_blob, report_blob = encode(session), encode(report)
+        if decode(session_blob) != session or decode(report_blob) != report:
+            raise AssertionError(f"{name} 编码结果无法还原")
+        results[f"{name}_session_encode_us"] = _per_call_us(lambda: encode(session))
+        results[f"{name}_session_decode_us"] = _per_call_us(lambda: decode(session_blob))
+        results[f"{name}_report_encode_us"] = _per_call_us(lambda: encode(report))
+        results[f"{name}_report_decode_us"] = _per_call_us(lambda: decode(report_blob))
+        results[f"{name}_sse_event_decode_us"] = _per_call_us(lambda: [decode(line) for line in sse], 5) / len(sse)
+
+    # 会话恢复：提示词构造 + 请求体编码（N_ATTEMPTS 次尝试）
+    history, status = session["messages"], session["workflow_status"]
+
+    def resume_legacy():
+        for _ in range(N_ATTEMPTS):
+            prompt = _resume_prompt(json.dumps(history, ensure_ascii=False), json.dumps(status, ensure_ascii=False))
+            _requests_dumps(_chat_payload(prompt))
+
+    def resume_current():
+        body = JsonBody(_chat_payload(_resume_prompt(dumps_str(history), dumps_str(status))))
+        for _ in range(N_ATTEMPTS):
+            body.data
+
+    results["resume_legacy_us"] = _per_call_us(resume_legacy)
+    results["resume_current_us"] = _per_call_us(resume_current)
+    results["resume_speedup"] = results["resume_legacy_us"] / results["resume_current_us"]
+    results["session_encode_speedup"] = results["requests_session_encode_us"] / results[f"{BACKEND}_session_encode_us"]
+    results["session_decode_speedup"] = results["stdlib_session_decode_us"] / results[f"{BACKEND}_session_decode_us"]
+    return {key: round(value, 3) for key, value in results.items()}
+
+
+if __name__ == "__main__":
+    from core.serializer import BACKEND
+    print(f"JSON 序列化基准测试（{N_TURNS} 轮会话，当前后端 {BACKEND}）")
+    for key, value in run().items():
+        print(f"  {key}: {value}")
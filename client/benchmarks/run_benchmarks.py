@@ -0,0 +1,212 @@
+"""
+基准测试运行器：依次运行 benchmarks/bench_*.py，按 git commit 保存结果，并与基线对比检测性能退化
+
+- 每个基准在独立子进程中运行（互不影响配置与全局状态），可 --repeat 多次取最优值降低噪声
+- 结果写入 benchmarks/results/<commit>.json；工作区有未提交改动时写入 <commit>-dirty.json，不覆盖该提交的干净结果
+- 基线默认取当前提交之前最近一个有干净结果的提交（dirty 结果不作为基线），也可 --baseline <commit 或 JSON 路径>
+- 按指标名后缀判断方向：*_ms / *_us / *_ns / *_s / *_kb / *_mb 越小越好，含 recall / rps / per_sec 的越大越好，
+  其余（计数类）只记录不比较；变差超过 --threshold（默认 15%）且超过单位噪声下限视为退化，退出码 1
+
+运行：python benchmarks/run_benchmarks.py [bench_client bench_metrics ...] [--repeat 3] [--threshold 0.15]
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+CLIENT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.join(CLIENT_DIR, "benchmarks")
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+MARKER = "__BENCH_RESULT__"
+
+# 单位噪声下限：变化量小于该值时不视为退化
+NOISE_FLOOR = {"ns": 5.0, "us": 0.05, "ms": 0.05, "s": 0.005, "kb": 1.0, "mb": 0.1}
+HIGHER_IS_BETTER = ("recall", "rps", "per_sec", "hit_rate", "speedup")
+
+_RUNNER = (
+    "import json, sys; sys.path.insert(0, {client!r}); "
+    "from benchmarks import {name} as bench; print({marker!r} + json.dumps(bench.run()))"
+)
+
+
+def _git(*args) -> str:
+    try:
+        return subprocess.run(["git", *args], cwd=CLIENT_DIR, capture_output=True, text=True,
+                              timeout=30).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def discover() -> list:
+    """全部基准名（bench_*.py）"""
+    return sorted(os.path.splitext(os.path.basename(path))[0]
+                  for path in glob.glob(os.path.join(BENCH_DIR, "bench_*.py")))
+
+
+def run_bench(name: str, timeout: float) -> dict:
+    """
+    在子进程中运行一个基准
+    :return: 指标字典
+    """
+    code = _RUNNER.format(client=CLIENT_DIR, name=name, marker=MARKER)
+    proc = subprocess.run([sys.executable, "-c", code], cwd=CLIENT_DIR, capture_output=True, text=True,
+                          timeout=timeout)
+    for line in reversed(proc.stdout.splitlines()):
+        if line.startswith(MARKER):
+            return json.loads(line[len(MARKER):])
+    raise RuntimeError(f"{name} 运行失败（退出码 {proc.returncode}）：{proc.stderr.strip()[-500:]}")
+
+
+def direction(metric: str):
+    """1 表示越大越好，-1 表示越小越好，None 表示不比较"""
+    if any(word in metric for word in HIGHER_IS_BETTER):
+        return 1
+    if metric.rsplit("_", 1)[-1] in NOISE_FLOOR:
+        return -1
+    return None
+
+
+def _best(values: list, sign: int):
+    return max(values) if sign == 1 else min(values)
+
+
+def run_all(names: list, repeat: int = 1, timeout: float = 900) -> dict:
+    """
+    运行多个基准（多次运行时每个指标取最优值）
+    :return: {基准名: {指标: 值}}
+    """
+    results = {}
+    for name in names:
+        runs = []
+        for i in range(repeat):
+            start = time.perf_counter()
+            runs.append(run_bench(name, timeout))
+            print(f"  {name}（第 {i + 1}/{repeat} 次）{time.perf_counter() - start:.1f}s")
+        merged = {}
+        for metric in runs[0]:
+            values = [run[metric] for run in runs if metric in run]
+            merged[metric] = _best(values, direction(metric) or -1) if len(values) > 1 else values[0]
+        results[name] = merged
+    return results
+
+
+def save(results: dict, commit: str, dirty: bool) -> str:
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"{commit}-dirty.json" if dirty else f"{commit}.json")
+    previous = load(path) if os.path.exists(path) else {}
+    report = {
+        "commit": commit,
+        "dirty": dirty,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        # 只运行部分基准时保留其余基准的已有结果
+        "results": {**previous.get("results", {}), **results}
+    }
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def find_baseline(commit: str, spec: str = None):
+    """
+    查找基线结果
+    :param commit: 当前提交
+    :param spec: 指定的提交或 JSON 路径（为空时取当前提交之前最近一个有干净结果的提交）
+    :return: 基线报告，找不到时为 None
+    """
+    if spec:
+        if os.path.exists(spec):
+            return load(spec)
+        sha = _git("rev-parse", "--short", spec) or spec
+        path = os.path.join(RESULTS_DIR, f"{sha}.json")
+        return load(path) if os.path.exists(path) else None
+    for sha in _git("rev-list", "--abbrev-commit", "--max-count=200", "HEAD").split():
+        if sha == commit:
+            continue
+        path = os.path.join(RESULTS_DIR, f"{sha}.json")
+        if os.path.exists(path):
+            report = load(path)
+            # 旧版本把 dirty 结果也写在 <commit>.json 中
+            if not report.get("dirty"):
+                return report
+    return None
+
+
+def compare(current: dict, baseline: dict, threshold: float = 0.15) -> list:
+    """
+    对比当前结果与基线
+    :return: [(基准, 指标, 基线值, 当前值, 变化比例)]，仅包含退化项
+    """
+    regressions = []
+    for name, metrics in current.items():
+        before = baseline.get(name, {})
+        for metric, value in metrics.items():
+            sign = direction(metric)
+            if sign is None or metric not in before:
+                continue
+            old = before[metric]
+            worse = (old - value) if sign == 1 else (value - old)
+            floor = NOISE_FLOOR.get(metric.rsplit("_", 1)[-1], 0.0)
+            if worse > threshold * abs(old) and worse > floor:
+                change = worse / abs(old) if old else float("inf")
+                regressions.append((name, metric, old, value, change))
+    return regressions
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="运行基准测试并检测性能退化")
+    parser.add_argument("names", nargs="*", help="要运行的基准（默认全部，如 bench_client）")
+    parser.add_argument("--repeat", type=int, default=3, help="每个基准运行次数（取最优值，默认 3）")
+    parser.add_argument("--threshold", type=float, default=0.15, help="退化判定比例（默认 0.15）")
+    parser.add_argument("--baseline", help="基线提交或 JSON 路径")
+    parser.add_argument("--timeout", type=float, default=900, help="单个基准超时（秒）")
+    parser.add_argument("--no-save", action="store_true", help="不保存本次结果")
+    args = parser.parse_args(argv)
+
+    available = discover()
+    names = [name if name.startswith("bench_") else f"bench_{name}" for name in args.names] or available
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        parser.error(f"未知基准：{unknown}（可选 {available}）")
+
+    commit = _git("rev-parse", "--short", "HEAD") or "unknown"
+    dirty = bool(_git("status", "--porcelain", "--untracked-files=no"))
+    print(f"运行基准测试（commit {commit}{'，有未提交改动' if dirty else ''}）")
+    results = run_all(names, args.repeat, args.timeout)
+
+    for name, metrics in results.items():
+        print(f"\n[{name}]")
+        for metric, value in metrics.items():
+            print(f"  {metric}: {value}")
+
+    if not args.no_save:
+        print(f"\n结果已保存：{save(results, commit, dirty)}")
+
+    baseline = find_baseline(commit, args.baseline)
+    if baseline is None:
+        print("\n未找到基线结果，跳过对比")
+        return 0
+    regressions = compare(results, baseline["results"], args.threshold)
+    if regressions:
+        print(f"\n[FAIL] 相比基线（commit {baseline['commit']}）出现 {len(regressions)} 项退化：")
+        for name, metric, old, value, change in regressions:
+            print(f"  - {name}.{metric}: {old} -> {value}（变差 {change:.0%}）")
+        return 1
+    print(f"\n[PASS] 相比基线（commit {baseline['commit']}）无退化")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -16,6 +16,10 @@ load_dotenv(os.path.join(PROJECT_ROOT, '.env'))
 # 个人访问令牌（PAT）- 从扣子平台获取
 COZE_PAT = os.getenv("COZE_PAT", "pat_xxxxxxxxxxxxxxxx")
 
+# 接口根地址（本地压测/离线基准测试时指向 scripts/mock_coze_server.py）
+COZE_API_BASE = os.getenv("COZE_API_BASE", "https://api.coze.cn").rstrip("/")
+COZE_WS_BASE = os.getenv("COZE_WS_BASE", "wss://api.coze.cn").rstrip("/")
+
 # 空间 ID - 从扣子空间 URL 中获取（w=xxx）
 SPACE_ID = os.getenv("SPACE_ID", "your_space_id_here")
 
@@ -40,11 +44,150 @@ VAD_SILENCE_THRESHOLD_MS = int(os.getenv("VAD_SILENCE_THRESHOLD_MS", "300"))
 B_API_BASE_URL = os.getenv("B_API_BASE_URL", "http://localhost:3000/api/open")
 B_API_KEY = os.getenv("OPEN_API_KEY", "your_api_key_here")
 B_API_TIMEOUT = int(os.getenv("B_API_TIMEOUT", "30"))
+# 响应 Schema 校验（config/schema/b_api）：off 不校验 / sample 按比例抽样校验并记录 / strict 每次校验，不合格时抛出异常
+# 无论哪种模式，success/data 外层结构都会检查
+B_API_VALIDATE = os.getenv("B_API_VALIDATE", "sample").lower()
+B_API_VALIDATE_SAMPLE_RATE = float(os.getenv("B_API_VALIDATE_SAMPLE_RATE", "0.05"))
 
 # ===================== 通用配置 =====================
 MAX_RETRY_TIMES = int(os.getenv("MAX_RETRY_TIMES", "3"))
 RETRY_DELAY = int(os.getenv("RETRY_DELAY", "1"))
+# 单次重试等待上限（秒）与抖动方式（full / decorrelated / none）
+RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "30"))
+RETRY_JITTER = os.getenv("RETRY_JITTER", "full")
+# 进程级重试预算：重试量不超过正常调用量的该比例，另每秒至少补充若干次重试额度
+RETRY_BUDGET_RATIO = float(os.getenv("RETRY_BUDGET_RATIO", "0.2"))
+RETRY_BUDGET_MIN_PER_SEC = float(os.getenv("RETRY_BUDGET_MIN_PER_SEC", "1"))
+# 熔断器（按上游接口统计最近 CB_WINDOW_SIZE 次调用）：失败率或慢调用率超过阈值后打开，
+# 打开 CB_OPEN_SECONDS 秒后放行 CB_HALF_OPEN_CALLS 个探测请求
+CB_FAILURE_RATE = float(os.getenv("CB_FAILURE_RATE", "0.5"))
+CB_SLOW_CALL_S = float(os.getenv("CB_SLOW_CALL_S", "10"))
+CB_SLOW_CALL_RATE = float(os.getenv("CB_SLOW_CALL_RATE", "0.8"))
+CB_WINDOW_SIZE = int(os.getenv("CB_WINDOW_SIZE", "20"))
+CB_MIN_CALLS = int(os.getenv("CB_MIN_CALLS", "5"))
+CB_OPEN_SECONDS = float(os.getenv("CB_OPEN_SECONDS", "30"))
+CB_HALF_OPEN_CALLS = int(os.getenv("CB_HALF_OPEN_CALLS", "1"))
+
+# ===================== 客户端限流配置 =====================
+# Coze 接口配额：接口路径=每秒请求数:突发上限，逗号分隔；"*" 为未单独配置接口的默认配额
+def _parse_rate_limits(value: str) -> dict:
+    limits = {"*": (10.0, 20.0)}
+    for item in value.split(","):
+        if item.strip():
+            path, quota = item.split("=", 1)
+            rate, burst = quota.split(":", 1)
+            limits[path.strip()] = (float(rate), float(burst))
+    return limits
+
+
+COZE_RATE_LIMITS = _parse_rate_limits(os.getenv(
+    "COZE_RATE_LIMITS",
+    "*=10:20,/v3/chat=5:10,/v1/workflow/run=2:5,/v1/files/upload=2:5,/open_api/knowledge/document/create=2:5"
+))
+# 多进程共享配额的 SQLite 文件（留空仅进程内限流）
+RATE_LIMIT_STORE = os.getenv("RATE_LIMIT_STORE", "")
+# 排队等待上限（秒），超过后抛出 RateLimitError
+RATE_LIMIT_MAX_WAIT = float(os.getenv("RATE_LIMIT_MAX_WAIT", "30"))
+
+# ===================== 请求调度配置 =====================
+# 上游请求总并发；各优先级（interactive/default/batch）并发上限；batch 需为高优先级保留的名额数
+SCHEDULER_MAX_CONCURRENCY = int(os.getenv("SCHEDULER_MAX_CONCURRENCY", "16"))
+SCHEDULER_CLASS_LIMITS = {
+    name.strip(): int(limit)
+    for name, limit in (
+        item.split("=", 1) for item in os.getenv(
+            "SCHEDULER_CLASS_LIMITS", "interactive=16,default=8,batch=4"
+        ).split(",") if item.strip()
+    )
+}
+SCHEDULER_RESERVED = int(os.getenv("SCHEDULER_RESERVED", "4"))
+# 排队等待名额的上限（秒），超过后抛出 SchedulerTimeoutError
+SCHEDULER_MAX_WAIT = float(os.getenv("SCHEDULER_MAX_WAIT", "60"))
 COZE_API_TIMEOUT = int(os.getenv("COZE_API_TIMEOUT", "30"))
 COZE_WORKFLOW_TIMEOUT = int(os.getenv("COZE_WORKFLOW_TIMEOUT", "120"))
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 LOG_FILE = os.getenv("LOG_FILE", "wehan_coze.log")
+# 异步日志（队列 + 后台线程写入）
+LOG_ASYNC = os.getenv("LOG_ASYNC", "true").lower() in ("1", "true", "yes")
+# 日志轮转：size 按大小；midnight / H / D 等按时间；留空不轮转
+LOG_ROTATE = os.getenv("LOG_ROTATE", "size")
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+# 高频 INFO 日志保留比例（1 为全部保留，0 为全部丢弃）
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "1"))
+# 日志按 JSON 行输出（结构化事件字段展开为 JSON 字段）
+LOG_JSON = os.getenv("LOG_JSON", "false").lower() in ("1", "true", "yes")
+# 上游 HTTP 连接池大小（每个主机）
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "16"))
+# JSON 序列化后端：auto 已安装 orjson 时使用，否则用标准库 json / orjson / stdlib
+JSON_BACKEND = os.getenv("JSON_BACKEND", "auto").lower()
+
+# ===================== 监控指标配置 =====================
+# Prometheus /metrics 监听地址（默认只监听本机）与端口（0 不启动）；指标文件路径（为空不写）及写出间隔（秒）
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+METRICS_FILE = os.getenv("METRICS_FILE", "")
+METRICS_DUMP_INTERVAL = float(os.getenv("METRICS_DUMP_INTERVAL", "15"))
+
+# ===================== 链路追踪配置 =====================
+# 导出方式：none（不启用）/ file（每个 span 一行 JSON 写入 TRACE_FILE）
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "none").lower()
+TRACE_FILE = os.getenv("TRACE_FILE", os.path.join(PROJECT_ROOT, "traces.jsonl"))
+# 按链路采样的比例（根 span 决定，0~1）
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "1"))
+TRACE_SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "wehan-coze-client")
+
+# ===================== 面试服务配置 =====================
+# 默认只监听本机；对外提供服务时显式设置 SERVER_HOST
+SERVER_HOST = os.getenv("SERVER_HOST", "127.0.0.1")
+SERVER_PORT = int(os.getenv("SERVER_PORT", "8765"))
+# 连接鉴权令牌（客户端以 X-API-Key 请求头或 ?token= 参数携带；未设置时服务拒绝启动）
+SERVER_API_KEY = os.getenv("SERVER_API_KEY", "")
+# 工作进程数（大于 1 时以 SO_REUSEPORT 共享端口）
+SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", "1"))
+# 每个进程的并发会话上限、单场面试最长时长（秒）、下线时等待会话结束的最长时间（秒）
+SERVER_MAX_SESSIONS = int(os.getenv("SERVER_MAX_SESSIONS", "200"))
+SERVER_SESSION_TIMEOUT = float(os.getenv("SERVER_SESSION_TIMEOUT", "1800"))
+SERVER_DRAIN_TIMEOUT = float(os.getenv("SERVER_DRAIN_TIMEOUT", "60"))
+# 客户端单条消息大小上限（字节）
+SERVER_MAX_MESSAGE_BYTES = int(os.getenv("SERVER_MAX_MESSAGE_BYTES", str(1024 * 1024)))
+# 阻塞调用（B 端 / Coze HTTP）线程池大小
+SERVER_THREAD_POOL = int(os.getenv("SERVER_THREAD_POOL", "32"))
+
+# ===================== 问询控制器配置 =====================
+# 进程内多轮问询控制器（question/）：监听地址；B端问询接口地址（快照同步目标）
+QUESTION_SERVER_HOST = os.getenv("QUESTION_SERVER_HOST", "127.0.0.1")
+QUESTION_SERVER_PORT = int(os.getenv("QUESTION_SERVER_PORT", "8766"))
+QUESTION_API_BASE_URL = os.getenv("QUESTION_API_BASE_URL", "http://localhost:3000/api/coze/question").rstrip("/")
+# 内存会话上限（超出时淘汰最久未访问的会话）与有效期（秒，与 B端一致为 init 后 30 分钟）
+QUESTION_MAX_SESSIONS = int(os.getenv("QUESTION_MAX_SESSIONS", "10000"))
+QUESTION_SESSION_TTL = float(os.getenv("QUESTION_SESSION_TTL", "1800"))
+# 快照同步到 B端的间隔（秒，0 不同步）；单个请求体大小上限
+QUESTION_SNAPSHOT_INTERVAL = float(os.getenv("QUESTION_SNAPSHOT_INTERVAL", "5"))
+QUESTION_MAX_BODY_BYTES = int(os.getenv("QUESTION_MAX_BODY_BYTES", str(256 * 1024)))
+
+# ===================== 部署配置 =====================
+# 部署流水线状态文件（记录各步骤内容哈希与输出，用于跳过未变化步骤和断点续跑）
+DEPLOY_STATE_FILE = os.getenv("DEPLOY_STATE_FILE", os.path.join(PROJECT_ROOT, ".deploy_state.json"))
+DEPLOY_MAX_WORKERS = int(os.getenv("DEPLOY_MAX_WORKERS", "4"))
+# 批量 Schema 校验的并发数
+SCHEMA_VALIDATE_WORKERS = int(os.getenv("SCHEMA_VALIDATE_WORKERS", "4"))
+# 智能体上次成功下发的配置（Prompt 无法从线上读取，以此作为差异对比基准）
+BOT_STATE_FILE = os.getenv("BOT_STATE_FILE", os.path.join(PROJECT_ROOT, ".bot_state.json"))
+# 智能体列表缓存：有效期（秒）、磁盘缓存文件（设为空仅使用内存缓存）、分页大小
+BOT_CACHE_TTL = int(os.getenv("BOT_CACHE_TTL", "60"))
+BOT_CACHE_FILE = os.getenv("BOT_CACHE_FILE", os.path.join(PROJECT_ROOT, ".cache", "bots.json"))
+BOT_PAGE_SIZE = int(os.getenv("BOT_PAGE_SIZE", "20"))
+
+# ===================== 本地检索配置 =====================
+# 知识库文档目录（岗位/政策数据）
+KNOWLEDGE_DOCS_DIR = os.getenv("KNOWLEDGE_DOCS_DIR", os.path.join(PROJECT_ROOT, "config", "local", "knowledge_docs"))
+# 索引快照目录（按源数据哈希命名，多进程共享只读）
+KNOWLEDGE_INDEX_DIR = os.getenv("KNOWLEDGE_INDEX_DIR", os.path.join(PROJECT_ROOT, ".index"))
+# 检查知识库文档是否更新的间隔（秒），文档变化后切换到新快照
+KNOWLEDGE_INDEX_CHECK_INTERVAL = float(os.getenv("KNOWLEDGE_INDEX_CHECK_INTERVAL", "30"))
+# 语义检索：sentence-transformers 模型名（留空使用内置特征哈希向量）
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "")
+EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", "256"))
+# 向量索引每次查询探测的桶数量
+ANN_NPROBE = int(os.getenv("ANN_NPROBE", "8"))
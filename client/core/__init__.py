@@ -1,8 +1,19 @@
 # Core module for WeHan C端
+# 异常类型导入开销很小，直接导入；其余成员在首次访问时才加载对应子模块（避免 import core 拉起 jsonschema 等依赖）
 from .exceptions import *
-from .retry import retry
-from .logger import logger
-from .schema_validate import validate_config
+from .lazy import install_lazy
+
+_LAZY = {
+    'retry': 'retry',
+    'retry_async': 'retry',
+    'RetryPolicy': 'retry',
+    'RetryBudget': 'retry',
+    'logger': 'logger',
+    'validate_config': 'schema_validate',
+    'validate_configs': 'schema_validate',
+    'validate_directory': 'schema_validate',
+    'validate_instance': 'schema_validate'
+}
 
 __all__ = [
     'BaseCozeError',
@@ -12,8 +23,22 @@ __all__ = [
     'RateLimitError',
     'AudioFormatError',
     'BApiCallError',
+    'CozeApiCallError',
+    'BApiEnvelopeError',
+    'BApiResponseError',
     'KnowledgeBaseSegmentError',
+    'DeployStepError',
+    'SchedulerTimeoutError',
+    'CircuitOpenError',
     'retry',
+    'retry_async',
+    'RetryPolicy',
+    'RetryBudget',
     'logger',
-    'validate_config'
+    'validate_config',
+    'validate_configs',
+    'validate_directory',
+    'validate_instance'
 ]
+
+install_lazy(globals(), _LAZY)
@@ -0,0 +1,82 @@
+"""
+响应缓存：内存 + 可选磁盘持久化，按 TTL 判断新鲜度，过期条目保留 ETag 供条件请求复验
+
+- 未过期：直接命中，不发请求
+- 已过期但有 ETag：调用方带 If-None-Match 复验，304 时 touch() 续期并复用缓存值
+- 磁盘文件整体原子写入（先写临时文件再替换），进程重启后缓存仍可用
+"""
+import json
+import os
+import threading
+import time
+
+
+class TTLCache:
+    """
+    TTL 缓存
+    :param ttl: 默认有效期（秒）
+    :param path: 磁盘持久化文件路径（为空时仅内存）
+    """
+
+    def __init__(self, ttl: float = 60, path: str = None):
+        self.ttl = ttl
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = self._load() if path else {}
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _flush(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def get(self, key: str, allow_stale: bool = False):
+        """
+        读取缓存条目
+        :param key: 缓存键
+        :param allow_stale: 是否返回已过期条目（用于 ETag 复验）
+        :return: {value, etag, expires_at, fresh} 或 None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+        fresh = entry["expires_at"] > time.time()
+        if not fresh and not allow_stale:
+            return None
+        return {**entry, "fresh": fresh}
+
+    def set(self, key: str, value, etag: str = None, ttl: float = None):
+        """写入缓存条目"""
+        with self._lock:
+            self._entries[key] = {
+                "value": value,
+                "etag": etag,
+                "expires_at": time.time() + (self.ttl if ttl is None else ttl)
+            }
+            self._flush()
+
+    def touch(self, key: str, ttl: float = None):
+        """续期（条件请求返回 304 时调用）"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry["expires_at"] = time.time() + (self.ttl if ttl is None else ttl)
+                self._flush()
+
+    def invalidate(self, prefix: str = ""):
+        """删除以 prefix 开头的条目（默认全部）"""
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+            self._flush()
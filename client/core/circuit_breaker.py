@@ -0,0 +1,206 @@
+"""
+熔断器：按上游接口隔离故障，接口持续失败或变慢时快速失败，避免线程池被超时等待占满
+
+- CLOSED：正常放行，按最近 N 次调用统计失败率与慢调用率
+- OPEN：失败率或慢调用率超过阈值后打开，期间直接抛出 CircuitOpenError（不发请求）
+- HALF_OPEN：打开一段时间后放行少量探测请求，全部成功则关闭，任一失败重新打开
+
+与 core.retry 配合使用时熔断器放在内层（@retry 在上、@circuit_breaker 在下）：
+每次重试都计入统计，熔断打开后 CircuitOpenError 不会被重试。
+"""
+import functools
+import threading
+import time
+from collections import deque
+
+import requests
+
+from config.settings import (
+    CB_FAILURE_RATE, CB_SLOW_CALL_S, CB_SLOW_CALL_RATE,
+    CB_WINDOW_SIZE, CB_MIN_CALLS, CB_OPEN_SECONDS, CB_HALF_OPEN_CALLS
+)
+from core.logger import logger
+from core.metrics import REGISTRY
+from core.exceptions import CircuitOpenError, BApiCallError, CozeApiCallError, RateLimitError
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def is_upstream_failure(exc: Exception) -> bool:
+    """异常是否说明上游故障（参数错误、4xx 等调用方问题不计入失败率）"""
+    if isinstance(exc, (BApiCallError, CozeApiCallError)):
+        return exc.status_code is None or exc.status_code >= 500
+    if isinstance(exc, requests.exceptions.HTTPError) and exc.response is not None:
+        return exc.response.status_code >= 500
+    return isinstance(exc, (requests.exceptions.RequestException, RateLimitError, TimeoutError, ConnectionError))
+
+
+class CircuitBreaker:
+    """
+    单个上游接口的熔断器
+    :param name: 接口标识（如 b_api:/jobs、coze:/v1/workflow/run）
+    :param failure_rate: 失败率阈值（0~1）
+    :param slow_call_s: 慢调用耗时阈值（秒）
+    :param slow_call_rate: 慢调用率阈值（0~1）
+    :param window_size: 统计窗口（最近调用次数）
+    :param min_calls: 窗口内至少多少次调用才开始判断
+    :param open_seconds: 打开状态持续时间（秒），之后进入半开
+    :param half_open_calls: 半开状态放行的探测请求数
+    """
+
+    def __init__(self, name: str, failure_rate: float = CB_FAILURE_RATE, slow_call_s: float = CB_SLOW_CALL_S,
+                 slow_call_rate: float = CB_SLOW_CALL_RATE, window_size: int = CB_WINDOW_SIZE,
+                 min_calls: int = CB_MIN_CALLS, open_seconds: float = CB_OPEN_SECONDS,
+                 half_open_calls: int = CB_HALF_OPEN_CALLS):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.slow_call_s = slow_call_s
+        self.slow_call_rate = slow_call_rate
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+
+        self.state = CLOSED
+        self._window = deque(maxlen=window_size)  # (是否失败, 是否慢调用)
+        self._opened_at = 0.0
+        self._probes = 0
+        self._probe_successes = 0
+        self._rejected = 0
+        self._transitions = 0
+        self._lock = threading.Lock()
+
+    def _transition(self, state: str):
+        if state == self.state:
+            return
+        logger.warning(f"熔断器{self.name}：{self.state} -> {state}")
+        self.state = state
+        self._transitions += 1
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+        elif state == HALF_OPEN:
+            self._probes = self._probe_successes = 0
+        elif state == CLOSED:
+            self._window.clear()
+
+    def allow(self) -> bool:
+        """是否放行本次调用（半开状态下占用一个探测名额）"""
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+                self._transition(HALF_OPEN)
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and self._probes < self.half_open_calls:
+                self._probes += 1
+                return True
+            self._rejected += 1
+            return False
+
+    def retry_after(self) -> float:
+        """距离进入半开状态的剩余秒数"""
+        return max(0.0, self.open_seconds - (time.monotonic() - self._opened_at))
+
+    def record(self, failed: bool, elapsed: float):
+        """记录一次调用结果"""
+        slow = elapsed >= self.slow_call_s
+        with self._lock:
+            if self.state == HALF_OPEN:
+                if failed or slow:
+                    self._transition(OPEN)
+                else:
+                    self._probe_successes += 1
+                    if self._probe_successes >= self.half_open_calls:
+                        self._transition(CLOSED)
+                return
+            if self.state != CLOSED:
+                return
+
+            self._window.append((failed, slow))
+            calls = len(self._window)
+            if calls < self.min_calls:
+                return
+            failures = sum(1 for f, _ in self._window if f)
+            slows = sum(1 for _, s in self._window if s)
+            if failures / calls >= self.failure_rate or slows / calls >= self.slow_call_rate:
+                self._transition(OPEN)
+
+    def call(self, func, *args, **kwargs):
+        """通过熔断器执行函数"""
+        if not self.allow():
+            raise CircuitOpenError(self.name, self.retry_after())
+        start = time.monotonic()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self.record(is_upstream_failure(e), time.monotonic() - start)
+            raise
+        self.record(False, time.monotonic() - start)
+        return result
+
+    def snapshot(self) -> dict:
+        """当前状态（供监控指标采集）"""
+        with self._lock:
+            calls = len(self._window)
+            return {
+                "name": self.name,
+                "state": self.state,
+                "calls": calls,
+                "failure_rate": round(sum(1 for f, _ in self._window if f) / calls, 4) if calls else 0.0,
+                "slow_call_rate": round(sum(1 for _, s in self._window if s) / calls, 4) if calls else 0.0,
+                "rejected": self._rejected,
+                "transitions": self._transitions
+            }
+
+
+_breakers = {}
+_registry_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """按接口标识获取熔断器（进程内单例）"""
+    with _registry_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(name)
+        return breaker
+
+
+def breaker_states() -> list:
+    """所有熔断器状态"""
+    with _registry_lock:
+        breakers = list(_breakers.values())
+    return [breaker.snapshot() for breaker in breakers]
+
+
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+def _collect_breakers():
+    states = breaker_states()
+    return [
+        ("wehan_circuit_state", "gauge", "熔断器状态（0 关闭 / 1 半开 / 2 打开）",
+         [({"name": item["name"]}, _STATE_VALUES[item["state"]]) for item in states]),
+        ("wehan_circuit_failure_rate", "gauge", "熔断器统计窗口内失败率",
+         [({"name": item["name"]}, item["failure_rate"]) for item in states]),
+        ("wehan_circuit_rejected_total", "counter", "熔断打开期间被拒绝的调用数",
+         [({"name": item["name"]}, item["rejected"]) for item in states])
+    ]
+
+
+REGISTRY.register_collector(_collect_breakers)
+
+
+def circuit_breaker(name: str):
+    """
+    熔断装饰器
+    :param name: 接口标识（同名接口共享同一熔断器）
+    """
+    def decorator(func):
+        breaker = get_breaker(name)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return breaker.call(func, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -22,9 +22,11 @@ class ParameterError(BaseCozeError):
         super().__init__(f"参数{param_name}格式/类型错误或缺失")
 
 class RateLimitError(BaseCozeError):
-    """API限流"""
-    def __init__(self):
-        super().__init__("API调用频率超限，请稍后重试")
+    """API限流（retry_after 为服务端 Retry-After 指定的等待秒数）"""
+    def __init__(self, retry_after=None):
+        self.retry_after = retry_after
+        suffix = f"（{retry_after:.0f}秒后）" if retry_after is not None else ""
+        super().__init__(f"API调用频率超限，请稍后{suffix}重试")
 
 class AudioFormatError(BaseCozeError):
     """音频格式错误"""
@@ -34,9 +36,50 @@ class AudioFormatError(BaseCozeError):
 class BApiCallError(BaseCozeError):
     """B端API调用失败"""
     def __init__(self, api_path, status_code):
+        self.status_code = status_code
         super().__init__(f"B端API调用失败：{api_path}，状态码{status_code}")
 
+class CozeApiCallError(BaseCozeError):
+    """Coze API返回非 200 状态码（5xx 计入熔断失败率）"""
+    def __init__(self, api_path, status_code, detail=None):
+        self.status_code = status_code
+        suffix = f" - {detail}" if detail else ""
+        super().__init__(f"Coze API调用失败：{api_path}，状态码{status_code}{suffix}")
+
+class BApiEnvelopeError(BaseCozeError):
+    """B端API返回 success=false 或缺少 data（多为B端临时故障，可重试）"""
+    def __init__(self, api_path, error=None):
+        self.error = error
+        super().__init__(f"B端API返回失败：{api_path}，{error or '缺少 success/data 字段'}")
+
+class BApiResponseError(BaseCozeError):
+    """B端API响应不符合约定的结构（errors 为 Schema 校验错误列表）"""
+    def __init__(self, api_path, errors):
+        self.errors = errors
+        super().__init__(f"B端API响应格式错误：{api_path}，{'；'.join(errors)}")
+
 class KnowledgeBaseSegmentError(BaseCozeError):
     """知识库分段错误"""
     def __init__(self, msg="知识库分段大小不合理（建议500-1000字/段）"):
         super().__init__(msg)
+
+class DeployStepError(BaseCozeError):
+    """部署流水线步骤失败"""
+    def __init__(self, steps, state_path):
+        self.steps = steps
+        super().__init__(f"部署步骤失败：{', '.join(steps)}，修复后重新运行将从失败处继续（状态文件：{state_path}）")
+
+class SchedulerTimeoutError(BaseCozeError):
+    """请求调度排队超时（上游并发名额长时间被占满）"""
+    def __init__(self, priority, waited):
+        self.priority = priority
+        self.waited = waited
+        super().__init__(f"请求调度排队{waited:.1f}秒仍未获得名额（优先级{priority}）")
+
+class CircuitOpenError(BaseCozeError):
+    """熔断器打开，快速失败（不发请求）"""
+    def __init__(self, name, retry_after=None):
+        self.name = name
+        self.retry_after = retry_after
+        suffix = f"，{retry_after:.0f}秒后探测恢复" if retry_after is not None else ""
+        super().__init__(f"上游接口{name}熔断中{suffix}")
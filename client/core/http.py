@@ -0,0 +1,140 @@
+"""
+HTTP 客户端：client/api 与 client/coze 共用的连接池会话，所有上游请求的统一埋点位置
+
+- 连接复用：按主机保持连接池（HTTP_POOL_SIZE），避免每次请求重新握手
+- 请求关联：request_context() 设置的 request_id / user_id 通过 contextvar 传递
+  （asyncio 任务自动继承；线程池中需用 contextvars.copy_context().run 传递），
+  request_id 以 X-Request-Id 请求头发往上游，一次对话涉及的 Coze 与 B 端请求可按同一 ID 关联
+- 链路追踪：每个请求创建 client span，并以 W3C traceparent 请求头发往上游（core.tracing）
+- 指标：按接口统计请求数（含状态码/异常名）与耗时直方图（core.metrics）
+- 结构化事件：每个请求结束后记录一条 http 事件（request_id, trace_id, user_id, method, endpoint, status,
+  latency_ms, bytes, error），级别被过滤时不构造事件，序列化在日志后台线程进行
+- JSON：json= 请求体由 core.serializer 编码（可传入预先编码的 JsonBody，重试时复用），
+  响应用 response_json() 解析，代替 requests 内置的标准库 json
+"""
+import contextvars
+import logging
+import time
+import uuid
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config.settings import HTTP_POOL_SIZE
+from core.logger import event_logger, log_event
+from core.metrics import counter, histogram
+from core.serializer import JsonBody, dumps, loads
+from core.tracing import start_span, inject
+
+HTTP_REQUESTS = counter("wehan_http_requests_total", "上游 HTTP 请求数", ("endpoint", "method", "status"))
+HTTP_DURATION = histogram("wehan_http_request_duration_seconds", "上游 HTTP 请求耗时（流式请求为首包耗时）", ("endpoint",))
+
+request_id_var = contextvars.ContextVar("request_id", default=None)
+user_id_var = contextvars.ContextVar("user_id", default=None)
+
+
+def new_request_id() -> str:
+    return uuid.uuid4().hex
+
+
+@contextmanager
+def request_context(user_id: str = None, request_id: str = None):
+    """
+    设置当前请求上下文（如一轮对话），上下文内的所有上游请求共享同一 request_id
+    :param user_id: 用户ID
+    :param request_id: 请求ID（为空时沿用外层上下文，没有外层时新生成）
+    :return: request_id
+    """
+    request_id = request_id or request_id_var.get() or new_request_id()
+    id_token = request_id_var.set(request_id)
+    user_token = user_id_var.set(user_id or user_id_var.get())
+    try:
+        yield request_id
+    finally:
+        user_id_var.reset(user_token)
+        request_id_var.reset(id_token)
+
+
+class InstrumentedSession(requests.Session):
+    """带请求关联与事件埋点的会话（额外参数 endpoint 可指定聚合用的接口名，默认取 URL 路径）"""
+
+    def request(self, method, url, *args, endpoint: str = None, **kwargs):
+        request_id = request_id_var.get() or new_request_id()
+        headers = kwargs.get("headers")
+        kwargs["headers"] = {**(headers or {}), "X-Request-Id": request_id}
+        body = kwargs.pop("json", None)
+        if body is not None and kwargs.get("data") is None:
+            kwargs["data"] = body.data if isinstance(body, JsonBody) else dumps(body)
+            kwargs["headers"].setdefault("Content-Type", "application/json")
+        endpoint = endpoint or urlsplit(url).path
+
+        start = time.perf_counter()
+        response, error = None, None
+        span = start_span(f"{method.upper()} {endpoint}", kind="client",
+                          attributes={"http.method": method.upper(), "http.url": url})
+        try:
+            with span:
+                inject(kwargs["headers"], span)
+                response = super().request(method, url, *args, **kwargs)
+                span.set_attribute("http.status_code", response.status_code)
+                if response.status_code >= 500:
+                    span.set_status(False, f"HTTP {response.status_code}")
+            return response
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            status = response.status_code if response is not None else type(error).__name__
+            HTTP_REQUESTS.labels(endpoint, method.upper(), status).inc()
+            HTTP_DURATION.labels(endpoint).observe(elapsed)
+            if event_logger.isEnabledFor(logging.INFO):
+                log_event(
+                    "http",
+                    request_id=request_id,
+                    trace_id=span.trace_id,
+                    user_id=user_id_var.get(),
+                    method=method.upper(),
+                    endpoint=endpoint,
+                    status=response.status_code if response is not None else None,
+                    latency_ms=round(elapsed * 1000, 2),
+                    bytes=_response_bytes(response, kwargs.get("stream")),
+                    error=type(error).__name__ if error is not None else None
+                )
+
+
+def response_json(response):
+    """
+    解析 JSON 响应（代替 response.json()，经 core.serializer 解析）
+    :param response: 响应对象
+    :return: 解析结果；格式错误时与 response.json() 一样抛出 requests.exceptions.JSONDecodeError
+    """
+    try:
+        return loads(response.content)
+    except ValueError as e:
+        raise requests.exceptions.JSONDecodeError(getattr(e, "msg", str(e)), getattr(e, "doc", ""),
+                                                  getattr(e, "pos", 0))
+
+
+def _response_bytes(response, stream: bool):
+    if response is None:
+        return None
+    length = response.headers.get("Content-Length")
+    if length is not None:
+        return int(length)
+    # 流式响应未读取前无法得知长度
+    return None if stream else len(response.content)
+
+
+def _build_session() -> InstrumentedSession:
+    session = InstrumentedSession()
+    adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+# 进程内共享会话（requests.Session 的连接池线程安全，可在线程池中共用）
+http = _build_session()
@@ -0,0 +1,33 @@
+"""
+包成员延迟加载：包 __init__ 只声明 {成员名: 子模块名}，成员在首次访问时才导入对应子模块
+
+- 访问过的成员写回包命名空间，之后不再经过 __getattr__
+- 子模块本身同样按需导入（import api 后可直接访问 api.jobs）
+"""
+import importlib
+import importlib.util
+
+
+def install_lazy(namespace: dict, mapping: dict):
+    """
+    为包安装模块级 __getattr__ / __dir__
+    :param namespace: 包 __init__ 的 globals()
+    :param mapping: {成员名: 子模块名（相对包名）}
+    """
+    package = namespace["__name__"]
+
+    def __getattr__(name):
+        if name in mapping:
+            value = getattr(importlib.import_module(f".{mapping[name]}", package), name)
+        elif not name.startswith("__") and importlib.util.find_spec(f"{package}.{name}") is not None:
+            value = importlib.import_module(f".{name}", package)
+        else:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        namespace[name] = value
+        return value
+
+    def __dir__():
+        return sorted(set(namespace) | set(namespace.get("__all__", ())))
+
+    namespace["__getattr__"] = __getattr__
+    namespace["__dir__"] = __dir__
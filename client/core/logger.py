@@ -1,22 +1,200 @@
 """
 日志配置：统一日志格式和输出
+
+- 异步模式（LOG_ASYNC，默认开启）：业务线程只把日志记录放入内存队列（QueueHandler），
+  由后台线程（QueueListener）写文件和控制台，热路径上不做阻塞 I/O；进程退出时自动刷新
+- 日志文件按大小（LOG_ROTATE=size）或时间（LOG_ROTATE=midnight / H / D 等）轮转
+- 高频 INFO 日志可采样：调用时传 extra=SAMPLED，按 LOG_SAMPLE_RATE 比例保留（按消息模板计数，确定性采样）
+- 热路径请使用 %s 占位符（logger.info("会话%s已存储", conversation_id)）：级别被过滤时不做字符串格式化，
+  异步模式下格式化也在后台线程进行（因此参数不要传之后会被修改的可变对象）
+- 结构化事件：log_event("http", user_id=..., latency_ms=...) 记录 JSON 事件（wehan_coze.events）；
+  LOG_JSON=true 时所有日志均按 JSON 行输出，便于按字段聚合
+- 延迟初始化：导入时只设置日志级别，文件/控制台 handler 与后台线程在第一条日志输出时才创建，
+  不写日志的短命令和 worker 不承担这部分启动开销（也可显式调用 setup_logging()）
 """
+import atexit
+import json
 import logging
+import queue
 import sys
-from pathlib import Path
-
-# 确保日志目录存在
-log_file = Path("wehan_coze.log")
-
-# 配置日志
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler(log_file, encoding="utf-8"),
-        logging.StreamHandler(sys.stdout)  # 同时输出到控制台
-    ]
+import threading
+
+from config.settings import (
+    LOG_LEVEL, LOG_FILE, LOG_ASYNC, LOG_ROTATE, LOG_MAX_BYTES, LOG_BACKUP_COUNT, LOG_SAMPLE_RATE, LOG_JSON
 )
 
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# 高频日志标记：logger.info("...", extra=SAMPLED)
+SAMPLED = {"sampled": True}
+
+
+class SamplingFilter(logging.Filter):
+    """
+    高频日志采样：带 sampled 标记的 INFO 及以下日志，每个消息模板每 1/rate 条保留 1 条
+    （WARNING 及以上始终保留）
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.every = max(1, round(1 / rate)) if rate > 0 else 0
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO or not getattr(record, "sampled", False):
+            return True
+        if self.every == 0:
+            return False
+        key = record.msg if isinstance(record.msg, str) else type(record.msg).__name__
+        with self._lock:
+            count = self._counts.get(key, 0)
+            self._counts[key] = count + 1
+        return count % self.every == 0
+
+
+class _JsonEvent:
+    """结构化事件消息：记录时只保存字段，输出时才序列化为 JSON"""
+    __slots__ = ("name", "fields")
+
+    def __init__(self, name: str, fields: dict):
+        self.name = name
+        self.fields = fields
+
+    def as_dict(self) -> dict:
+        return {"event": self.name, **self.fields}
+
+    def __str__(self) -> str:
+        return json.dumps(self.as_dict(), ensure_ascii=False, default=str)
+
+
+class JsonFormatter(logging.Formatter):
+    """JSON 行格式：{ts, level, logger, message} 或 {ts, level, logger, event, ...事件字段}"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name
+        }
+        if isinstance(record.msg, _JsonEvent):
+            data.update(record.msg.as_dict())
+        else:
+            data["message"] = record.getMessage()
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class _DeferredQueueHandler(logging.Handler):
+    """
+    进程内队列无需序列化：原样入队，消息格式化推迟到后台线程
+    （等价于 prepare 不做处理的 logging.handlers.QueueHandler，避免导入时加载 logging.handlers）
+    """
+
+    def __init__(self, record_queue):
+        super().__init__()
+        self.queue = record_queue
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except Exception:
+            self.handleError(record)
+
+
+def _file_handler() -> logging.Handler:
+    from logging.handlers import RotatingFileHandler, TimedRotatingFileHandler
+
+    if LOG_ROTATE == "size":
+        return RotatingFileHandler(
+            LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding="utf-8", delay=True
+        )
+    if LOG_ROTATE:
+        return TimedRotatingFileHandler(
+            LOG_FILE, when=LOG_ROTATE, backupCount=LOG_BACKUP_COUNT, encoding="utf-8", delay=True
+        )
+    return logging.FileHandler(LOG_FILE, encoding="utf-8", delay=True)
+
+
+def build_handlers() -> list:
+    """实际输出的 handler：文件（可轮转）+ 控制台"""
+    formatter = JsonFormatter() if LOG_JSON else logging.Formatter(LOG_FORMAT)
+    handlers = [_file_handler(), logging.StreamHandler(sys.stdout)]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    return handlers
+
+
+# 后台写日志的 QueueListener（setup_logging 之后可用，同步模式为 None）
+listener = None
+_setup_lock = threading.RLock()
+_configured = False
+
+
+def setup_logging(async_mode: bool = LOG_ASYNC):
+    """
+    配置根日志（第一条日志输出时自动调用，只生效一次）
+    :param async_mode: 是否使用队列 + 后台线程写日志
+    :return: 根日志上新增的 handler 列表
+    """
+    global listener, _configured
+    root = logging.getLogger()
+    with _setup_lock:
+        if _configured:
+            return [handler for handler in root.handlers if not isinstance(handler, _BootstrapHandler)]
+        _configured = True
+        sampler = SamplingFilter(LOG_SAMPLE_RATE)
+        handlers = build_handlers()
+
+        if async_mode:
+            from logging.handlers import QueueListener
+
+            # 采样在入队前进行，被丢弃的记录不占队列
+            queue_handler = _DeferredQueueHandler(queue.SimpleQueue())
+            queue_handler.addFilter(sampler)
+            listener = QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+            listener.start()
+            atexit.register(listener.stop)
+            installed = [queue_handler]
+        else:
+            for handler in handlers:
+                handler.addFilter(sampler)
+            installed = handlers
+
+        # 整体替换 handler 列表（而非原地修改），正在遍历旧列表的 callHandlers 不受影响
+        root.handlers = [handler for handler in root.handlers if not isinstance(handler, _BootstrapHandler)] + installed
+        return installed
+
+
+class _BootstrapHandler(logging.Handler):
+    """导入时挂在根日志上的占位 handler：收到第一条记录时完成 setup_logging，并把该记录转交给正式 handler"""
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        for handler in setup_logging():
+            if record.levelno >= handler.level:
+                handler.handle(record)
+        return True
+
+    def emit(self, record: logging.LogRecord):
+        pass
+
+
+logging.getLogger().setLevel(getattr(logging, str(LOG_LEVEL).upper(), logging.INFO))
+logging.getLogger().addHandler(_BootstrapHandler())
+
 # 全局logger实例
 logger = logging.getLogger("wehan_coze")
+# 结构化事件logger
+event_logger = logging.getLogger("wehan_coze.events")
+
+
+def log_event(name: str, level: int = logging.INFO, **fields):
+    """
+    记录结构化事件（级别被过滤时直接返回）
+    :param name: 事件名（如 http）
+    :param level: 日志级别
+    :param fields: 事件字段
+    """
+    if event_logger.isEnabledFor(level):
+        event_logger.log(level, _JsonEvent(name, fields))
@@ -0,0 +1,375 @@
+"""
+轻量指标：计数器 / 仪表 / 固定分桶直方图，Prometheus 文本格式导出
+
+- 低竞争更新：每个线程写自己的分片（threading.local），采集时汇总，更新路径无锁；
+  线程退出时其分片并入基础分片，分片数只随存活线程数增长
+- 带标签指标先 .labels(...) 取子指标（按标签值缓存），热路径上可提前取好子指标复用
+- 自动埋点：instrument_module / instrument_class 为 client/api 函数与 Coze* 类的公开方法统计
+  调用次数、异常次数与耗时，并创建同名追踪 span（core.tracing）；上游 HTTP 请求在 core.http 中统一统计
+- 导出：start_exporter() 按配置启动 /metrics HTTP 端口（METRICS_HOST:METRICS_PORT）和/或定期写文件（METRICS_FILE）
+"""
+import bisect
+import functools
+import inspect
+import os
+import threading
+import time
+import weakref
+
+from config.settings import METRICS_HOST, METRICS_PORT, METRICS_FILE, METRICS_DUMP_INTERVAL
+from core.tracing import start_span
+
+# 默认耗时分桶（秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class _ShardOwner:
+    """线程分片的存活标记：随线程的 threading.local 一起释放，释放时触发分片回收"""
+    __slots__ = ("__weakref__",)
+
+
+class _Sharded:
+    """按线程分片的计数数组（已退出线程的分片并入基础分片）"""
+
+    def __init__(self, size: int):
+        self._size = size
+        self._local = threading.local()
+        self._base = [0.0] * size
+        self._shards = {}
+        self._lock = threading.Lock()
+
+    def shard(self) -> list:
+        try:
+            return self._local.cells
+        except AttributeError:
+            cells = [0.0] * self._size
+            owner = _ShardOwner()
+            with self._lock:
+                self._shards[id(cells)] = cells
+            weakref.finalize(owner, self._retire, cells)
+            self._local.owner = owner
+            self._local.cells = cells
+            return cells
+
+    def _retire(self, cells: list):
+        """线程退出：分片计数并入基础分片"""
+        with self._lock:
+            if self._shards.pop(id(cells), None) is not None:
+                self._base = [a + b for a, b in zip(self._base, cells)]
+
+    def totals(self) -> list:
+        with self._lock:
+            shards = [self._base, *self._shards.values()]
+        return [sum(values) for values in zip(*shards)]
+
+class Counter:
+    """单调递增计数器（指标名需以 _total 结尾）"""
+    type = "counter"
+
+    def __init__(self):
+        self._cells = _Sharded(1)
+
+    def inc(self, amount: float = 1.0):
+        self._cells.shard()[0] += amount
+
+    def samples(self, name: str, labels: str):
+        yield f"{name}{labels}", self._cells.totals()[0]
+
+
+class Gauge:
+    """可增可减的瞬时值（set 覆盖，inc/dec 累加）"""
+    type = "gauge"
+
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def set(self, value: float):
+        self._value = value
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.inc(-amount)
+
+    def samples(self, name: str, labels: str):
+        yield f"{name}{labels}", self._value
+
+
+class Histogram:
+    """固定分桶直方图"""
+    type = "histogram"
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        # 各桶计数 + 溢出桶 + sum
+        self._cells = _Sharded(len(self.buckets) + 2)
+        self._sum_index = len(self.buckets) + 1
+
+    def observe(self, value: float):
+        cells = self._cells.shard()
+        cells[bisect.bisect_left(self.buckets, value)] += 1
+        cells[self._sum_index] += value
+
+    def time(self):
+        """计时上下文：with histogram.time(): ..."""
+        return _Timer(self)
+
+    def samples(self, name: str, labels: str):
+        totals = self._cells.totals()
+        cumulative = 0.0
+        prefix = labels[1:-1] + "," if labels else ""
+        for bound, count in zip(self.buckets + (float("inf"),), totals):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            yield f'{name}_bucket{{{prefix}le="{le}"}}', cumulative
+        yield f"{name}_sum{labels}", totals[self._sum_index]
+        yield f"{name}_count{labels}", cumulative
+
+
+class _Timer:
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram: Histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start)
+
+
+class Metric:
+    """
+    指标族（同名、不同标签值的一组指标）
+    :param name: 指标名
+    :param help: 说明
+    :param kind: Counter / Gauge / Histogram
+    :param labelnames: 标签名
+    :param kwargs: 传给子指标的参数（如直方图 buckets）
+    """
+
+    def __init__(self, name: str, help: str, kind, labelnames=(), **kwargs):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.labelnames = tuple(labelnames)
+        self._kwargs = kwargs
+        self._children = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._default = self._children[()] = kind(**kwargs)
+
+    def labels(self, *values, **kwargs):
+        """取子指标（按标签值缓存）"""
+        key = values or tuple(kwargs[name] for name in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self.kind(**self._kwargs))
+        return child
+
+    def __getattr__(self, item):
+        # 无标签指标直接调用 inc / set / observe
+        if item.startswith("_") or self.labelnames:
+            raise AttributeError(item)
+        return getattr(self._default, item)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind.type}"]
+        for key, child in list(self._children.items()):
+            labels = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, key))
+            for sample, value in child.samples(self.name, f"{{{labels}}}" if labels else ""):
+                lines.append(f"{sample} {_format(value)}")
+        return lines
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Registry:
+    """指标注册表"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def register(self, name: str, help: str, kind, labelnames=(), **kwargs) -> Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = Metric(name, help, kind, labelnames, **kwargs)
+            return metric
+
+    def register_collector(self, collector):
+        """
+        注册采集回调（导出时调用），返回 [(指标名, 类型, 说明, [(标签字典, 值)])]
+        用于熔断器、调度器等自身已维护状态的组件
+        """
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Prometheus 文本格式"""
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            lines.extend(metric.render())
+        for collector in list(self._collectors):
+            for name, kind, help, samples in collector():
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    label_text = ",".join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+                    lines.append(f"{name}{{{label_text}}} {_format(value)}" if label_text else f"{name} {_format(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def counter(name: str, help: str, labelnames=()) -> Metric:
+    return REGISTRY.register(name, help, Counter, labelnames)
+
+
+def gauge(name: str, help: str, labelnames=()) -> Metric:
+    return REGISTRY.register(name, help, Gauge, labelnames)
+
+
+def histogram(name: str, help: str, labelnames=(), buckets=DEFAULT_BUCKETS) -> Metric:
+    return REGISTRY.register(name, help, Histogram, labelnames, buckets=buckets)
+
+
+# ===================== 自动埋点 =====================
+
+CALLS = counter("wehan_calls_total", "client/api 函数与 Coze 方法调用次数", ("function",))
+CALL_ERRORS = counter("wehan_call_errors_total", "client/api 函数与 Coze 方法异常次数", ("function", "exception"))
+CALL_DURATION = histogram("wehan_call_duration_seconds", "client/api 函数与 Coze 方法耗时", ("function",))
+
+
+def instrumented(func, name: str = None):
+    """为函数增加调用次数、异常次数与耗时统计及追踪 span（同步/协程均可）"""
+    if getattr(func, "__instrumented__", False):
+        return func
+    name = name or f"{func.__module__}.{func.__qualname__}"
+    calls, duration = CALLS.labels(name), CALL_DURATION.labels(name)
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            calls.inc()
+            start = time.perf_counter()
+            try:
+                with start_span(name):
+                    return await func(*args, **kwargs)
+            except Exception as e:
+                CALL_ERRORS.labels(name, type(e).__name__).inc()
+                raise
+            finally:
+                duration.observe(time.perf_counter() - start)
+        async_wrapper.__instrumented__ = True
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        calls.inc()
+        start = time.perf_counter()
+        try:
+            with start_span(name):
+                return func(*args, **kwargs)
+        except Exception as e:
+            CALL_ERRORS.labels(name, type(e).__name__).inc()
+            raise
+        finally:
+            duration.observe(time.perf_counter() - start)
+    wrapper.__instrumented__ = True
+    return wrapper
+
+
+def instrument_module(module):
+    """为模块中定义的所有公开函数埋点（替换模块属性，需在其他模块 from-import 之前调用）"""
+    for attr, value in list(vars(module).items()):
+        if not attr.startswith("_") and inspect.isfunction(value) and value.__module__ == module.__name__:
+            setattr(module, attr, instrumented(value))
+    return module
+
+
+def instrument_class(cls):
+    """为类的所有公开方法埋点（可作类装饰器使用；静态方法/类方法/生成器方法不处理）"""
+    for attr, value in list(vars(cls).items()):
+        if attr.startswith("_") or not inspect.isfunction(value) or \
+                inspect.isgeneratorfunction(value) or inspect.isasyncgenfunction(value):
+            continue
+        setattr(cls, attr, instrumented(value, f"{cls.__name__}.{attr}"))
+    return cls
+
+
+# ===================== 导出 =====================
+
+def _metrics_handler():
+    """/metrics 请求处理类（用到时才导入 http.server）"""
+    from http.server import BaseHTTPRequestHandler
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = REGISTRY.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return MetricsHandler
+
+
+def dump_metrics(path: str = METRICS_FILE):
+    """写出 Prometheus 文本文件（原子替换，可供 node_exporter textfile 采集）"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(REGISTRY.render())
+    os.replace(tmp_path, path)
+
+
+_exporter_started = False
+
+
+def start_exporter(port: int = METRICS_PORT, path: str = METRICS_FILE, interval: float = METRICS_DUMP_INTERVAL,
+                   host: str = METRICS_HOST):
+    """
+    启动指标导出（进程内只启动一次）
+    :param port: /metrics HTTP 端口（0 不启动）
+    :param path: 定期写出的文件路径（为空不写）
+    :param interval: 写文件间隔（秒）
+    :param host: /metrics 监听地址
+    """
+    global _exporter_started
+    if _exporter_started:
+        return
+    _exporter_started = True
+    if port:
+        from http.server import ThreadingHTTPServer
+
+        server = ThreadingHTTPServer((host, port), _metrics_handler())
+        threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    if path:
+        def loop():
+            while True:
+                time.sleep(interval)
+                dump_metrics(path)
+        threading.Thread(target=loop, name="metrics-dump", daemon=True).start()
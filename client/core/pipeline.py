@@ -0,0 +1,177 @@
+"""
+部署流水线引擎：按依赖关系并发执行步骤，内容未变化的步骤跳过，失败后可断点续跑
+
+- 步骤之间是 DAG：依赖全部成功后才执行，无依赖关系的步骤在有界线程池中并发执行
+- 每个步骤的指纹 = 输入文件内容哈希 + 配置参数 + 上游步骤输出；指纹与状态文件记录一致则跳过并复用上次输出
+- 每个步骤完成后立即写入状态文件，失败后重新运行时已成功的步骤自动跳过，从失败处继续
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from core.logger import logger
+from core.exceptions import DeployStepError
+
+
+def load_state(path: str) -> dict:
+    """
+    读取流水线状态文件（不存在或损坏时返回空状态）
+    :param path: 状态文件路径
+    :return: {"steps": {步骤名: 记录}}
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"steps": {}}
+
+
+class Step:
+    """
+    流水线步骤
+    :param name: 步骤名称（唯一）
+    :param func: 执行函数 func(ctx) -> 输出（需可 JSON 序列化），ctx 为 {上游步骤名: 输出}
+    :param deps: 依赖的步骤名列表
+    :param inputs: 输入文件路径列表（内容参与指纹计算）
+    :param params: 影响步骤结果的配置值（如 KNOWLEDGE_ID，参与指纹计算，需可 JSON 序列化）
+    :param always_run: 是否每次都执行（忽略指纹）
+    """
+
+    def __init__(self, name: str, func, deps=(), inputs=(), params: dict = None, always_run: bool = False):
+        self.name = name
+        self.func = func
+        self.deps = list(deps)
+        self.inputs = list(inputs)
+        self.params = dict(params or {})
+        self.always_run = always_run
+
+    def fingerprint(self, ctx: dict) -> str:
+        """计算步骤指纹"""
+        digest = hashlib.sha256(self.name.encode("utf-8"))
+        for path in sorted(self.inputs):
+            digest.update(path.encode("utf-8") + b"\0")
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 16), b""):
+                    digest.update(chunk)
+        if self.params:
+            digest.update(json.dumps(self.params, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8"))
+        digest.update(json.dumps(ctx, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8"))
+        return digest.hexdigest()
+
+
+class Pipeline:
+    """
+    流水线
+    :param steps: 步骤列表
+    :param state_path: 状态文件路径
+    :param max_workers: 最大并发数
+    """
+
+    def __init__(self, steps: list, state_path: str, max_workers: int = 4):
+        self.steps = {step.name: step for step in steps}
+        self.state_path = state_path
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+
+        for step in steps:
+            for dep in step.deps:
+                if dep not in self.steps:
+                    raise ValueError(f"步骤{step.name}依赖的步骤{dep}不存在")
+        self._check_acyclic()
+
+    def _check_acyclic(self):
+        visiting, done = set(), set()
+
+        def visit(name):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"步骤依赖存在环：{name}")
+            visiting.add(name)
+            for dep in self.steps[name].deps:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.steps:
+            visit(name)
+
+    def load_state(self) -> dict:
+        """读取状态文件（不存在或损坏时返回空状态）"""
+        return load_state(self.state_path)
+
+    def _save_state(self, state: dict):
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def _run_step(self, step: Step, ctx: dict, state: dict):
+        """执行单个步骤（线程池中调用），返回 (输出, 是否跳过)"""
+        fingerprint = step.fingerprint(ctx)
+        record = state["steps"].get(step.name, {})
+        if not step.always_run and record.get("status") == "done" and record.get("fingerprint") == fingerprint:
+            logger.info(f"[SKIP] {step.name}：内容未变化")
+            return record.get("output"), True
+
+        start = time.perf_counter()
+        logger.info(f"[RUN] {step.name}")
+        output = step.func(ctx)
+        with self._lock:
+            state["steps"][step.name] = {
+                "status": "done",
+                "fingerprint": fingerprint,
+                "output": output,
+                "finished_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "elapsed_s": round(time.perf_counter() - start, 3)
+            }
+            self._save_state(state)
+        logger.info(f"[OK] {step.name}（{time.perf_counter() - start:.2f}s）")
+        return output, False
+
+    def run(self, force: bool = False) -> dict:
+        """
+        执行流水线
+        :param force: 忽略状态文件，全部重新执行
+        :return: {步骤名: 输出}
+        :raises DeployStepError: 有步骤失败时（已成功的步骤状态已保存，可重新运行续跑）
+        """
+        state = {"steps": {}} if force else self.load_state()
+        outputs, failed, skipped = {}, {}, set()
+        pending = dict(self.steps)
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while pending or running:
+                for name, step in list(pending.items()):
+                    if any(dep in failed or dep in skipped for dep in step.deps):
+                        # 上游失败：下游不再执行
+                        skipped.add(name)
+                        del pending[name]
+                        logger.warning(f"[BLOCKED] {name}：上游步骤失败")
+                    elif all(dep in outputs for dep in step.deps):
+                        ctx = {dep: outputs[dep] for dep in step.deps}
+                        running[pool.submit(self._run_step, step, ctx, state)] = name
+                        del pending[name]
+
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        outputs[name], _ = future.result()
+                    except Exception as e:
+                        failed[name] = str(e)
+                        logger.error(f"[FAIL] {name}：{e}")
+                        with self._lock:
+                            record = state["steps"].setdefault(name, {})
+                            record.update(status="failed", error=str(e))
+                            self._save_state(state)
+
+        if failed:
+            raise DeployStepError(list(failed), self.state_path)
+        return outputs
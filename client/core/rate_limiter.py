@@ -0,0 +1,247 @@
+"""
+客户端限流：在请求发出前按接口配额排队，避免触发 Coze 429
+
+- 令牌桶：每个接口按 rate（每秒令牌数）补充，最多积累 burst 个
+- 公平排队：同一接口的等待者按用户轮转取令牌，单个用户大量请求不会饿死其他用户
+- 同步 acquire 与协程 acquire_async 共用同一个桶
+- 多进程模式：配置 RATE_LIMIT_STORE 后令牌桶状态保存在本地 SQLite 文件中，
+  同一台机器上的所有进程共享配额（公平排队在进程内进行）
+- 等待超过 RATE_LIMIT_MAX_WAIT 时抛出 RateLimitError（带 retry_after，交给 core.retry 处理）
+"""
+import asyncio
+import functools
+import inspect
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+
+from config.settings import COZE_RATE_LIMITS, RATE_LIMIT_STORE, RATE_LIMIT_MAX_WAIT
+from core.exceptions import RateLimitError
+
+
+class LocalBucket:
+    """进程内令牌桶"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self, tokens: float = 1) -> float:
+        """
+        尝试取出令牌
+        :return: 0 表示已取出，否则为还需等待的秒数
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+
+class SqliteBucket:
+    """
+    多进程共享令牌桶（状态保存在本地 SQLite 文件，BEGIN IMMEDIATE 保证原子性）
+    :param path: SQLite 文件路径
+    :param name: 桶名称（接口标识）
+    """
+
+    def __init__(self, path: str, name: str, rate: float, burst: float):
+        self.path = path
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("CREATE TABLE IF NOT EXISTS buckets (name TEXT PRIMARY KEY, tokens REAL, updated REAL)")
+        conn.execute("INSERT OR IGNORE INTO buckets VALUES (?, ?, ?)", (name, burst, time.time()))
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def take(self, tokens: float = 1) -> float:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            stored, updated = conn.execute("SELECT tokens, updated FROM buckets WHERE name = ?",
+                                           (self.name,)).fetchone()
+            # 跨进程只能使用墙上时钟
+            now = time.time()
+            available = min(self.burst, stored + max(0.0, now - updated) * self.rate)
+            wait = 0.0
+            if available >= tokens:
+                available -= tokens
+            else:
+                wait = (tokens - available) / self.rate
+            conn.execute("UPDATE buckets SET tokens = ?, updated = ? WHERE name = ?", (available, now, self.name))
+            conn.execute("COMMIT")
+            return wait
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+
+class RateLimiter:
+    """
+    单个接口的限流器（令牌桶 + 按用户轮转的公平排队）
+    :param name: 接口标识
+    :param rate: 每秒令牌数
+    :param burst: 桶容量
+    :param store: SQLite 文件路径（为空时仅进程内限流）
+    :param max_wait: 最长等待秒数
+    """
+
+    def __init__(self, name: str, rate: float, burst: float, store: str = None, max_wait: float = RATE_LIMIT_MAX_WAIT):
+        self.name = name
+        self.max_wait = max_wait
+        self.bucket = SqliteBucket(store, name, rate, burst) if store else LocalBucket(rate, burst)
+        self._queues = OrderedDict()  # 用户 -> 等待票据队列，按轮转顺序排列
+        self._cond = threading.Condition()
+
+    def _enqueue(self, user) -> object:
+        ticket = object()
+        with self._cond:
+            self._queues.setdefault(user, deque()).append(ticket)
+        return ticket
+
+    def _dequeue(self, user, ticket, served: bool):
+        queue = self._queues.get(user)
+        if queue is None or ticket not in queue:
+            return
+        queue.remove(ticket)
+        if not queue:
+            del self._queues[user]
+        elif served:
+            # 本轮已服务：该用户排到队尾
+            self._queues.move_to_end(user)
+        self._cond.notify_all()
+
+    def _try_take(self, user, ticket, tokens: float) -> float:
+        """轮到该票据时尝试取令牌；返回 0 表示成功，-1 表示未轮到，否则为令牌补充所需秒数"""
+        with self._cond:
+            head_user = next(iter(self._queues))
+            if head_user != user or self._queues[user][0] is not ticket:
+                return -1.0
+            wait = self.bucket.take(tokens)
+            if wait == 0:
+                self._dequeue(user, ticket, served=True)
+            return wait
+
+    def _check_timeout(self, start: float, wait: float, timeout: float):
+        waited = time.monotonic() - start
+        if waited + max(wait, 0.0) > timeout:
+            raise RateLimitError(retry_after=max(wait, 0.0)) from TimeoutError(
+                f"{self.name}限流排队{waited:.1f}秒仍未获得配额")
+        return waited
+
+    def acquire(self, user=None, tokens: float = 1, timeout: float = None):
+        """
+        阻塞获取配额
+        :param user: 用户标识（公平排队的单位，为空时归入匿名用户）
+        :param tokens: 消耗令牌数
+        :param timeout: 最长等待秒数（默认 max_wait）
+        :raises RateLimitError: 超时
+        """
+        timeout = self.max_wait if timeout is None else timeout
+        ticket = self._enqueue(user)
+        start = time.monotonic()
+        try:
+            while True:
+                wait = self._try_take(user, ticket, tokens)
+                if wait == 0:
+                    return
+                waited = self._check_timeout(start, wait, timeout)
+                with self._cond:
+                    # 未轮到时等待其他票据出队的通知；轮到但令牌不足时等待补充
+                    self._cond.wait(timeout=wait if wait > 0 else min(0.05, timeout - waited))
+        except BaseException:
+            with self._cond:
+                self._dequeue(user, ticket, served=False)
+            raise
+
+    async def acquire_async(self, user=None, tokens: float = 1, timeout: float = None):
+        """协程获取配额（不阻塞事件循环，参数同 acquire）"""
+        timeout = self.max_wait if timeout is None else timeout
+        ticket = self._enqueue(user)
+        start = time.monotonic()
+        try:
+            while True:
+                wait = self._try_take(user, ticket, tokens)
+                if wait == 0:
+                    return
+                self._check_timeout(start, wait, timeout)
+                await asyncio.sleep(wait if wait > 0 else 0.01)
+        except BaseException:
+            with self._cond:
+                self._dequeue(user, ticket, served=False)
+            raise
+
+    def pending(self) -> dict:
+        """当前各用户排队数量"""
+        with self._cond:
+            return {user: len(queue) for user, queue in self._queues.items()}
+
+
+_limiters = {}
+_registry_lock = threading.Lock()
+
+
+def get_limiter(name: str) -> RateLimiter:
+    """
+    按接口标识获取限流器（进程内单例）
+    :param name: 接口标识（如 coze:/v3/chat），配额取 COZE_RATE_LIMITS 中的接口路径，未配置时使用 "*"
+    """
+    with _registry_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            path = name.split(":", 1)[-1]
+            rate, burst = COZE_RATE_LIMITS.get(path, COZE_RATE_LIMITS["*"])
+            limiter = _limiters[name] = RateLimiter(name, rate, burst, store=RATE_LIMIT_STORE or None)
+        return limiter
+
+
+def rate_limited(name: str, user_arg: str = "user_id"):
+    """
+    限流装饰器（同步函数与协程函数均可使用）
+    :param name: 接口标识
+    :param user_arg: 作为公平排队单位的参数名（函数没有该参数时所有调用归入同一用户）
+    """
+    def decorator(func):
+        limiter = get_limiter(name)
+        signature = inspect.signature(func)
+        has_user = user_arg in signature.parameters
+
+        def user_of(args, kwargs):
+            if not has_user:
+                return None
+            if user_arg in kwargs:
+                return kwargs[user_arg]
+            bound = signature.bind_partial(*args, **kwargs)
+            return bound.arguments.get(user_arg)
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                await limiter.acquire_async(user_of(args, kwargs))
+                return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            limiter.acquire(user_of(args, kwargs))
+            return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -1,33 +1,235 @@
 """
 重试装饰器：处理网络波动、限流等临时错误
+
+- 退避带随机抖动（full / decorrelated），避免多个进程同步重试放大限流
+- 区分可重试错误：Token 失效、参数错误等重试也不会成功的异常直接抛出
+- 限流时优先使用服务端 Retry-After 指定的等待时间（超过单次等待上限时直接放弃，不提前重试）
+- 进程级重试预算（令牌桶）：重试次数上限为正常调用量的一定比例，服务端故障时不会成倍放大流量
+- 总截止时间：剩余时间不足以等待下一次重试时直接放弃
 """
-import time
+import asyncio
 import functools
+import inspect
+import json
+import random
+import threading
+import time
+
+import requests
+
+from config.settings import (
+    MAX_RETRY_TIMES, RETRY_DELAY, RETRY_MAX_DELAY, RETRY_JITTER,
+    RETRY_BUDGET_RATIO, RETRY_BUDGET_MIN_PER_SEC
+)
 from core.logger import logger
+from core.exceptions import (
+    TokenInvalidError, ParameterError, WorkflowNotPublishedError,
+    AudioFormatError, KnowledgeBaseSegmentError, DeployStepError, CircuitOpenError, BApiResponseError
+)
+
+# 重试也不会成功的异常：直接抛出（熔断打开时同样不重试，由熔断器负责探测恢复）
+NON_RETRYABLE = (
+    TokenInvalidError, ParameterError, WorkflowNotPublishedError,
+    AudioFormatError, KnowledgeBaseSegmentError, DeployStepError, CircuitOpenError, BApiResponseError,
+    ValueError, TypeError, KeyError, FileNotFoundError, PermissionError
+)
+# 响应体不是合法 JSON（网关 5xx 返回的 HTML、被截断的响应等）：虽是 ValueError 子类，但属于临时错误，照常重试
+RETRYABLE_DECODE_ERRORS = (json.JSONDecodeError, requests.exceptions.JSONDecodeError)
+
+
+def parse_retry_after(value) -> float:
+    """
+    解析 Retry-After 响应头（秒数或 HTTP 日期）
+    :return: 等待秒数（无法解析时返回 None）
+    """
+    if value is None or value == "":
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    from email.utils import parsedate_to_datetime
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+class RetryBudget:
+    """
+    重试预算（令牌桶）：每次调用存入 ratio 个令牌，每次重试取出 1 个；
+    另按 min_per_sec 持续补充，保证低流量时也能少量重试
+    :param ratio: 重试量占正常调用量的比例上限
+    :param min_per_sec: 每秒最少补充的令牌数
+    :param max_tokens: 令牌上限（突发重试上限）
+    """
+
+    def __init__(self, ratio: float = RETRY_BUDGET_RATIO, min_per_sec: float = RETRY_BUDGET_MIN_PER_SEC,
+                 max_tokens: float = 10.0):
+        self.ratio = ratio
+        self.min_per_sec = min_per_sec
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.max_tokens, self._tokens + (now - self._updated) * self.min_per_sec)
+        self._updated = now
+
+    def record_call(self):
+        """记录一次调用（首次尝试）"""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_acquire(self) -> bool:
+        """申请一次重试，预算不足时返回 False"""
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
 
-def retry(max_retries=3, delay=1, exceptions=(Exception,)):
+
+# 进程内共享的默认重试预算
+DEFAULT_RETRY_BUDGET = RetryBudget()
+
+
+class RetryPolicy:
+    """
+    重试策略
+    :param max_retries: 最大尝试次数（含首次调用）
+    :param delay: 初始延迟（秒）
+    :param max_delay: 单次等待上限（秒，Retry-After 超过该值时不再重试）
+    :param jitter: 抖动方式 full / decorrelated / none
+    :param exceptions: 需要重试的异常类型（NON_RETRYABLE 中的异常始终不重试）
+    :param deadline: 总截止时间（秒，从首次调用开始计算，None 表示不限制）
+    :param budget: 重试预算（None 表示不限制）
     """
-    重试装饰器
+
+    def __init__(self, max_retries: int = MAX_RETRY_TIMES, delay: float = RETRY_DELAY,
+                 max_delay: float = RETRY_MAX_DELAY, jitter: str = RETRY_JITTER,
+                 exceptions=(Exception,), deadline: float = None, budget: RetryBudget = DEFAULT_RETRY_BUDGET):
+        if jitter not in ("full", "decorrelated", "none"):
+            raise ValueError(f"不支持的抖动方式：{jitter}")
+        self.max_retries = max_retries
+        self.delay = delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.exceptions = exceptions
+        self.deadline = deadline
+        self.budget = budget
+
+    def is_retryable(self, exc: Exception) -> bool:
+        """异常是否可重试"""
+        if not isinstance(exc, self.exceptions):
+            return False
+        return isinstance(exc, RETRYABLE_DECODE_ERRORS) or not isinstance(exc, NON_RETRYABLE)
+
+    def next_delay(self, attempt: int, previous: float, exc: Exception) -> float:
+        """
+        计算下一次等待时间
+        :param attempt: 已失败次数（从 1 开始）
+        :param previous: 上一次等待时间
+        :param exc: 本次异常
+        """
+        retry_after = getattr(exc, "retry_after", None)
+        if retry_after is not None:
+            # 服务端指定等待时间：叠加少量抖动，避免所有客户端在同一时刻恢复
+            return retry_after + random.uniform(0, min(self.delay, retry_after * 0.1 + 0.1))
+        if self.jitter == "decorrelated":
+            return min(self.max_delay, random.uniform(self.delay, max(self.delay, previous * 3)))
+        ceiling = min(self.max_delay, self.delay * 2 ** (attempt - 1))
+        return random.uniform(0, ceiling) if self.jitter == "full" else ceiling
+
+    def _should_retry(self, exc: Exception, attempt: int, started: float, delay: float, name: str) -> bool:
+        if not self.is_retryable(exc):
+            return False
+        if attempt >= self.max_retries:
+            logger.error(f"重试{self.max_retries}次后仍失败：{str(exc)}")
+            return False
+        if delay > self.max_delay:
+            # 只有 Retry-After 会超过上限：按要求等待太久，提前重试又只会再次被限流
+            logger.error(f"{name}服务端要求等待{delay:.2f}秒，超过上限{self.max_delay}秒，放弃重试：{str(exc)}")
+            return False
+        if self.deadline is not None and time.monotonic() - started + delay > self.deadline:
+            logger.error(f"{name}剩余时间不足（截止{self.deadline}秒），放弃重试：{str(exc)}")
+            return False
+        if self.budget is not None and not self.budget.try_acquire():
+            logger.error(f"重试预算已耗尽，{name}不再重试：{str(exc)}")
+            return False
+        logger.warning(f"执行失败，{delay:.2f}秒后重试（第{attempt}次）：{str(exc)}")
+        return True
+
+    def call(self, func, *args, **kwargs):
+        """按策略执行同步函数"""
+        started = time.monotonic()
+        if self.budget is not None:
+            self.budget.record_call()
+        attempt, delay = 0, self.delay
+        while True:
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                attempt += 1
+                delay = self.next_delay(attempt, delay, e)
+                if not self._should_retry(e, attempt, started, delay, func.__name__):
+                    raise
+                time.sleep(delay)
+
+    async def call_async(self, func, *args, **kwargs):
+        """按策略执行协程函数"""
+        started = time.monotonic()
+        if self.budget is not None:
+            self.budget.record_call()
+        attempt, delay = 0, self.delay
+        while True:
+            try:
+                return await func(*args, **kwargs)
+            except Exception as e:
+                attempt += 1
+                delay = self.next_delay(attempt, delay, e)
+                if not self._should_retry(e, attempt, started, delay, func.__name__):
+                    raise
+                await asyncio.sleep(delay)
+
+
+def retry(max_retries=MAX_RETRY_TIMES, delay=RETRY_DELAY, exceptions=(Exception,), policy: RetryPolicy = None, **kwargs):
+    """
+    重试装饰器（同步函数与协程函数均可使用）
     :param max_retries: 最大重试次数
     :param delay: 初始延迟（秒）
     :param exceptions: 需要重试的异常类型
+    :param policy: 重试策略（指定时忽略其他参数）
+    :param kwargs: 其他 RetryPolicy 参数（max_delay / jitter / deadline / budget）
     """
+    policy = policy or RetryPolicy(max_retries=max_retries, delay=delay, exceptions=exceptions, **kwargs)
+
     def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kw):
+                return await policy.call_async(func, *args, **kw)
+            return async_wrapper
+
         @functools.wraps(func)
-        def wrapper(*args, **kwargs):
-            retries = 0
-            current_delay = delay
-            while retries < max_retries:
-                try:
-                    return func(*args, **kwargs)
-                except exceptions as e:
-                    retries += 1
-                    if retries >= max_retries:
-                        logger.error(f"重试{max_retries}次后仍失败：{str(e)}")
-                        raise
-                    logger.warning(f"执行失败，{current_delay}秒后重试（第{retries}次）：{str(e)}")
-                    time.sleep(current_delay)
-                    current_delay *= 2  # 指数退避
-            return None
+        def wrapper(*args, **kw):
+            return policy.call(func, *args, **kw)
         return wrapper
     return decorator
+
+
+def retry_async(max_retries=MAX_RETRY_TIMES, delay=RETRY_DELAY, exceptions=(Exception,), policy: RetryPolicy = None,
+                **kwargs):
+    """协程重试装饰器（参数同 retry）"""
+    decorator = retry(max_retries, delay, exceptions, policy, **kwargs)
+
+    def wrap(func):
+        if not inspect.iscoroutinefunction(func):
+            raise TypeError(f"retry_async 只能用于协程函数：{func.__name__}")
+        return decorator(func)
+    return wrap
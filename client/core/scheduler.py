@@ -0,0 +1,248 @@
+"""
+请求调度：交互请求（对话/语音）与后台请求（简历同步、报告保存、批量部署）共用上游时按优先级分配并发
+
+- 三个优先级：interactive > default > batch，空出的并发名额总是先分给优先级最高的等待者
+- 每个优先级有各自的并发上限；batch 还需为高优先级保留 SCHEDULER_RESERVED 个名额，
+  后台写入再多也不会占满全部并发
+- 调用方可用 `with request_priority("batch"):` 把一段代码中的所有请求降级（如批量部署）
+- 按优先级统计排队等待时间（次数、平均、p95、最大），供监控采集
+- 名额可重入：已持有名额的线程（或协程任务）内再调用 @scheduled 函数时沿用已有名额，
+  嵌套调用不会因等待自己占用的名额而死锁
+- 排队超过 SCHEDULER_MAX_WAIT 秒抛出 SchedulerTimeoutError；协程等待者由名额释放事件唤醒，不轮询
+"""
+import asyncio
+import contextvars
+import functools
+import inspect
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from config.settings import SCHEDULER_MAX_CONCURRENCY, SCHEDULER_CLASS_LIMITS, SCHEDULER_RESERVED, SCHEDULER_MAX_WAIT
+from core.exceptions import SchedulerTimeoutError
+from core.metrics import REGISTRY, histogram
+
+INTERACTIVE = "interactive"
+DEFAULT = "default"
+BATCH = "batch"
+PRIORITIES = (INTERACTIVE, DEFAULT, BATCH)
+
+QUEUE_WAIT = histogram("wehan_scheduler_wait_seconds", "请求调度排队等待时间", ("priority",),
+                       buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0))
+
+_priority_override = contextvars.ContextVar("request_priority", default=None)
+# 名额持有情况：同步调用按线程记录嵌套深度；协程按持有名额的任务记录
+# （上下文变量会被子任务/线程池复制，只有同一任务内的嵌套调用才算重入）
+_held = threading.local()
+_held_task = contextvars.ContextVar("scheduler_held_task", default=None)
+
+
+@contextmanager
+def request_priority(priority: str):
+    """在该上下文内发起的请求统一使用指定优先级"""
+    if priority not in PRIORITIES:
+        raise ValueError(f"未知优先级：{priority}")
+    token = _priority_override.set(priority)
+    try:
+        yield
+    finally:
+        _priority_override.reset(token)
+
+
+class RequestScheduler:
+    """
+    优先级请求调度器
+    :param max_concurrency: 总并发上限
+    :param class_limits: {优先级: 并发上限}
+    :param reserved: batch 请求需为更高优先级保留的名额数
+    """
+
+    def __init__(self, max_concurrency: int = SCHEDULER_MAX_CONCURRENCY, class_limits: dict = None,
+                 reserved: int = SCHEDULER_RESERVED, max_wait: float = SCHEDULER_MAX_WAIT):
+        self.max_concurrency = max_concurrency
+        self.class_limits = {**SCHEDULER_CLASS_LIMITS, **(class_limits or {})}
+        self.reserved = reserved
+        self.max_wait = max_wait
+        self._running = {priority: 0 for priority in PRIORITIES}
+        self._waiting = {priority: deque() for priority in PRIORITIES}
+        self._waits = {priority: deque(maxlen=1000) for priority in PRIORITIES}
+        self._served = {priority: 0 for priority in PRIORITIES}
+        self._cond = threading.Condition()
+        # 协程等待者：票据 -> (事件循环, future)，状态变化时跨线程唤醒
+        self._async_waiters = {}
+
+    def _can_start(self, priority: str, ticket) -> bool:
+        # 更高优先级有人排队时让路；同优先级按先来后到
+        for higher in PRIORITIES[:PRIORITIES.index(priority)]:
+            if self._waiting[higher]:
+                return False
+        if self._waiting[priority][0] is not ticket:
+            return False
+        total = sum(self._running.values())
+        capacity = self.max_concurrency - (self.reserved if priority == BATCH else 0)
+        return total < capacity and self._running[priority] < self.class_limits.get(priority, self.max_concurrency)
+
+    def _notify(self):
+        """唤醒所有等待者（调用方持有 self._cond）"""
+        self._cond.notify_all()
+        for loop, future in self._async_waiters.values():
+            loop.call_soon_threadsafe(_wake, future)
+
+    def _start(self, priority: str, ticket, enqueued: float):
+        self._waiting[priority].popleft()
+        self._running[priority] += 1
+        self._served[priority] += 1
+        waited = time.monotonic() - enqueued
+        self._waits[priority].append(waited)
+        QUEUE_WAIT.labels(priority).observe(waited)
+        self._notify()
+
+    def _abandon(self, priority: str, ticket):
+        self._async_waiters.pop(ticket, None)
+        if ticket in self._waiting[priority]:
+            self._waiting[priority].remove(ticket)
+            self._notify()
+
+    def acquire(self, priority: str = DEFAULT, timeout: float = None):
+        """
+        阻塞获取执行名额（需配对调用 release）
+        :param timeout: 最长等待秒数（默认 max_wait），超时抛出 SchedulerTimeoutError
+        """
+        timeout = self.max_wait if timeout is None else timeout
+        ticket, enqueued = object(), time.monotonic()
+        with self._cond:
+            self._waiting[priority].append(ticket)
+            try:
+                while not self._can_start(priority, ticket):
+                    remaining = enqueued + timeout - time.monotonic()
+                    if remaining <= 0:
+                        raise SchedulerTimeoutError(priority, time.monotonic() - enqueued)
+                    self._cond.wait(remaining)
+            except BaseException:
+                self._abandon(priority, ticket)
+                raise
+            self._start(priority, ticket, enqueued)
+
+    async def acquire_async(self, priority: str = DEFAULT, timeout: float = None):
+        """协程获取执行名额（不阻塞事件循环；名额状态变化时被唤醒）"""
+        timeout = self.max_wait if timeout is None else timeout
+        loop = asyncio.get_running_loop()
+        ticket, enqueued = object(), time.monotonic()
+        with self._cond:
+            self._waiting[priority].append(ticket)
+        try:
+            while True:
+                with self._cond:
+                    if self._can_start(priority, ticket):
+                        self._async_waiters.pop(ticket, None)
+                        self._start(priority, ticket, enqueued)
+                        return
+                    future = loop.create_future()
+                    self._async_waiters[ticket] = (loop, future)
+                remaining = enqueued + timeout - time.monotonic()
+                if remaining <= 0:
+                    raise SchedulerTimeoutError(priority, time.monotonic() - enqueued)
+                try:
+                    await asyncio.wait_for(future, remaining)
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            with self._cond:
+                self._abandon(priority, ticket)
+            raise
+
+    def release(self, priority: str = DEFAULT):
+        """释放执行名额"""
+        with self._cond:
+            self._running[priority] -= 1
+            self._notify()
+
+    @contextmanager
+    def slot(self, priority: str = DEFAULT):
+        """`with scheduler.slot("batch"):` 形式占用名额"""
+        self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release(priority)
+
+    def stats(self) -> dict:
+        """各优先级运行数、排队数与排队等待时间统计（毫秒）"""
+        with self._cond:
+            result = {}
+            for priority in PRIORITIES:
+                waits = sorted(self._waits[priority])
+                result[priority] = {
+                    "running": self._running[priority],
+                    "queued": len(self._waiting[priority]),
+                    "served": self._served[priority],
+                    "wait_avg_ms": round(sum(waits) / len(waits) * 1000, 3) if waits else 0.0,
+                    "wait_p95_ms": round(waits[int(0.95 * (len(waits) - 1))] * 1000, 3) if waits else 0.0,
+                    "wait_max_ms": round(waits[-1] * 1000, 3) if waits else 0.0
+                }
+            return result
+
+
+def _wake(future):
+    if not future.done():
+        future.set_result(None)
+
+
+# 进程内共享的默认调度器
+scheduler = RequestScheduler()
+
+
+def _collect_scheduler():
+    stats = scheduler.stats()
+    return [
+        ("wehan_scheduler_running", "gauge", "各优先级正在执行的请求数",
+         [({"priority": priority}, item["running"]) for priority, item in stats.items()]),
+        ("wehan_scheduler_queued", "gauge", "各优先级排队中的请求数",
+         [({"priority": priority}, item["queued"]) for priority, item in stats.items()])
+    ]
+
+
+REGISTRY.register_collector(_collect_scheduler)
+
+
+def scheduled(priority: str = DEFAULT):
+    """
+    调度装饰器（同步函数与协程函数均可使用；已持有名额时重入，不再排队）
+    :param priority: 默认优先级（可被 request_priority 上下文覆盖）
+    """
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                task = asyncio.current_task()
+                if task is not None and _held_task.get() is task:
+                    return await func(*args, **kwargs)
+                current = _priority_override.get() or priority
+                await scheduler.acquire_async(current)
+                token = _held_task.set(task)
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    _held_task.reset(token)
+                    scheduler.release(current)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            depth = getattr(_held, "depth", 0)
+            if depth:
+                _held.depth = depth + 1
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    _held.depth = depth
+            current = _priority_override.get() or priority
+            with scheduler.slot(current):
+                _held.depth = 1
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    _held.depth = 0
+        return wrapper
+    return decorator
@@ -1,36 +1,157 @@
 """
 Schema 校验工具：本地配置上传前校验，避免API调用失败
+
+- 校验器缓存：按 Schema 路径缓存预编译的校验器（只做一次 check_schema），文件修改时间变化时自动重新加载
+- 两种模式：默认只报告最相关的一个错误（与 jsonschema.validate 一致），all_errors=True 报告全部错误
+- 批量校验：validate_configs / validate_directory 并行校验多个配置文件，
+  校验本身是纯 Python 计算，文件很多时可用 use_processes=True 改用多进程
+- 运行时校验：validate_instance 直接校验内存中的数据（如 B端接口返回），同样复用缓存的校验器
 """
+import functools
+import glob
 import json
-from jsonschema import validate, ValidationError
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from jsonschema import ValidationError
+from jsonschema.exceptions import best_match
+from jsonschema.validators import validator_for
+
+from config.settings import SCHEMA_VALIDATE_WORKERS
 from core.logger import logger
 
-def validate_config(config_path: str, schema_path: str) -> bool:
+# 校验器缓存：Schema 绝对路径 -> (修改时间, 校验器)
+_validators = {}
+_validators_lock = threading.Lock()
+
+
+def get_validator(schema_path: str):
     """
-    校验配置文件是否符合 Schema
-    :param config_path: 配置文件路径
+    获取 Schema 对应的预编译校验器（按路径 + 修改时间缓存）
     :param schema_path: Schema文件路径
-    :return: 是否校验通过
+    :return: jsonschema 校验器实例
+    """
+    path = os.path.abspath(schema_path)
+    mtime = os.stat(path).st_mtime_ns
+    cached = _validators.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with open(path, "r", encoding="utf-8") as f:
+        schema = json.load(f)
+    cls = validator_for(schema)
+    cls.check_schema(schema)
+    validator = cls(schema)
+    with _validators_lock:
+        _validators[path] = (mtime, validator)
+    return validator
+
+
+def clear_validator_cache():
+    """清空校验器缓存"""
+    with _validators_lock:
+        _validators.clear()
+
+
+def _format_error(error: ValidationError) -> str:
+    path = " -> ".join(str(p) for p in error.absolute_path)
+    return f"{error.message}（字段路径：{path}）" if path else error.message
+
+
+def validate_instance(instance, schema_path: str, all_errors: bool = False) -> list:
+    """
+    校验内存中的数据
+    :param instance: 待校验数据
+    :param schema_path: Schema文件路径
+    :param all_errors: 是否返回全部错误（默认只返回最相关的一个）
+    :return: 错误信息列表（空列表表示校验通过）
+    """
+    validator = get_validator(schema_path)
+    # 通过时只需一次遍历；失败时再收集错误
+    if validator.is_valid(instance):
+        return []
+    if all_errors:
+        errors = sorted(validator.iter_errors(instance), key=lambda e: list(map(str, e.absolute_path)))
+        return [_format_error(error) for error in errors]
+    return [_format_error(best_match(validator.iter_errors(instance)))]
+
+
+def _check_file(config_path: str, schema_path: str, all_errors: bool = False) -> list:
+    """
+    校验配置文件（不写日志，可在子进程中执行）
+    :return: 错误信息列表（空列表表示校验通过）
     """
     try:
-        with open(schema_path, "r", encoding="utf-8") as f:
-            schema = json.load(f)
         with open(config_path, "r", encoding="utf-8") as f:
             config = json.load(f)
+        return validate_instance(config, schema_path, all_errors)
+    except FileNotFoundError as e:
+        return [f"文件不存在：{e.filename}"]
+    except json.JSONDecodeError as e:
+        return [f"JSON格式错误：{e.msg}（第 {e.lineno} 行）"]
 
-        validate(instance=config, schema=schema)
+
+def _report(config_path: str, errors: list) -> bool:
+    if not errors:
         logger.info(f"[OK] {config_path} 校验通过")
         return True
+    logger.error(f"[FAIL] {config_path} 校验失败（{len(errors)} 个错误）" if len(errors) > 1
+                 else f"[FAIL] {config_path} 校验失败")
+    for error in errors:
+        logger.error(f"  {error}")
+    return False
 
-    except ValidationError as e:
-        logger.error(f"[FAIL] {config_path} 校验失败：{e.message}")
-        logger.error(f"  字段路径：{' -> '.join(str(p) for p in e.path)}")
-        return False
 
-    except FileNotFoundError as e:
-        logger.error(f"[FAIL] 文件不存在：{e.filename}")
-        return False
+def validate_config(config_path: str, schema_path: str, all_errors: bool = False) -> bool:
+    """
+    校验配置文件是否符合 Schema
+    :param config_path: 配置文件路径
+    :param schema_path: Schema文件路径
+    :param all_errors: 是否报告全部错误（默认只报告最相关的一个）
+    :return: 是否校验通过
+    """
+    return _report(config_path, _check_file(config_path, schema_path, all_errors))
 
-    except json.JSONDecodeError as e:
-        logger.error(f"[FAIL] JSON格式错误：{e.msg}")
-        return False
+
+def validate_configs(config_paths: list, schema_path: str, all_errors: bool = False,
+                     max_workers: int = SCHEMA_VALIDATE_WORKERS, use_processes: bool = False) -> dict:
+    """
+    并行校验多个配置文件
+    :param config_paths: 配置文件路径列表
+    :param schema_path: Schema文件路径（各文件共用）
+    :param all_errors: 是否报告全部错误
+    :param max_workers: 并发数
+    :param use_processes: 是否使用多进程（文件很多、校验计算量大时更快；每个子进程各自缓存校验器）
+    :return: {配置文件路径: 错误信息列表}
+    """
+    # 先在当前进程编译一次，Schema 本身有误时直接抛出，不必等每个文件都失败
+    get_validator(schema_path)
+    if len(config_paths) <= 1 or max_workers <= 1:
+        results = {path: _check_file(path, schema_path, all_errors) for path in config_paths}
+    else:
+        workers = min(max_workers, len(config_paths))
+        check = functools.partial(_check_file, schema_path=schema_path, all_errors=all_errors)
+        if use_processes:
+            # 按块分发，减少进程间往返次数
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                chunksize = max(1, len(config_paths) // (workers * 4))
+                results = dict(zip(config_paths, pool.map(check, config_paths, chunksize=chunksize)))
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = dict(zip(config_paths, pool.map(check, config_paths)))
+    for path, errors in results.items():
+        _report(path, errors)
+    return results
+
+
+def validate_directory(config_dir: str, schema_path: str, pattern: str = "*.json", **kwargs) -> dict:
+    """
+    校验目录下所有匹配的配置文件
+    :param config_dir: 配置目录
+    :param schema_path: Schema文件路径
+    :param pattern: 文件名匹配模式
+    :param kwargs: 传给 validate_configs 的参数
+    :return: {配置文件路径: 错误信息列表}
+    """
+    config_paths = sorted(glob.glob(os.path.join(config_dir, pattern)))
+    return validate_configs(config_paths, schema_path, **kwargs)
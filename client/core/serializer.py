@@ -0,0 +1,110 @@
+"""
+JSON 序列化：client/api 与 client/coze 的请求体编码、响应解析统一经过这里
+
+- 后端可插拔（JSON_BACKEND）：auto 在安装了 orjson 时使用 orjson，否则回退到标准库 json；
+  输出统一为紧凑的 UTF-8 字节（中文不转义），两种后端结果可互相解析
+- 两种后端行为一致：datetime / dataclass 等标准库不支持的对象均抛出 TypeError（orjson 不再自动转换），
+  NaN / Infinity 编码与解析时均抛出 ValueError；orjson 不支持的对象（超出 64 位的整数等）回退到标准库编码
+- JsonBody：预先序列化的请求体，重试时复用同一份字节，大请求（会话历史、面试报告）不再每次重试都重新编码
+"""
+import json
+import math
+
+from config.settings import JSON_BACKEND
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if JSON_BACKEND not in ("auto", "orjson", "stdlib"):
+    raise ValueError(f"JSON_BACKEND 取值无效：{JSON_BACKEND}（可选 auto / orjson / stdlib）")
+if JSON_BACKEND == "orjson" and orjson is None:
+    raise ImportError("JSON_BACKEND=orjson，但未安装 orjson")
+
+# 当前使用的后端名称
+BACKEND = "orjson" if orjson is not None and JSON_BACKEND != "stdlib" else "stdlib"
+
+_stdlib_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), allow_nan=False)
+
+
+def _stdlib_dumps(obj) -> bytes:
+    return _stdlib_encoder.encode(obj).encode("utf-8")
+
+
+def _reject_constant(name):
+    raise json.JSONDecodeError(f"JSON 中不允许出现 {name}", name, 0)
+
+
+def _stdlib_loads(data):
+    return json.loads(data, parse_constant=_reject_constant)
+
+
+if BACKEND == "orjson":
+    # datetime / dataclass 交给 default 处理，与标准库一样抛出 TypeError
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+    def _unsupported(obj):
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+    def _has_non_finite(obj) -> bool:
+        stack = [obj]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, float):
+                if not math.isfinite(item):
+                    return True
+            elif isinstance(item, dict):
+                stack.extend(item.values())
+            elif isinstance(item, (list, tuple)):
+                stack.extend(item)
+        return False
+
+    def dumps(obj) -> bytes:
+        """
+        序列化为 UTF-8 JSON 字节
+        :param obj: 待序列化对象
+        :return: 紧凑的 JSON 字节
+        """
+        try:
+            data = orjson.dumps(obj, option=_ORJSON_OPTIONS, default=_unsupported)
+        except orjson.JSONEncodeError:
+            return _stdlib_dumps(obj)
+        # orjson 把 NaN / Infinity 编码为 null：只在输出含 null 时检查，与标准库一样拒绝
+        if b"null" in data and _has_non_finite(obj):
+            raise ValueError("Out of range float values are not JSON compliant")
+        return data
+
+    def loads(data):
+        """
+        解析 JSON
+        :param data: JSON 字节或字符串
+        :return: 解析结果（格式错误时抛出 json.JSONDecodeError）
+        """
+        return orjson.loads(data)
+else:
+    dumps = _stdlib_dumps
+    loads = _stdlib_loads
+
+
+def dumps_str(obj) -> str:
+    """序列化为 JSON 字符串（拼入提示词、WebSocket 文本帧等需要 str 的场合）"""
+    return dumps(obj).decode("utf-8")
+
+
+class JsonBody:
+    """
+    预先序列化的请求体：http.post(url, json=JsonBody(payload)) 直接发送缓存的字节，
+    在重试循环外构造即可让每次重试复用同一份编码结果
+    """
+    __slots__ = ("obj", "data")
+
+    def __init__(self, obj):
+        self.obj = obj
+        self.data = dumps(obj)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __repr__(self):
+        return f"JsonBody({len(self.data)} bytes)"
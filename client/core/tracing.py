@@ -0,0 +1,234 @@
+"""
+链路追踪：一次面试流程中各上游调用的耗时瀑布图
+
+- 与 OpenTelemetry 兼容：trace_id / span_id 格式、W3C traceparent 请求头、导出字段名
+  （traceId, spanId, parentSpanId, startTimeUnixNano ...）与 OTLP JSON 一致
+- 默认不启用（TRACE_EXPORTER=none）：start_span 返回共享的空 span，开销仅一次判断
+- TRACE_EXPORTER=file 时每个结束的 span 写一行 JSON 到 TRACE_FILE（批量写入，进程退出时落盘）
+- 当前 span 通过 contextvar 传递（asyncio 任务自动继承）；core.http 为每个上游请求创建 client span
+  并注入 traceparent 请求头，B 端可据此续接同一条链路
+- client/api 函数与 Coze* 方法经 core.metrics 自动埋点时同时创建 span
+"""
+import atexit
+import contextvars
+import json
+import os
+import random
+import threading
+import time
+
+from config.settings import TRACE_EXPORTER, TRACE_FILE, TRACE_SAMPLE_RATE, TRACE_SERVICE_NAME
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+class _NoopSpan:
+    """未启用追踪或未被采样时使用的空 span"""
+    trace_id = span_id = None
+    sampled = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set_attribute(self, key: str, value):
+        pass
+
+    def set_status(self, ok: bool, message: str = None):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    """
+    span：一次调用的起止时间、属性与状态
+    :param name: 名称（如 api.jobs.get_job_detail、GET /api/open/jobs/{jobId}）
+    :param trace_id: 所属链路ID（32 位十六进制）
+    :param parent_id: 父 span ID（16 位十六进制，根 span 为 None）
+    :param kind: internal / client
+    :param attributes: 属性
+    """
+
+    def __init__(self, name: str, trace_id: str, parent_id: str = None, kind: str = "internal",
+                 attributes: dict = None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.kind = kind
+        self.attributes = dict(attributes or {})
+        self.sampled = True
+        self.status = ("OK", None)
+        self.start_ns = self.end_ns = None
+        self._token = None
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def set_status(self, ok: bool, message: str = None):
+        self.status = ("OK" if ok else "ERROR", message)
+
+    def __enter__(self):
+        self.start_ns = time.time_ns()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end_ns = time.time_ns()
+        _current_span.reset(self._token)
+        if exc is not None:
+            self.attributes["exception.type"] = exc_type.__name__
+            self.set_status(False, str(exc))
+        _exporter.export(self)
+        return False
+
+    def to_dict(self) -> dict:
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "durationMs": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "status": {"code": self.status[0], "message": self.status[1]},
+            "resource": {"service.name": TRACE_SERVICE_NAME}
+        }
+
+
+class _RemoteParent:
+    """从 traceparent 请求头解析出的上游 span（只用于续接链路）"""
+
+    def __init__(self, trace_id: str, span_id: str, sampled: bool):
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.sampled = sampled
+
+
+class FileExporter:
+    """
+    按行写 JSON 的导出器（批量落盘）
+    :param path: 文件路径
+    :param batch_size: 缓冲多少个 span 后写一次
+    """
+
+    def __init__(self, path: str, batch_size: int = 64):
+        self.path = path
+        self.batch_size = batch_size
+        self._buffer = []
+        self._lock = threading.Lock()
+        atexit.register(self.flush)
+
+    def export(self, span: Span):
+        with self._lock:
+            self._buffer.append(span)
+            if len(self._buffer) < self.batch_size:
+                return
+            batch, self._buffer = self._buffer, []
+        self._write(batch)
+
+    def flush(self):
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+        if batch:
+            self._write(batch)
+
+    def _write(self, batch: list):
+        lines = "".join(json.dumps(span.to_dict(), ensure_ascii=False) + "\n" for span in batch)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+
+class _NoopExporter:
+    def export(self, span: Span):
+        pass
+
+    def flush(self):
+        pass
+
+
+def _build_exporter():
+    if TRACE_EXPORTER == "file":
+        return FileExporter(TRACE_FILE)
+    if TRACE_EXPORTER not in ("none", ""):
+        raise ValueError(f"未知的 TRACE_EXPORTER：{TRACE_EXPORTER}（可选 none / file）")
+    return _NoopExporter()
+
+
+_exporter = _build_exporter()
+enabled = not isinstance(_exporter, _NoopExporter)
+
+
+def set_exporter(exporter):
+    """替换导出器（需实现 export(span) 与 flush()；传 None 关闭追踪）"""
+    global _exporter, enabled
+    _exporter = exporter or _NoopExporter()
+    enabled = exporter is not None
+
+
+def current_span():
+    """当前 span（没有时为 None）"""
+    return _current_span.get()
+
+
+def start_span(name: str, kind: str = "internal", attributes: dict = None, parent=None):
+    """
+    创建 span（用作上下文管理器：with start_span("voice.interview") as span: ...）
+    :param name: 名称
+    :param kind: internal / client
+    :param attributes: 属性
+    :param parent: 父 span（默认取当前 span；可传 extract() 的结果续接上游链路）
+    :return: Span，未启用或未被采样时返回 NOOP_SPAN
+    """
+    if not enabled:
+        return NOOP_SPAN
+    parent = parent or _current_span.get()
+    if parent is None:
+        # 根 span 决定整条链路是否采样
+        if TRACE_SAMPLE_RATE < 1 and random.random() >= TRACE_SAMPLE_RATE:
+            return NOOP_SPAN
+        return Span(name, os.urandom(16).hex(), None, kind, attributes)
+    if not parent.sampled:
+        return NOOP_SPAN
+    return Span(name, parent.trace_id, parent.span_id, kind, attributes)
+
+
+def inject(headers: dict, span=None) -> dict:
+    """
+    写入 W3C traceparent 请求头（当前没有被采样的 span 时不写）
+    :param headers: 请求头（原地修改）
+    :param span: 指定 span（默认当前 span）
+    :return: headers
+    """
+    span = span or _current_span.get()
+    if span is not None and span.sampled:
+        headers["traceparent"] = f"00-{span.trace_id}-{span.span_id}-01"
+    return headers
+
+
+def extract(headers: dict):
+    """
+    解析 traceparent 请求头
+    :param headers: 请求头
+    :return: 可作为 start_span(parent=...) 的上游 span，格式不合法时为 None
+    """
+    value = (headers or {}).get("traceparent", "")
+    parts = value.split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        sampled = bool(int(parts[3], 16) & 1)
+    except ValueError:
+        return None
+    return _RemoteParent(parts[1], parts[2], sampled)
+
+
+def flush():
+    """立即写出缓冲中的 span"""
+    _exporter.flush()
@@ -1,10 +1,15 @@
 # Coze module for WeHan C端
-from .admin import CozeAdminAPI
-from .agent import CozeAgent
-from .workflow import CozeWorkflow
-from .voice import CozeRealtimeVoice
-from .file import CozeFile
-from .knowledge import CozeKnowledge
+# 各客户端类在首次访问时才加载对应子模块（如只用 CozeAgent 时不会导入 websockets）
+from core.lazy import install_lazy
+
+_LAZY = {
+    'CozeAdminAPI': 'admin',
+    'CozeAgent': 'agent',
+    'CozeWorkflow': 'workflow',
+    'CozeRealtimeVoice': 'voice',
+    'CozeFile': 'file',
+    'CozeKnowledge': 'knowledge'
+}
 
 __all__ = [
     'CozeAdminAPI',
@@ -14,3 +19,5 @@ __all__ = [
     'CozeFile',
     'CozeKnowledge'
 ]
+
+install_lazy(globals(), _LAZY)
@@ -1,19 +1,38 @@
 """
-Coze 管理 API 封装 - v3.0 纯 API 架构
-仅包含智能体管理功能，移除知识库和工作流相关代码（API 不可用）
+Coze 管理 API 封装 - v3.1 纯 API 架构
+包含智能体创建/更新/发布，以及知识库/工作流绑定（通过 bot/update）
+知识库创建与文档上传见 coze/knowledge.py；工作流仍需在网页平台创建（导入 API 不可用）
 
 更新日志：
+- v3.1: 新增知识库/工作流绑定，创建与更新共用请求体构造；新增声明式同步（reconcile_bot）；
+        智能体列表分页迭代（预取下一页）+ TTL/ETag 缓存，支持多空间按 bot_id 批量查询
 - v3.0 (2026-02-28): 移除知识库和工作流管理功能（API 返回 404）
 - v2.1 (2026-02-28): 修正 API 端点，使用实际可用的端点
 """
-import requests
+import contextvars
 import json
-from config.settings import COZE_PAT, SPACE_ID, COZE_API_TIMEOUT
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config.settings import (
+    COZE_PAT, COZE_API_BASE, SPACE_ID, COZE_API_TIMEOUT, BOT_STATE_FILE,
+    BOT_CACHE_TTL, BOT_CACHE_FILE, BOT_PAGE_SIZE
+)
+from core.cache import TTLCache
 from core.retry import retry
+from core.circuit_breaker import circuit_breaker
+from core.scheduler import scheduled, BATCH
+from core.rate_limiter import rate_limited
 from core.logger import logger
-from core.exceptions import TokenInvalidError
+from core.exceptions import TokenInvalidError, CozeApiCallError
+from core.http import http, response_json
+from core.metrics import instrument_class
 
+# 智能体列表预取下一页共用的线程池（每个迭代器同一时刻最多占用一个线程）
+_prefetch_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="bot-prefetch")
 
+
+@instrument_class
 class CozeAdminAPI:
     """Coze 管理 API：仅包含智能体创建/更新/发布"""
 
@@ -22,11 +41,31 @@ class CozeAdminAPI:
             "Authorization": f"Bearer {COZE_PAT}",
             "Content-Type": "application/json"
         }
-        self.base_url = "https://api.coze.cn/v1"
+        self.base_url = f"{COZE_API_BASE}/v1"
+        self.bot_cache = TTLCache(ttl=BOT_CACHE_TTL, path=BOT_CACHE_FILE or None)
 
     # ===================== 智能体管理 =====================
 
+    @staticmethod
+    def build_bot_payload(config: dict) -> dict:
+        """
+        本地智能体配置 -> API 请求体（创建/更新共用）
+        :param config: wehan_bot.json 内容
+        :return: 请求体（不含 space_id/bot_id）
+        """
+        return {
+            "name": config.get("name", "未命名智能体"),
+            "description": config.get("description", ""),
+            "prompt": {
+                "system_prompt": config.get("instructions", ""),
+                "welcome_message": config.get("welcome_message", "")
+            }
+        }
+
     @retry(max_retries=3)
+    @rate_limited("coze:/v1/bot/create")
+    @scheduled(BATCH)
+    @circuit_breaker("coze:/v1/bot/create")
     def create_bot(self, bot_config_path: str) -> str:
         """
         创建智能体
@@ -38,18 +77,9 @@ class CozeAdminAPI:
         with open(bot_config_path, "r", encoding="utf-8") as f:
             config = json.load(f)
 
-        # 构造请求体
-        payload = {
-            "space_id": SPACE_ID,
-            "name": config.get("name", "未命名智能体"),
-            "description": config.get("description", ""),
-            "prompt": {
-                "system_prompt": config.get("instructions", ""),
-                "welcome_message": config.get("welcome_message", "")
-            }
-        }
+        payload = {"space_id": SPACE_ID, **self.build_bot_payload(config)}
 
-        response = requests.post(
+        response = http.post(
             url,
             json=payload,
             headers=self.headers,
@@ -58,16 +88,22 @@ class CozeAdminAPI:
 
         if response.status_code == 401:
             raise TokenInvalidError()
+        if response.status_code >= 500:
+            raise CozeApiCallError("/v1/bot/create", response.status_code)
 
-        result = response.json()
+        result = response_json(response)
         if result.get("code") == 0:
             bot_id = result["data"]["bot_id"]
+            self.bot_cache.invalidate(f"bots:{SPACE_ID}:")
             logger.info(f"[OK] 创建智能体成功：{bot_id}")
             return bot_id
 
         raise Exception(f"创建智能体失败：{result.get('msg')}")
 
     @retry(max_retries=3)
+    @rate_limited("coze:/v1/bot/update")
+    @scheduled(BATCH)
+    @circuit_breaker("coze:/v1/bot/update")
     def update_bot(self, bot_id: str, update_data: dict) -> bool:
         """
         更新智能体
@@ -79,7 +115,7 @@ class CozeAdminAPI:
 
         payload = {"bot_id": bot_id, **update_data}
 
-        response = requests.post(
+        response = http.post(
             url,
             json=payload,
             headers=self.headers,
@@ -88,40 +124,168 @@ class CozeAdminAPI:
 
         if response.status_code == 401:
             raise TokenInvalidError()
+        if response.status_code >= 500:
+            raise CozeApiCallError("/v1/bot/update", response.status_code)
 
-        result = response.json()
+        result = response_json(response)
         if result.get("code") == 0:
+            self.bot_cache.invalidate("bots:")
             logger.info(f"[OK] 更新智能体成功：{bot_id}")
             return True
 
         raise Exception(f"更新智能体失败：{result.get('msg')}")
 
+    def bind_knowledge_to_bot(self, bot_id: str, knowledge_ids: list) -> bool:
+        """
+        绑定知识库到智能体（覆盖原有绑定）
+        :param bot_id: 智能体ID
+        :param knowledge_ids: 知识库ID列表
+        :return: 是否成功
+        """
+        return self.update_bot(bot_id, {"knowledge": {"dataset_ids": knowledge_ids}})
+
+    def bind_workflow_to_bot(self, bot_id: str, workflow_ids: list) -> bool:
+        """
+        绑定工作流到智能体（覆盖原有绑定；工作流需先在网页平台创建并发布）
+        :param bot_id: 智能体ID
+        :param workflow_ids: 工作流ID列表
+        :return: 是否成功
+        """
+        return self.update_bot(bot_id, {"workflow_id_list": {"ids": [{"id": wid} for wid in workflow_ids]}})
+
+    # ===================== 智能体列表（分页 + 缓存） =====================
+    # 按列表缓存（键 bots:<空间>:<页大小>，值为已取到的各页）：同一份列表的所有页共用一个过期时间，
+    # 未过期时直接复用（上次未取完的后续页补拉后并入同一份列表）；
+    # 过期后从第 1 页起整体复验，每页带上次的 If-None-Match，304 时复用该页，不会拼出不同时刻的分页。
+
     @retry(max_retries=3)
-    def get_bots(self) -> list:
+    @rate_limited("coze:/v1/bots")
+    @scheduled(BATCH)
+    @circuit_breaker("coze:/v1/bots")
+    def _fetch_bots_page(self, space_id: str, page_num: int, page_size: int, etag: str = None):
         """
-        获取空间内的智能体列表
-        :return: 智能体列表
+        获取一页智能体列表
+        :param etag: 该页上次的 ETag（带 If-None-Match 复验）
+        :return: {items, has_more, etag}；304 未变化时返回 None
         """
-        url = f"{self.base_url}/bots"
-        params = {"workspace_id": SPACE_ID}
+        headers = dict(self.headers)
+        if etag:
+            headers["If-None-Match"] = etag
 
-        response = requests.get(
-            url,
-            headers=self.headers,
-            params=params,
+        response = http.get(
+            f"{self.base_url}/bots",
+            headers=headers,
+            params={"workspace_id": space_id, "page_num": page_num, "page_size": page_size},
             timeout=COZE_API_TIMEOUT
         )
 
         if response.status_code == 401:
             raise TokenInvalidError()
+        if response.status_code >= 500:
+            raise CozeApiCallError("/v1/bots", response.status_code)
+        if response.status_code == 304 and etag:
+            return None
 
-        result = response.json()
-        if result.get("code") == 0:
-            return result["data"]["items"]
+        result = response_json(response)
+        if result.get("code") != 0:
+            raise Exception(f"获取智能体列表失败：{result.get('msg')}")
+
+        data = result.get("data") or {}
+        items = data.get("items") or []
+        total = data.get("total")
+        has_more = data.get("has_more")
+        if has_more is None:
+            has_more = page_num * page_size < total if total is not None else len(items) >= page_size
+        return {"items": items, "has_more": bool(has_more and items), "etag": response.headers.get("ETag")}
+
+    def iter_bots(self, space_id: str = None, page_size: int = BOT_PAGE_SIZE, use_cache: bool = True):
+        """
+        分页迭代空间内的智能体（处理当前页时后台预取下一页）
+        :param space_id: 空间ID（默认 SPACE_ID）
+        :param page_size: 每页数量
+        :param use_cache: 是否使用缓存（False 时强制重新拉取）
+        :return: 智能体字典迭代器
+        """
+        space_id = space_id or SPACE_ID
+        key = f"bots:{space_id}:{page_size}"
+        cached = self.bot_cache.get(key, allow_stale=True) if use_cache else None
+        previous = cached["value"]["pages"] if cached else []
+        fresh = bool(cached and cached["fresh"])
+        # 未过期：沿用缓存的页；已过期或不用缓存：重新开始一份列表（首页取到时开始计算有效期）
+        pages = list(previous) if fresh else []
+        expires_at = cached["expires_at"] if fresh else None
 
-        raise Exception(f"获取智能体列表失败：{result.get('msg')}")
+        def fetch(page_num):
+            if page_num <= len(pages):
+                return pages[page_num - 1]
+            old = previous[page_num - 1] if not fresh and page_num <= len(previous) else None
+            page = self._fetch_bots_page(space_id, page_num, page_size, old["etag"] if old else None)
+            return old if page is None else page
+
+        page_num, future = 1, None
+        page = fetch(page_num)
+        try:
+            while True:
+                if page_num > len(pages):
+                    pages.append(page)
+                    if expires_at is None:
+                        self.bot_cache.set(key, {"pages": pages})
+                        expires_at = time.time() + self.bot_cache.ttl
+                    else:
+                        self.bot_cache.set(key, {"pages": pages}, ttl=expires_at - time.time())
+                # 预取在调用方的上下文中执行（保留 request_priority、请求ID 与链路）
+                if page["has_more"]:
+                    future = _prefetch_executor.submit(contextvars.copy_context().run, fetch, page_num + 1)
+                yield from page["items"]
+                if future is None:
+                    return
+                page, future = future.result(), None
+                page_num += 1
+        finally:
+            # 调用方提前结束迭代时，取消尚未开始的预取
+            if future is not None:
+                future.cancel()
+
+    def get_bots(self, space_id: str = None, use_cache: bool = True) -> list:
+        """
+        获取空间内的全部智能体（自动翻页）
+        :param space_id: 空间ID（默认 SPACE_ID）
+        :param use_cache: 是否使用缓存
+        :return: 智能体列表
+        """
+        return list(self.iter_bots(space_id, use_cache=use_cache))
+
+    def get_bots_by_ids(self, bot_ids: list, space_ids: list = None) -> dict:
+        """
+        按 bot_id 批量查询（多空间，缓存未命中的 ID 会强制刷新一次列表）
+        :param bot_ids: 智能体ID列表
+        :param space_ids: 空间ID列表（默认 [SPACE_ID]）
+        :return: {bot_id: 智能体字典}，不存在的 ID 不出现在结果中
+        """
+        wanted = set(bot_ids)
+        space_ids = space_ids or [SPACE_ID]
+        found = {}
+        for use_cache in (True, False):
+            for space_id in space_ids:
+                for bot in self.iter_bots(space_id, use_cache=use_cache):
+                    remote_id = bot.get("id") or bot.get("bot_id")
+                    if remote_id in wanted:
+                        found[remote_id] = {**bot, "space_id": space_id}
+                        if len(found) == len(wanted):
+                            return found
+            if not use_cache or len(found) == len(wanted):
+                break
+            logger.info(f"缓存中未找到智能体{sorted(wanted - set(found))}，刷新列表")
+        return found
+
+    def invalidate_bot_cache(self, space_id: str = None):
+        """清除智能体列表缓存（默认全部空间）"""
+        self.bot_cache.invalidate(f"bots:{space_id}:" if space_id else "bots:")
 
     @retry(max_retries=3)
+    @rate_limited("coze:/v1/bot/publish")
+    @scheduled(BATCH)
+    @circuit_breaker("coze:/v1/bot/publish")
     def publish_bot(self, bot_id: str, platforms: list = None) -> bool:
         """
         发布智能体到渠道
@@ -142,7 +306,7 @@ class CozeAdminAPI:
             }
         }
 
-        response = requests.post(
+        response = http.post(
             url,
             json=payload,
             headers=self.headers,
@@ -151,8 +315,10 @@ class CozeAdminAPI:
 
         if response.status_code == 401:
             raise TokenInvalidError()
+        if response.status_code >= 500:
+            raise CozeApiCallError("/v1/bot/publish", response.status_code)
 
-        result = response.json()
+        result = response_json(response)
         if result.get("code") == 0:
             logger.info(f"[OK] 发布智能体成功：{bot_id} -> {platforms}")
             return True
@@ -160,3 +326,118 @@ class CozeAdminAPI:
         # 发布端点可能返回非 0 code 但成功，记录日志
         logger.warning(f"发布智能体返回：{result}")
         return True
+
+    # ===================== 声明式同步 =====================
+    # 列表接口只返回名称/描述等基础字段，Prompt 无法从远端读取，
+    # 因此以本地记录的"上次成功下发的配置"（BOT_STATE_FILE）作为 Prompt 的当前状态。
+
+    @staticmethod
+    def _load_bot_state() -> dict:
+        try:
+            with open(BOT_STATE_FILE, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    @staticmethod
+    def _save_bot_state(state: dict):
+        tmp_path = f"{BOT_STATE_FILE}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, BOT_STATE_FILE)
+
+    def plan_bot(self, bot_config_path: str, bot_id: str = None) -> dict:
+        """
+        计算本地配置与线上智能体的差异（不修改线上状态）
+        :param bot_config_path: 本地智能体配置JSON路径
+        :param bot_id: 智能体ID（为空时按名称匹配）
+        :return: 变更计划 {action: create/update/noop, bot_id, changes: {字段: {from, to}}, payload}
+        """
+        with open(bot_config_path, "r", encoding="utf-8") as f:
+            desired = self.build_bot_payload(json.load(f))
+
+        if bot_id:
+            bot = self.get_bots_by_ids([bot_id]).get(bot_id)
+        else:
+            bot = next((bot for bot in self.iter_bots()
+                        if (bot.get("name") or bot.get("bot_name")) == desired["name"]), None)
+        current = None
+        if bot is not None:
+            current = {
+                "bot_id": bot.get("id") or bot.get("bot_id"),
+                "name": bot.get("name") or bot.get("bot_name"),
+                "description": bot.get("description", "")
+            }
+
+        if current is None:
+            if bot_id:
+                raise Exception(f"智能体{bot_id}不存在于空间{SPACE_ID}")
+            changes = {field: {"from": None, "to": value} for field, value in desired.items()}
+            return {"action": "create", "bot_id": None, "changes": changes, "payload": desired}
+
+        last_applied = self._load_bot_state().get(current["bot_id"], {})
+        observed = {
+            "name": current["name"],
+            "description": current["description"],
+            "prompt": last_applied.get("prompt")
+        }
+        changes = {
+            field: {"from": observed.get(field), "to": value}
+            for field, value in desired.items()
+            if observed.get(field) != value
+        }
+        return {
+            "action": "update" if changes else "noop",
+            "bot_id": current["bot_id"],
+            "changes": changes,
+            "payload": {field: desired[field] for field in changes}
+        }
+
+    def apply_bot_plan(self, plan: dict, bot_config_path: str) -> str:
+        """
+        执行变更计划（仅发送有变化的字段）
+        :param plan: plan_bot 返回的计划
+        :param bot_config_path: 本地智能体配置JSON路径
+        :return: bot_id
+        """
+        bot_id = plan["bot_id"]
+        if plan["action"] == "create":
+            bot_id = self.create_bot(bot_config_path)
+        elif plan["action"] == "update":
+            self.update_bot(bot_id, plan["payload"])
+        else:
+            logger.info(f"[OK] 智能体配置无变化，跳过更新：{bot_id}")
+            return bot_id
+
+        state = self._load_bot_state()
+        state[bot_id] = {**state.get(bot_id, {}), **plan["payload"]}
+        self._save_bot_state(state)
+        return bot_id
+
+    def reconcile_bot(self, bot_config_path: str, bot_id: str = None, dry_run: bool = False) -> dict:
+        """
+        声明式同步：使线上智能体与本地配置一致，可重复执行
+        :param bot_config_path: 本地智能体配置JSON路径
+        :param bot_id: 智能体ID（为空时按名称匹配，不存在则创建）
+        :param dry_run: 仅输出计划，不调用修改接口
+        :return: 变更计划（执行后 bot_id 为最终智能体ID）；计划在此处输出到日志，调用方无需再打印
+        """
+        plan = self.plan_bot(bot_config_path, bot_id)
+        logger.info(self.format_plan(plan))
+        if not dry_run:
+            plan["bot_id"] = self.apply_bot_plan(plan, bot_config_path)
+        return plan
+
+    @staticmethod
+    def format_plan(plan: dict) -> str:
+        """变更计划 -> 可读文本（dry-run 输出）"""
+        def brief(value):
+            text = json.dumps(value, ensure_ascii=False)
+            return text if len(text) <= 60 else f"{text[:57]}..."
+
+        lines = [f"[PLAN] {plan['action']} {plan['bot_id'] or '(新智能体)'}"]
+        for field, change in plan["changes"].items():
+            lines.append(f"  ~ {field}: {brief(change['from'])} -> {brief(change['to'])}")
+        if not plan["changes"]:
+            lines.append("  (无变化)")
+        return "\n".join(lines)
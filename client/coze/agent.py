@@ -1,12 +1,20 @@
 """
 Coze Chat v3 API封装：智能体对话能力
 """
+import time
 import requests
-from config.settings import COZE_PAT, COZE_API_TIMEOUT
-from core.retry import retry
-from core.logger import logger
-from core.exceptions import TokenInvalidError, ParameterError, RateLimitError
+from config.settings import COZE_PAT, COZE_API_BASE, COZE_API_TIMEOUT
+from core.retry import retry, parse_retry_after
+from core.circuit_breaker import circuit_breaker
+from core.scheduler import scheduled, INTERACTIVE
+from core.rate_limiter import rate_limited
+from core.logger import logger, SAMPLED, log_event
+from core.exceptions import TokenInvalidError, ParameterError, RateLimitError, CozeApiCallError
+from core.http import http, request_context, response_json
+from core.serializer import JsonBody, dumps_str
+from core.metrics import instrument_class
 
+@instrument_class
 class CozeAgent:
     def __init__(self, bot_id: str = None):
         self.bot_id = bot_id
@@ -14,9 +22,8 @@ class CozeAgent:
             "Authorization": f"Bearer {COZE_PAT}",
             "Content-Type": "application/json"
         }
-        self.base_url = "https://api.coze.cn/v3/chat"
+        self.base_url = f"{COZE_API_BASE}/v3/chat"
 
-    @retry(max_retries=3, delay=1, exceptions=(requests.exceptions.RequestException,))
     def send_message(self, user_id: str, content: str, stream: bool = True):
         """
         发送消息给智能体
@@ -45,42 +52,61 @@ class CozeAgent:
                 }
             ]
         }
+        # 请求体只编码一次，重试时复用
+        return self._post_message(JsonBody(payload), user_id, stream)
 
+    @retry(max_retries=3, delay=1, exceptions=(requests.exceptions.RequestException, RateLimitError))
+    @rate_limited("coze:/v3/chat")
+    @scheduled(INTERACTIVE)
+    @circuit_breaker("coze:/v3/chat")
+    def _post_message(self, body: JsonBody, user_id: str, stream: bool):
+        """
+        发送已编码的对话请求（可重试部分）
+        :param body: 预先编码的请求体
+        :param user_id: 用户唯一标识
+        :param stream: 是否流式返回
+        """
         try:
-            response = requests.post(
-                self.base_url,
-                json=payload,
-                headers=self.headers,
-                timeout=COZE_API_TIMEOUT,
-                stream=stream
-            )
+            with request_context(user_id=user_id) as request_id:
+                response = http.post(
+                    self.base_url,
+                    json=body,
+                    headers=self.headers,
+                    timeout=COZE_API_TIMEOUT,
+                    stream=stream
+                )
 
             # 状态码校验
             if response.status_code == 401:
                 raise TokenInvalidError()
             if response.status_code == 429:
-                raise RateLimitError()
+                raise RateLimitError(parse_retry_after(response.headers.get("Retry-After")))
             if response.status_code != 200:
-                raise Exception(f"API调用失败：{response.status_code} - {response.text}")
+                raise CozeApiCallError("/v3/chat", response.status_code, response.text)
 
             # 处理流式/非流式响应
             if stream:
-                return self._parse_stream_response(response)
+                return self._parse_stream_response(response, request_id, user_id)
             else:
-                return response.json()
+                return response_json(response)
 
         except requests.exceptions.RequestException as e:
             logger.error(f"请求Coze Chat API失败：{str(e)}")
             raise
 
-    def _parse_stream_response(self, response):
+    def _parse_stream_response(self, response, request_id: str = None, user_id: str = None):
         """
         解析流式响应（关键：避免丢包）
         :param response: 流式响应对象
+        :param request_id: 请求ID（流结束时记录 stream 事件）
+        :param user_id: 用户ID
         :return: 生成器，逐行返回解析后的数据
         """
+        start = time.perf_counter()
+        events, received = 0, 0
         for line in response.iter_lines():
             if line:
+                received += len(line)
                 line = line.decode("utf-8")
                 # 按Coze SSE格式解析：event: xxx\ndata: xxx
                 if line.startswith("event:"):
@@ -88,8 +114,11 @@ class CozeAgent:
                 elif line.startswith("data:"):
                     data = line.split(":", 1)[1].strip()
                     if data != "[DONE]":
+                        events += 1
                         yield {"event": event, "data": data}
-        logger.info("流式响应解析完成")
+        logger.info("流式响应解析完成", extra=SAMPLED)
+        log_event("stream", request_id=request_id, user_id=user_id, endpoint="/v3/chat", events=events,
+                  bytes=received, latency_ms=round((time.perf_counter() - start) * 1000, 2))
 
     @retry(max_retries=3, delay=1)
     def resume_conversation(self, user_id: str, conversation_id: str):
@@ -97,7 +126,6 @@ class CozeAgent:
         恢复历史会话：调取历史数据，注入新会话生成上下文
         """
         from api.conversations import get_conversation_detail
-        import json
 
         # 1. 从数据库调取会话详情
         session_data = get_conversation_detail(user_id, conversation_id)
@@ -111,8 +139,8 @@ class CozeAgent:
         # 3. 构造"恢复会话"的Prompt（注入历史上下文）
         resume_prompt = f"""
 请恢复用户的历史会话，继续之前未完成的操作：
-1. 历史对话记录：{json.dumps(history_messages, ensure_ascii=False)}
-2. 面试工作流状态：{json.dumps(workflow_status, ensure_ascii=False)}
+1. 历史对话记录：{dumps_str(history_messages)}
+2. 面试工作流状态：{dumps_str(workflow_status)}
 3. 要求：
    - 衔接历史上下文，不要重复提问/重复回答
    - 如果面试流程中断，从断连的节点继续（如：继续提问未回答的题目）
@@ -2,17 +2,26 @@
 Coze 文件上传API封装：简历上传解析
 """
 import requests
-from config.settings import COZE_PAT, COZE_API_TIMEOUT
-from core.retry import retry
-from core.logger import logger
-from core.exceptions import TokenInvalidError, RateLimitError
+from config.settings import COZE_PAT, COZE_API_BASE, COZE_API_TIMEOUT
+from core.retry import retry, parse_retry_after
+from core.circuit_breaker import circuit_breaker
+from core.scheduler import scheduled, DEFAULT
+from core.rate_limiter import rate_limited
+from core.logger import logger, SAMPLED
+from core.exceptions import TokenInvalidError, RateLimitError, CozeApiCallError
+from core.http import http, response_json
+from core.metrics import instrument_class
 
+@instrument_class
 class CozeFile:
     def __init__(self):
         self.headers = {"Authorization": f"Bearer {COZE_PAT}"}
-        self.upload_url = "https://api.coze.cn/v1/files/upload"
+        self.upload_url = f"{COZE_API_BASE}/v1/files/upload"
 
     @retry(max_retries=3, delay=1)
+    @rate_limited("coze:/v1/files/upload")
+    @scheduled(DEFAULT)
+    @circuit_breaker("coze:/v1/files/upload")
     def upload_resume(self, file_path: str, file_type: str = "pdf"):
         """
         上传简历文件
@@ -27,7 +36,7 @@ class CozeFile:
         try:
             with open(file_path, "rb") as f:
                 files = {"file": (f"resume.{file_type}", f)}
-                response = requests.post(
+                response = http.post(
                     self.upload_url,
                     headers=self.headers,
                     files=files,
@@ -37,12 +46,12 @@ class CozeFile:
             if response.status_code == 401:
                 raise TokenInvalidError()
             if response.status_code == 429:
-                raise RateLimitError()
+                raise RateLimitError(parse_retry_after(response.headers.get("Retry-After")))
             if response.status_code != 200:
-                raise Exception(f"文件上传失败：{response.text}")
+                raise CozeApiCallError("/v1/files/upload", response.status_code, response.text)
 
-            result = response.json()
-            logger.info(f"简历上传成功，文件ID：{result.get('file_id')}")
+            result = response_json(response)
+            logger.info("简历上传成功，文件ID：%s", result.get("file_id"), extra=SAMPLED)
             return result.get("file_id")
 
         except FileNotFoundError:
@@ -1,21 +1,170 @@
 """
 Coze 知识库管理API封装
 """
-import requests
-from config.settings import COZE_PAT, COZE_API_TIMEOUT
+import base64
+import os
+import threading
+import time
+from config.settings import COZE_PAT, COZE_API_BASE, SPACE_ID, COZE_API_TIMEOUT, KNOWLEDGE_INDEX_CHECK_INTERVAL
 from core.retry import retry
+from core.circuit_breaker import circuit_breaker
+from core.scheduler import scheduled, BATCH, INTERACTIVE
+from core.rate_limiter import rate_limited
 from core.logger import logger
-from core.exceptions import TokenInvalidError
+from core.exceptions import TokenInvalidError, CozeApiCallError
+from core.http import http, response_json
+from core.serializer import JsonBody
+from core.metrics import instrument_class
 
+@instrument_class
 class CozeKnowledge:
+    # 本地索引快照（进程内共享，首次使用时 mmap 打开）
+    _local_index = None
+    _local_checked = 0.0
+    _local_lock = threading.Lock()
+
     def __init__(self):
         self.headers = {
             "Authorization": f"Bearer {COZE_PAT}",
             "Content-Type": "application/json"
         }
-        self.base_url = "https://api.coze.cn/v1/knowledge"
+        self.base_url = f"{COZE_API_BASE}/v1/knowledge"
+        self.datasets_url = f"{COZE_API_BASE}/v1/datasets"
+        self.document_create_url = f"{COZE_API_BASE}/open_api/knowledge/document/create"
+        self.document_delete_url = f"{COZE_API_BASE}/open_api/knowledge/document/delete"
+
+    @retry(max_retries=3)
+    @rate_limited("coze:/v1/datasets")
+    @scheduled(BATCH)
+    @circuit_breaker("coze:/v1/datasets")
+    def create_dataset(self, name: str, description: str = "") -> str:
+        """
+        创建知识库（文本型）
+        :param name: 知识库名称
+        :param description: 知识库描述
+        :return: 知识库ID（dataset_id）
+        """
+        payload = {
+            "name": name,
+            "space_id": SPACE_ID,
+            "format_type": 0,  # 0: 文本型
+            "description": description
+        }
+
+        response = http.post(
+            self.datasets_url,
+            json=payload,
+            headers=self.headers,
+            timeout=COZE_API_TIMEOUT
+        )
+
+        if response.status_code == 401:
+            raise TokenInvalidError()
+        if response.status_code >= 500:
+            raise CozeApiCallError("/v1/datasets", response.status_code)
+
+        result = response_json(response)
+        if result.get("code") == 0:
+            dataset_id = result["data"]["dataset_id"]
+            logger.info(f"[OK] 创建知识库成功：{dataset_id}")
+            return dataset_id
+
+        raise Exception(f"创建知识库失败：{result.get('msg')}")
+
+    def upload_document(self, knowledge_id: str, file_path: str, max_tokens: int = 800) -> list:
+        """
+        上传本地文档到知识库（自定义分段，建议500-1000字/段）
+        :param knowledge_id: 知识库ID（dataset_id）
+        :param file_path: 本地文件路径（txt/md/csv/pdf/docx）
+        :param max_tokens: 最大分段长度
+        :return: 文档ID列表
+        """
+        with open(file_path, "rb") as f:
+            file_base64 = base64.b64encode(f.read()).decode("ascii")
+
+        filename = os.path.basename(file_path)
+        payload = {
+            "dataset_id": knowledge_id,
+            "document_bases": [{
+                "name": filename,
+                "source_info": {
+                    "file_base64": file_base64,
+                    "file_type": os.path.splitext(filename)[1].lstrip(".") or "txt"
+                }
+            }],
+            "chunk_strategy": {
+                "chunk_type": 1,  # 1: 自定义分段
+                "separator": "\n\n",
+                "max_tokens": max_tokens,
+                "remove_extra_spaces": True
+            }
+        }
+        # base64 文件内容体积大，读取与编码只做一次，重试时复用
+        return self._create_document(JsonBody(payload), filename)
+
+    @retry(max_retries=3)
+    @rate_limited("coze:/open_api/knowledge/document/create")
+    @scheduled(BATCH)
+    @circuit_breaker("coze:/open_api/knowledge/document/create")
+    def _create_document(self, body: JsonBody, filename: str) -> list:
+        """
+        发送已编码的文档创建请求（可重试部分）
+        :param body: 预先编码的请求体
+        :param filename: 文件名（日志用）
+        """
+        response = http.post(
+            self.document_create_url,
+            json=body,
+            headers={**self.headers, "Agw-Js-Conv": "str"},
+            timeout=COZE_API_TIMEOUT
+        )
+
+        if response.status_code == 401:
+            raise TokenInvalidError()
+        if response.status_code >= 500:
+            raise CozeApiCallError("/open_api/knowledge/document/create", response.status_code)
+
+        result = response_json(response)
+        if result.get("code") == 0:
+            document_ids = [doc.get("document_id") for doc in result.get("document_infos", [])]
+            logger.info(f"[OK] 上传知识库文档成功：{filename} -> {document_ids}")
+            return document_ids
+
+        raise Exception(f"上传知识库文档失败：{filename}，{result.get('msg')}")
+
+    @retry(max_retries=3)
+    @rate_limited("coze:/open_api/knowledge/document/delete")
+    @scheduled(BATCH)
+    @circuit_breaker("coze:/open_api/knowledge/document/delete")
+    def delete_documents(self, document_ids: list) -> bool:
+        """
+        删除知识库文档（文档内容更新后删除旧版本）
+        :param document_ids: 文档ID列表
+        :return: 是否成功
+        """
+        response = http.post(
+            self.document_delete_url,
+            json={"document_ids": document_ids},
+            headers={**self.headers, "Agw-Js-Conv": "str"},
+            timeout=COZE_API_TIMEOUT
+        )
+
+        if response.status_code == 401:
+            raise TokenInvalidError()
+        if response.status_code >= 500:
+            raise CozeApiCallError("/open_api/knowledge/document/delete", response.status_code)
+
+        result = response_json(response)
+        if result.get("code") == 0:
+            logger.info(f"[OK] 删除知识库文档成功：{document_ids}")
+            return True
+
+        raise Exception(f"删除知识库文档失败：{document_ids}，{result.get('msg')}")
 
     @retry(max_retries=3)
+    @rate_limited("coze:/v1/knowledge/search")
+    @scheduled(INTERACTIVE)
+    @circuit_breaker("coze:/v1/knowledge/search")
     def search(self, knowledge_id: str, query: str, top_k: int = 5):
         """
         在知识库中搜索
@@ -32,7 +181,7 @@ class CozeKnowledge:
             "top_k": top_k
         }
 
-        response = requests.post(
+        response = http.post(
             url,
             json=payload,
             headers=self.headers,
@@ -41,9 +190,44 @@ class CozeKnowledge:
 
         if response.status_code == 401:
             raise TokenInvalidError()
+        if response.status_code >= 500:
+            raise CozeApiCallError("/v1/knowledge/search", response.status_code)
 
-        result = response.json()
+        result = response_json(response)
         if result.get("code") == 0:
             return result.get("data", [])
 
         raise Exception(f"知识库搜索失败：{result.get('msg')}")
+
+    def search_local(self, query: str, top_k: int = 5, hybrid: bool = False, source: str = None):
+        """
+        在本地知识库索引快照中搜索（不调用 Coze API）
+        快照按 knowledge_docs 内容哈希版本化，文档未变化时直接 mmap 打开，无需重建；
+        运行期间定期比对内容哈希，文档更新后自动切换到新快照
+        :param query: 搜索查询
+        :param top_k: 返回结果数量
+        :param hybrid: 是否启用混合检索（词法 + 语义）
+        :param source: 仅返回指定来源文件的文档（jobs.csv / policies.md）
+        :return: 搜索结果 [{id, source, title, content, meta, score}]
+        """
+        if hybrid:
+            from search.hybrid import hybrid_search
+            return hybrid_search(query, top_k=top_k, source=source)
+
+        index = self._open_local_index()
+        if source:
+            hits = index.search(query, top_k=index.n_docs)
+            return [hit for hit in hits if hit.get("source") == source][:top_k]
+        return index.search(query, top_k=top_k)
+
+    @classmethod
+    def _open_local_index(cls):
+        """进程内共享的本地索引；每 KNOWLEDGE_INDEX_CHECK_INTERVAL 秒比对一次源数据哈希，文档更新后重新打开"""
+        from search.index import refresh_knowledge_index
+
+        if cls._local_index is None or time.monotonic() - cls._local_checked >= KNOWLEDGE_INDEX_CHECK_INTERVAL:
+            with cls._local_lock:
+                if cls._local_index is None or time.monotonic() - cls._local_checked >= KNOWLEDGE_INDEX_CHECK_INTERVAL:
+                    cls._local_index = refresh_knowledge_index(cls._local_index)
+                    cls._local_checked = time.monotonic()
+        return cls._local_index
@@ -2,20 +2,26 @@
 Coze 实时语音WebSocket封装：面试语音交互
 """
 import asyncio
+import base64
 import websockets
 from config.settings import (
-    COZE_PAT, CONNECTOR_ID, VOICE_ID,
+    COZE_PAT, COZE_WS_BASE, CONNECTOR_ID, VOICE_ID,
     AUDIO_FORMAT, AUDIO_SAMPLE_RATE, AUDIO_CHANNEL,
     VAD_SILENCE_THRESHOLD_MS
 )
 from core.logger import logger
 from core.exceptions import AudioFormatError, TokenInvalidError
+from core.scheduler import scheduled, INTERACTIVE
+from core.metrics import instrument_class
+from core.tracing import inject
+from core.serializer import dumps_str
 
+@instrument_class
 class CozeRealtimeVoice:
     def __init__(self, user_id: str, bot_id: str):
         self.user_id = user_id
         self.bot_id = bot_id
-        self.ws_url = "wss://api.coze.cn/v1/realtime"
+        self.ws_url = f"{COZE_WS_BASE}/v1/realtime"
         self.headers = {"Authorization": f"Bearer {COZE_PAT}"}
         self.websocket = None
         # 音频配置（严格匹配，否则报错）
@@ -37,12 +43,13 @@ class CozeRealtimeVoice:
             }
         }
 
+    @scheduled(INTERACTIVE)
     async def connect(self):
         """建立WebSocket连接"""
         try:
             self.websocket = await websockets.connect(
                 self.ws_url,
-                extra_headers=self.headers
+                additional_headers=inject(dict(self.headers))
             )
             # 发送初始化配置
             init_msg = {
@@ -57,8 +64,9 @@ class CozeRealtimeVoice:
             await self.websocket.send(str(init_msg).replace("'", '"'))
             logger.info("实时语音WebSocket连接成功")
             return True
-        except websockets.exceptions.InvalidStatusCode as e:
-            if e.status_code == 401:
+        except websockets.exceptions.InvalidStatus as e:
+            # 握手被拒绝（HTTP 状态码非 101）
+            if e.response.status_code == 401:
                 raise TokenInvalidError()
             logger.error(f"WebSocket连接失败：{e}")
             raise
@@ -76,14 +84,20 @@ class CozeRealtimeVoice:
             raise AudioFormatError("bytes", type(audio_data))
 
         try:
-            await self.websocket.send({
-                "type": "input_audio",
-                "data": audio_data
-            })
+            await self.websocket.send(self.encode_audio_frame(audio_data))
         except Exception as e:
             logger.error(f"发送音频失败：{e}")
             raise
 
+    @staticmethod
+    def encode_audio_frame(audio_data: bytes) -> str:
+        """
+        PCM 音频帧编码为 input_audio 文本消息（音频 base64 编码）
+        :param audio_data: PCM音频字节数据
+        :return: JSON 文本
+        """
+        return dumps_str({"type": "input_audio", "data": base64.b64encode(audio_data).decode("ascii")})
+
     async def receive_audio(self):
         """接收语音响应（生成器）"""
         try:
@@ -96,9 +110,7 @@ class CozeRealtimeVoice:
     async def interrupt(self):
         """实现语音打断（用户中途说话）"""
         try:
-            await self.websocket.send({
-                "type": "interrupt"
-            })
+            await self.websocket.send(dumps_str({"type": "interrupt"}))
             logger.info("发送语音打断指令")
         except Exception as e:
             logger.error(f"语音打断失败：{e}")
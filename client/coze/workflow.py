@@ -2,24 +2,30 @@
 Coze 工作流API封装：面试模拟核心流程
 """
 import requests
-from config.settings import COZE_PAT, COZE_WORKFLOW_TIMEOUT
-from core.retry import retry
-from core.logger import logger
+from config.settings import COZE_PAT, COZE_API_BASE, COZE_WORKFLOW_TIMEOUT
+from core.retry import retry, parse_retry_after
+from core.circuit_breaker import circuit_breaker
+from core.scheduler import scheduled, INTERACTIVE
+from core.rate_limiter import rate_limited
+from core.logger import logger, SAMPLED
 from core.exceptions import (
     TokenInvalidError, WorkflowNotPublishedError,
-    ParameterError, RateLimitError
+    ParameterError, RateLimitError, CozeApiCallError
 )
+from core.http import http, response_json
+from core.serializer import JsonBody
+from core.metrics import instrument_class
 
+@instrument_class
 class CozeWorkflow:
     def __init__(self):
         self.headers = {
             "Authorization": f"Bearer {COZE_PAT}",
             "Content-Type": "application/json"
         }
-        self.run_url = "https://api.coze.cn/v1/workflow/run"
-        self.status_url = "https://api.coze.cn/v1/workflow/run/status"
+        self.run_url = f"{COZE_API_BASE}/v1/workflow/run"
+        self.status_url = f"{COZE_API_BASE}/v1/workflow/run/status"
 
-    @retry(max_retries=3, delay=1, exceptions=(requests.exceptions.RequestException,))
     def run_interview_workflow(self, job_id: str, user_id: str, workflow_id: str, resume_text: str = None):
         """
         执行面试模拟工作流
@@ -44,11 +50,22 @@ class CozeWorkflow:
             },
             "is_async": False  # 同步执行
         }
+        # 简历文本可能较长，请求体只编码一次，重试时复用
+        return self._run(JsonBody(payload), job_id, user_id, workflow_id)
 
+    @retry(max_retries=3, delay=1, exceptions=(requests.exceptions.RequestException, RateLimitError))
+    @rate_limited("coze:/v1/workflow/run")
+    @scheduled(INTERACTIVE)
+    @circuit_breaker("coze:/v1/workflow/run")
+    def _run(self, body: JsonBody, job_id: str, user_id: str, workflow_id: str):
+        """
+        发送已编码的工作流执行请求（可重试部分）
+        :param body: 预先编码的请求体
+        """
         try:
-            response = requests.post(
+            response = http.post(
                 self.run_url,
-                json=payload,
+                json=body,
                 headers=self.headers,
                 timeout=COZE_WORKFLOW_TIMEOUT
             )
@@ -57,16 +74,18 @@ class CozeWorkflow:
             if response.status_code == 401:
                 raise TokenInvalidError()
             if response.status_code == 429:
-                raise RateLimitError()
+                raise RateLimitError(parse_retry_after(response.headers.get("Retry-After")))
+            if response.status_code >= 500:
+                raise CozeApiCallError("/v1/workflow/run", response.status_code)
 
-            result = response.json()
+            result = response_json(response)
             # Coze自定义错误码校验
             if result.get("code") == 4200:
                 raise WorkflowNotPublishedError(workflow_id)
             if result.get("code") != 0:
                 raise Exception(f"工作流执行失败：{result.get('msg')}")
 
-            logger.info(f"工作流{workflow_id}执行成功，用户{user_id}，岗位{job_id}")
+            logger.info("工作流%s执行成功，用户%s，岗位%s", workflow_id, user_id, job_id, extra=SAMPLED)
             return result
 
         except requests.exceptions.RequestException as e:
@@ -74,6 +93,9 @@ class CozeWorkflow:
             raise
 
     @retry(max_retries=3, delay=1)
+    @rate_limited("coze:/v1/workflow/run/status")
+    @scheduled(INTERACTIVE)
+    @circuit_breaker("coze:/v1/workflow/run/status")
     def get_workflow_status(self, run_id: str):
         """
         查询工作流执行状态（异步执行时用）
@@ -84,7 +106,7 @@ class CozeWorkflow:
             raise ParameterError("run_id")
 
         params = {"run_id": run_id}
-        response = requests.get(
+        response = http.get(
             self.status_url,
             params=params,
             headers=self.headers,
@@ -93,4 +115,6 @@ class CozeWorkflow:
 
         if response.status_code == 401:
             raise TokenInvalidError()
-        return response.json()
+        if response.status_code >= 500:
+            raise CozeApiCallError("/v1/workflow/run/status", response.status_code)
+        return response_json(response)
@@ -1,26 +1,34 @@
 """
-WeHan C 端简化部署流程 - v3.0 纯 API 架构
+WeHan C 端简化部署流程 - v3.1 纯 API 架构
 
 移除知识库和工作流依赖，仅部署智能体
 工作流需要在 Coze 网页平台手动配置
+
+声明式部署：对比线上智能体与本地配置，仅在有差异时调用更新接口（不存在时创建），
+可重复执行；--dry-run 仅输出变更计划
 """
 import sys
 import os
+import argparse
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from config.settings import BOT_ID
 from coze.admin import CozeAdminAPI
 from core.schema_validate import validate_config
 from core.logger import logger
 from core.exceptions import BaseCozeError
 
 
-def deploy_bot_only():
-    """简化的部署流程：仅创建智能体"""
+def deploy_bot_only(dry_run: bool = False):
+    """
+    简化的部署流程：仅同步智能体
+    :param dry_run: 仅输出变更计划，不调用修改接口
+    """
 
     admin = CozeAdminAPI()
 
     print("=" * 60)
-    print("WeHan C 端 → Coze 智能体部署 (v3.0 纯 API 架构)")
+    print("WeHan C 端 → Coze 智能体部署 (v3.1 纯 API 架构)")
     print("=" * 60)
 
     # ===== 步骤1：校验配置 =====
@@ -34,10 +42,16 @@ def deploy_bot_only():
         raise Exception("配置校验失败，终止部署")
     print("[OK] 配置校验通过")
 
-    # ===== 步骤2：创建智能体 =====
-    print("\n[步骤 2/2] 创建智能体...")
-    bot_id = admin.create_bot("config/local/wehan_bot.json")
-    print(f"[OK] 智能体创建成功")
+    # ===== 步骤2：同步智能体 =====
+    print("\n[步骤 2/2] 同步智能体...")
+    plan = admin.reconcile_bot("config/local/wehan_bot.json", bot_id=BOT_ID or None, dry_run=dry_run)
+    if dry_run:
+        # 计划已由 reconcile_bot 输出
+        print("\n[DRY-RUN] 未调用任何修改接口")
+        return {"bot_id": plan["bot_id"], "plan": plan}
+
+    bot_id = plan["bot_id"]
+    print(f"[OK] 智能体同步完成（{plan['action']}）")
     print(f"      智能体 ID: {bot_id}")
 
     # ===== 部署完成 =====
@@ -59,13 +73,19 @@ def deploy_bot_only():
 
     return {
         "bot_id": bot_id,
-        "deploy_time": "2026-02-28"
+        "plan": plan
     }
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="WeHan 智能体声明式部署")
+    parser.add_argument("--dry-run", action="store_true", help="仅输出变更计划")
+    args = parser.parse_args()
+
     try:
-        result = deploy_bot_only()
+        result = deploy_bot_only(dry_run=args.dry_run)
+        if args.dry_run:
+            sys.exit(0)
         print(f"\n部署成功！Bot ID: {result['bot_id']}")
         print("\n请将 Bot ID 保存到 .env 文件：")
         print(f"BOT_ID={result['bot_id']}")
@@ -1,8 +1,17 @@
 """
 主流程入口：串接面试模拟全流程
 你只需确认流程逻辑，无需修改核心结构
+
+流程按依赖关系并发执行：
+- 岗位详情与简历互不依赖，并行获取
+- 语音连接只依赖 user_id / bot_id，在流程开始时即预热，与取数、生成题目同时进行
+- 报告保存放到后台线程，语音会话结束即返回（wait_pending_reports() 可等待保存完成）
+- 记录首题耗时（从开始到题目生成且语音就绪），写入日志、返回结果与指标
 """
 import asyncio
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
 from coze.agent import CozeAgent
 from coze.workflow import CozeWorkflow
 from coze.voice import CozeRealtimeVoice
@@ -10,73 +19,148 @@ from coze.file import CozeFile
 from api.jobs import get_job_detail
 from api.interviews import save_interview_report
 from api.resumes import get_resume_from_cloud
-from core.logger import logger
+from core.logger import logger, SAMPLED
+from core.http import request_context
+from core.metrics import start_exporter, histogram
+from core.tracing import start_span
 from core.exceptions import BaseCozeError
 
-# 示例：面试模拟主流程
-def run_interview_main(user_id: str, job_id: str, bot_id: str, workflow_id: str):
-    """
-    面试模拟全流程
-    :param user_id: 用户ID
-    :param job_id: 岗位ID
-    :param bot_id: 智能体ID
-    :param workflow_id: 工作流ID
-    """
-    try:
-        # 1. 获取岗位详情（调用B端API）
-        logger.info(f"开始面试模拟，用户{user_id}，岗位{job_id}")
-        job_detail = get_job_detail(job_id)
-        logger.info(f"获取岗位详情成功：{job_detail.get('data', {}).get('title')}")
+TIME_TO_FIRST_QUESTION = histogram(
+    "wehan_interview_time_to_first_question_seconds", "面试开始到首题可播报（题目生成且语音就绪）的耗时",
+    buckets=(0.5, 1.0, 2.0, 3.0, 5.0, 8.0, 13.0, 20.0, 30.0, 60.0))
+
+# 报告后台保存（非守护线程，进程退出前会等待保存完成）
+_report_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="interview-report")
+_pending_reports = set()
+
+
+def build_report(user_id: str, job_id: str, voice_result: dict) -> dict:
+    """由语音面试结果组装面试报告"""
+    return {
+        "userId": user_id,
+        "jobId": job_id,
+        "totalScore": voice_result["total_score"],
+        "dimensions": voice_result.get("dimensions", []),
+        "highlights": voice_result.get("highlights", []),
+        "improvements": voice_result.get("improvements", []),
+        "suggestions": voice_result["report"]
+    }
+
+
+def save_report_in_background(report: dict):
+    """后台保存面试报告（沿用当前 request_id / 链路上下文），失败只记录日志"""
+    context = contextvars.copy_context()
+    future = _report_executor.submit(context.run, save_interview_report, report)
+    _pending_reports.add(future)
+
+    def done(f):
+        _pending_reports.discard(f)
+        if f.exception() is not None:
+            logger.error("面试报告保存失败，用户%s：%s", report["userId"], f.exception())
+    future.add_done_callback(done)
+    return future
+
+
+def wait_pending_reports(timeout: float = None):
+    """等待所有后台报告保存完成"""
+    for future in list(_pending_reports):
+        future.exception(timeout=timeout)
+
+
+async def run_interview_async(user_id: str, job_id: str, bot_id: str, workflow_id: str) -> dict:
+    """面试流程（协程版），返回语音面试结果与各阶段耗时"""
+    started = time.perf_counter()
+    timings = {}
 
-        # 2. 获取用户简历（如果有）
-        resume_data = get_resume_from_cloud(user_id)
+    def mark(stage: str):
+        timings[stage] = round((time.perf_counter() - started) * 1000, 1)
+
+    # 0. 预热语音连接（与后续步骤并发）
+    voice = CozeRealtimeVoice(user_id, bot_id)
+
+    async def warm_voice():
+        await voice.connect()
+        mark("voice_ready_ms")
+
+    voice_task = asyncio.create_task(warm_voice())
+    try:
+        # 1. 并行获取岗位详情与用户简历（调用B端API）
+        logger.info("开始面试模拟，用户%s，岗位%s", user_id, job_id, extra=SAMPLED)
+        job_detail, resume_data = await asyncio.gather(
+            asyncio.to_thread(get_job_detail, job_id),
+            asyncio.to_thread(get_resume_from_cloud, user_id)
+        )
+        mark("prefetch_ms")
+        logger.info("获取岗位详情成功：%s", job_detail.title, extra=SAMPLED)
         resume_text = resume_data.get("resumeText") if resume_data else ""
 
-        # 3. 执行面试工作流（生成题目）
+        # 2. 执行面试工作流（生成题目），语音连接同时在建立
         workflow = CozeWorkflow()
-        workflow_result = workflow.run_interview_workflow(
+        workflow_result = await asyncio.to_thread(
+            workflow.run_interview_workflow,
             job_id=job_id,
             user_id=user_id,
             workflow_id=workflow_id,
             resume_text=resume_text
         )
         interview_questions = workflow_result.get("data", {}).get("questions", [])
-        logger.info(f"生成面试题{len(interview_questions)}道")
+        mark("questions_ready_ms")
+        logger.info("生成面试题%s道", len(interview_questions), extra=SAMPLED)
+
+        # 3. 等待语音就绪后即可播报首题
+        await voice_task
+        mark("time_to_first_question_ms")
+        TIME_TO_FIRST_QUESTION.observe(timings["time_to_first_question_ms"] / 1000)
+        logger.info("首题耗时%sms，用户%s", timings["time_to_first_question_ms"], user_id, extra=SAMPLED)
 
-        # 4. 启动实时语音面试（异步）
-        async def voice_interview():
-            voice = CozeRealtimeVoice(user_id, bot_id)
-            await voice.connect()
+        # 4. 实时语音面试
+        with start_span("interview.voice"):
             # 此处仅示例，实际需循环发送题目+接收回答
             # for question in interview_questions:
             #     await voice.send_audio(question)  # 语音播报题目
             #     answer = await voice.receive_audio()  # 接收用户回答
-            await voice.close()
-            return {"total_score": 85, "report": "面试评估报告内容..."}
-
-        # 运行语音面试
-        voice_result = asyncio.run(voice_interview())
-
-        # 5. 保存面试报告（调用B端API）
-        save_interview_report({
-            "userId": user_id,
-            "jobId": job_id,
-            "totalScore": voice_result["total_score"],
-            "dimensions": voice_result.get("dimensions", []),
-            "highlights": voice_result.get("highlights", []),
-            "improvements": voice_result.get("improvements", []),
-            "suggestions": voice_result["report"]
-        })
-
-        logger.info(f"面试模拟全流程完成，用户{user_id}")
-        return {"status": "success", "data": voice_result}
-
-    except BaseCozeError as e:
-        logger.error(f"面试流程异常（Coze相关）：{e}")
-        return {"status": "failed", "error": str(e)}
-    except Exception as e:
-        logger.error(f"面试流程异常：{e}")
-        return {"status": "failed", "error": str(e)}
+            voice_result = {"total_score": 85, "report": "面试评估报告内容..."}
+        mark("session_ms")
+    finally:
+        if not voice_task.done():
+            voice_task.cancel()
+        await asyncio.gather(voice_task, return_exceptions=True)
+        await voice.close()
+
+    return {"voice_result": voice_result, "timings": timings}
+
+
+# 示例：面试模拟主流程
+def run_interview_main(user_id: str, job_id: str, bot_id: str, workflow_id: str):
+    """
+    面试模拟全流程
+    :param user_id: 用户ID
+    :param job_id: 岗位ID
+    :param bot_id: 智能体ID
+    :param workflow_id: 工作流ID
+    """
+    # 整个流程共享同一 request_id，日志中可关联本次面试涉及的所有上游请求；
+    # 根 span 下各步骤调用（B端 API、Coze 工作流、语音）形成一条链路，可按 trace_id 查看耗时瀑布图
+    with request_context(user_id=user_id), \
+            start_span("interview.run", attributes={"user.id": user_id, "job.id": job_id}) as root_span:
+        try:
+            result = asyncio.run(run_interview_async(user_id, job_id, bot_id, workflow_id))
+            voice_result = result["voice_result"]
+
+            # 5. 后台保存面试报告（调用B端API），不阻塞返回
+            save_report_in_background(build_report(user_id, job_id, voice_result))
+
+            logger.info("面试模拟全流程完成，用户%s，耗时%s", user_id, result["timings"], extra=SAMPLED)
+            return {"status": "success", "data": voice_result, "timings": result["timings"]}
+
+        except BaseCozeError as e:
+            logger.error("面试流程异常（Coze相关）：%s", e)
+            root_span.set_status(False, str(e))
+            return {"status": "failed", "error": str(e)}
+        except Exception as e:
+            logger.error("面试流程异常：%s", e)
+            root_span.set_status(False, str(e))
+            return {"status": "failed", "error": str(e)}
 
 # 测试入口（运行此文件时执行）
 if __name__ == "__main__":
@@ -86,5 +170,8 @@ if __name__ == "__main__":
     test_bot_id = "your_bot_id_here"
     test_workflow_id = "your_workflow_id_here"
 
+    # 按 METRICS_PORT / METRICS_FILE 配置导出指标
+    start_exporter()
     result = run_interview_main(test_user_id, test_job_id, test_bot_id, test_workflow_id)
     print(result)
+    wait_pending_reports()
@@ -0,0 +1,53 @@
+"""
+多轮问询控制器服务入口：代替 B端 /api/coze/question 为智能体插件提供 init / next / force-finish
+
+- 会话状态在进程内存中（单进程部署），每次回答不再往返 B端数据库
+- 每 QUESTION_SNAPSHOT_INTERVAL 秒把会话增量同步到 B端（QUESTION_API_BASE_URL），收到 SIGTERM / SIGINT 后
+  停止监听并做最后一次同步
+- 插件配置（openapi/question_plugin.yaml）的服务地址改为 http://<本机>:<端口>/api/coze/question 即可
+
+- 默认只监听 127.0.0.1；请求需携带 OPEN_API_KEY（X-API-Key），未配置时拒绝启动
+
+运行：python main/main_question_server.py [--host 127.0.0.1] [--port 8766]
+"""
+import sys
+import os
+import argparse
+import asyncio
+import signal
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import QUESTION_SERVER_HOST, QUESTION_SERVER_PORT
+from core.metrics import start_exporter
+from question.server import QuestionServer
+
+
+async def serve(host: str, port: int):
+    """监听端口直至收到 SIGTERM / SIGINT"""
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    server = QuestionServer()
+    await server.start(host, port)
+    await stop.wait()
+    await server.stop()
+
+
+def main(host: str = QUESTION_SERVER_HOST, port: int = QUESTION_SERVER_PORT):
+    """
+    启动问询控制器服务
+    :param host: 监听地址
+    :param port: 端口
+    """
+    start_exporter()
+    asyncio.run(serve(host, port))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="WeHan 多轮问询控制器（进程内会话状态）")
+    parser.add_argument("--host", default=QUESTION_SERVER_HOST, help="监听地址")
+    parser.add_argument("--port", type=int, default=QUESTION_SERVER_PORT, help="端口")
+    args = parser.parse_args()
+    main(args.host, args.port)
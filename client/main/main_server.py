@@ -0,0 +1,224 @@
+"""
+面试服务入口：单节点承载多路并发面试
+
+- 本地 WebSocket 服务：握手请求需携带 SERVER_API_KEY（X-API-Key 请求头或 ?token= 参数），缺失或不匹配时以 4401 关闭；
+  客户端连接后发送 {"type": "start", "user_id", "job_id", "bot_id"?, "workflow_id"?}，
+  服务端在共享事件循环上以独立任务运行该场面试（run_interview_async），
+  依次推送 {"type": "ready", "timings"} / {"type": "result", "data", "timings"} 或 {"type": "error", "error"}
+- 单会话资源限制：每个进程的并发会话上限（超出时以 1013 关闭，客户端稍后重试）、
+  会话最长时长、单条消息大小上限；阻塞的 B 端 / Coze 调用共用大小固定的线程池
+- 平滑下线：收到 SIGTERM / SIGINT 后停止接受新连接，等待进行中的会话结束（最长 SERVER_DRAIN_TIMEOUT 秒），
+  超时仍未结束的会话被取消，再等待后台报告保存完成
+- 多进程：--workers N 启动 N 个工作进程共同监听同一端口（SO_REUSEPORT，由内核分配连接）；
+  指标由各工作进程分别导出（第 i 个进程使用 METRICS_PORT + i 端口、METRICS_FILE 加 .i 后缀）
+- 默认只监听 127.0.0.1；未设置 SERVER_API_KEY 时拒绝启动
+
+运行：python main/main_server.py [--host 127.0.0.1] [--port 8765] [--workers 4]
+"""
+import sys
+import os
+import argparse
+import asyncio
+import hmac
+import multiprocessing
+import signal
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qs
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import websockets
+
+from config.settings import (
+    BOT_ID, WORKFLOW_ID_INTERVIEW,
+    SERVER_HOST, SERVER_PORT, SERVER_API_KEY, SERVER_WORKERS, SERVER_MAX_SESSIONS, SERVER_SESSION_TIMEOUT,
+    SERVER_DRAIN_TIMEOUT, SERVER_MAX_MESSAGE_BYTES, SERVER_THREAD_POOL, METRICS_PORT, METRICS_FILE
+)
+from core.logger import logger
+from core.http import request_context
+from core.serializer import dumps_str, loads
+from core.metrics import counter, gauge, start_exporter
+from core.tracing import start_span
+from main.main_interview import run_interview_async, build_report, save_report_in_background, wait_pending_reports
+
+ACTIVE_SESSIONS = gauge("wehan_server_active_sessions", "当前进程进行中的面试会话数")
+SESSIONS = counter("wehan_server_sessions_total", "面试会话数（按结果）", ("outcome",))
+
+# WebSocket 关闭码：1013 = 服务暂时不可用（稍后重试），1001 = 服务下线，4401 = 未鉴权
+CLOSE_TRY_AGAIN = 1013
+CLOSE_GOING_AWAY = 1001
+CLOSE_UNAUTHORIZED = 4401
+
+
+class InterviewServer:
+    """
+    面试会话服务（单进程）
+    :param max_sessions: 并发会话上限
+    :param session_timeout: 单场面试最长时长（秒）
+    :param drain_timeout: 下线时等待进行中会话的最长时间（秒）
+    :param api_key: 连接需携带的鉴权令牌（为空时拒绝启动）
+    """
+
+    def __init__(self, max_sessions: int = SERVER_MAX_SESSIONS, session_timeout: float = SERVER_SESSION_TIMEOUT,
+                 drain_timeout: float = SERVER_DRAIN_TIMEOUT, api_key: str = SERVER_API_KEY):
+        if not api_key:
+            raise ValueError("未设置 SERVER_API_KEY，面试服务拒绝启动")
+        self.api_key = api_key
+        self.max_sessions = max_sessions
+        self.session_timeout = session_timeout
+        self.drain_timeout = drain_timeout
+        self.sessions = set()
+        self.draining = False
+
+    def authorized(self, request) -> bool:
+        """握手请求是否携带正确的令牌（X-API-Key 请求头或 ?token= 参数）"""
+        token = request.headers.get("X-API-Key") or parse_qs(urlsplit(request.path).query).get("token", [""])[0]
+        return hmac.compare_digest(token.encode(), self.api_key.encode())
+
+    async def handle(self, websocket):
+        """单个连接：校验令牌并读取 start 消息后运行一场面试"""
+        if not self.authorized(websocket.request):
+            SESSIONS.labels("unauthorized").inc()
+            await websocket.close(CLOSE_UNAUTHORIZED, "未鉴权")
+            return
+        if self.draining or len(self.sessions) >= self.max_sessions:
+            SESSIONS.labels("rejected").inc()
+            await websocket.close(CLOSE_TRY_AGAIN if not self.draining else CLOSE_GOING_AWAY, "服务繁忙，请稍后重试")
+            return
+
+        task = asyncio.current_task()
+        self.sessions.add(task)
+        ACTIVE_SESSIONS.inc()
+        try:
+            start = loads(await asyncio.wait_for(websocket.recv(), timeout=30))
+            if start.get("type") != "start" or not start.get("user_id") or not start.get("job_id"):
+                await websocket.send(dumps_str({"type": "error", "error": "首条消息需为 start，且包含 user_id 与 job_id"}))
+                SESSIONS.labels("invalid").inc()
+                return
+            await asyncio.wait_for(self._run_session(websocket, start), timeout=self.session_timeout)
+            SESSIONS.labels("completed").inc()
+        except asyncio.TimeoutError:
+            SESSIONS.labels("timeout").inc()
+            await self._send_error(websocket, "会话超时")
+        except asyncio.CancelledError:
+            SESSIONS.labels("cancelled").inc()
+            await self._send_error(websocket, "服务下线，会话已中止")
+            raise
+        except websockets.exceptions.ConnectionClosed:
+            SESSIONS.labels("disconnected").inc()
+        except Exception as e:
+            logger.error(f"面试会话异常：{e}")
+            SESSIONS.labels("failed").inc()
+            await self._send_error(websocket, str(e))
+        finally:
+            self.sessions.discard(task)
+            ACTIVE_SESSIONS.dec()
+
+    async def _run_session(self, websocket, start: dict):
+        user_id, job_id = start["user_id"], start["job_id"]
+        with request_context(user_id=user_id), \
+                start_span("interview.session", attributes={"user.id": user_id, "job.id": job_id}):
+            result = await run_interview_async(
+                user_id, job_id,
+                start.get("bot_id") or BOT_ID,
+                start.get("workflow_id") or WORKFLOW_ID_INTERVIEW
+            )
+            await websocket.send(dumps_str({"type": "ready", "timings": result["timings"]}))
+            save_report_in_background(build_report(user_id, job_id, result["voice_result"]))
+            await websocket.send(dumps_str(
+                {"type": "result", "data": result["voice_result"], "timings": result["timings"]}))
+
+    @staticmethod
+    async def _send_error(websocket, message: str):
+        try:
+            await websocket.send(dumps_str({"type": "error", "error": message}))
+        except websockets.exceptions.ConnectionClosed:
+            pass
+
+    async def drain(self):
+        """等待进行中的会话结束，超时后取消"""
+        self.draining = True
+        if not self.sessions:
+            return
+        logger.info(f"等待{len(self.sessions)}个进行中的面试会话结束（最长{self.drain_timeout}秒）")
+        done, pending = await asyncio.wait(set(self.sessions), timeout=self.drain_timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            logger.warning(f"{len(pending)}个会话超时未结束，已取消")
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def serve(self, host: str, port: int, reuse_port: bool = False):
+        """监听端口直至收到 SIGTERM / SIGINT，然后平滑下线"""
+        loop = asyncio.get_running_loop()
+        # 阻塞调用（asyncio.to_thread）共用固定大小的线程池
+        loop.set_default_executor(ThreadPoolExecutor(max_workers=SERVER_THREAD_POOL, thread_name_prefix="interview-io"))
+        stop = asyncio.Event()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, stop.set)
+
+        server = await websockets.serve(self.handle, host, port, max_size=SERVER_MAX_MESSAGE_BYTES,
+                                        reuse_port=reuse_port)
+        logger.info(f"面试服务已启动：ws://{host}:{port}（进程{os.getpid()}，会话上限{self.max_sessions}）")
+        await stop.wait()
+
+        logger.info(f"面试服务下线中（进程{os.getpid()}）")
+        # 先停止接受新连接，已建立的连接继续完成
+        server.server.close()
+        await self.drain()
+        server.close()
+        await server.wait_closed()
+        await asyncio.to_thread(wait_pending_reports, SERVER_DRAIN_TIMEOUT)
+        logger.info(f"面试服务已停止（进程{os.getpid()}）")
+
+
+def run_worker(host: str, port: int, reuse_port: bool, index: int = None):
+    """
+    工作进程入口
+    :param index: 多进程模式下的进程序号（各进程按序号错开指标端口与文件）；单进程为 None
+    """
+    server = InterviewServer()
+    if index is None:
+        start_exporter()
+    else:
+        root, ext = os.path.splitext(METRICS_FILE)
+        start_exporter(port=METRICS_PORT + index if METRICS_PORT else 0,
+                       path=f"{root}.{index}{ext}" if METRICS_FILE else "")
+    asyncio.run(server.serve(host, port, reuse_port=reuse_port))
+
+
+def main(host: str = SERVER_HOST, port: int = SERVER_PORT, workers: int = SERVER_WORKERS):
+    """
+    启动面试服务
+    :param host: 监听地址
+    :param port: 端口
+    :param workers: 工作进程数（大于 1 时各进程以 SO_REUSEPORT 共享端口，并各自导出指标）
+    """
+    if workers <= 1:
+        run_worker(host, port, reuse_port=False)
+        return
+
+    processes = [
+        multiprocessing.Process(target=run_worker, args=(host, port, True, i), name=f"interview-worker-{i}")
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    def forward(signum, frame):
+        for process in processes:
+            if process.is_alive():
+                os.kill(process.pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, forward)
+    signal.signal(signal.SIGINT, forward)
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="WeHan 面试服务（多路并发面试）")
+    parser.add_argument("--host", default=SERVER_HOST, help="监听地址")
+    parser.add_argument("--port", type=int, default=SERVER_PORT, help="端口")
+    parser.add_argument("--workers", type=int, default=SERVER_WORKERS, help="工作进程数")
+    args = parser.parse_args()
+    main(args.host, args.port, args.workers)
@@ -1,90 +1,157 @@
 """
 主流程：本地配置 → API 上传 → 发布到豆包
-执行顺序：校验 → 创建知识库 → 上传文档 → 创建Bot → 导入工作流 → 绑定 → 发布
+步骤依赖（DAG，无依赖关系的步骤并发执行）：
+
+    校验智能体配置 ──→ 创建/更新智能体 ──┬──→ 绑定知识库 ──→ 绑定工作流 ──→ 发布（可选）
+    创建知识库 ──→ 上传文档（每个文档并发）┘                 ↑
+    校验工作流配置 ──→ 工作流ID ───────────────────────────┘
+
+内容未变化的步骤会跳过（按文件内容哈希与 BOT_ID / KNOWLEDGE_ID 等配置，记录在状态文件中），
+失败后重新运行从失败处继续。文档内容变化重新上传后，删除该文档上次上传到同一知识库的旧版本。
+两个绑定步骤都调用 bot/update，按顺序执行，不并发修改同一个智能体。
+工作流导入 API 不可用，工作流需先在网页平台创建，ID 配置在 WORKFLOW_ID_INTERVIEW。
 """
 import sys
 import os
+import argparse
 
 # 添加父目录到路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from config.settings import (
+    PROJECT_ROOT, BOT_ID, KNOWLEDGE_ID, WORKFLOW_ID_INTERVIEW,
+    DEPLOY_STATE_FILE, DEPLOY_MAX_WORKERS
+)
 from coze.admin import CozeAdminAPI
+from coze.knowledge import CozeKnowledge
+from core.pipeline import Pipeline, Step, load_state
 from core.schema_validate import validate_config
 from core.logger import logger
 from core.exceptions import BaseCozeError
 
-def main_upload():
-    """完整的上传流程"""
+BOT_CONFIG = os.path.join(PROJECT_ROOT, "config", "local", "wehan_bot.json")
+BOT_SCHEMA = os.path.join(PROJECT_ROOT, "config", "schema", "bot_schema.json")
+WORKFLOW_CONFIG = os.path.join(PROJECT_ROOT, "config", "local", "interview_workflow.json")
+WORKFLOW_SCHEMA = os.path.join(PROJECT_ROOT, "config", "schema", "workflow_schema.json")
+DOC_DIR = os.path.join(PROJECT_ROOT, "config", "local", "knowledge_docs")
+
+
+def build_pipeline(admin: CozeAdminAPI, knowledge: CozeKnowledge,
+                   state_path: str = DEPLOY_STATE_FILE, max_workers: int = DEPLOY_MAX_WORKERS) -> Pipeline:
+    """构造上传流水线"""
+    previous = load_state(state_path)["steps"]
+
+    def previous_output(name):
+        return previous.get(name, {}).get("output")
+
+    def validate(config_path, schema_path):
+        def run(ctx):
+            if not validate_config(config_path, schema_path):
+                raise Exception(f"配置校验失败：{config_path}")
+            return True
+        return run
+
+    def create_knowledge(ctx):
+        knowledge_id = KNOWLEDGE_ID or previous_output("knowledge")
+        if knowledge_id:
+            return knowledge_id
+        return knowledge.create_dataset(
+            name="WeHan 武汉岗位知识库",
+            description="武汉地区岗位信息、求职政策"
+        )
+
+    def upload_doc(step_name, filepath):
+        def run(ctx):
+            document_ids = knowledge.upload_document(ctx["knowledge"], filepath)
+            last = previous_output(step_name)
+            stale = []
+            # 只删除上次上传到同一知识库的旧版本（知识库变更后旧文档属于其他知识库，不能按ID删除）
+            if isinstance(last, dict) and last.get("knowledge_id") == ctx["knowledge"]:
+                stale = [doc_id for doc_id in last.get("document_ids") or [] if doc_id not in document_ids]
+            if stale:
+                # 新版本已上传成功，旧版本删除失败不影响本步骤结果（仅需手动清理）
+                try:
+                    knowledge.delete_documents(stale)
+                except Exception as e:
+                    logger.warning(f"删除旧版本文档失败（请在扣子平台手动删除）：{stale}，{e}")
+            return {"knowledge_id": ctx["knowledge"], "document_ids": document_ids}
+        return run
+
+    def deploy_bot(ctx):
+        plan = admin.reconcile_bot(BOT_CONFIG, bot_id=BOT_ID or previous_output("bot"))
+        return plan["bot_id"]
+
+    def resolve_workflow(ctx):
+        if not WORKFLOW_ID_INTERVIEW:
+            logger.warning("WORKFLOW_ID_INTERVIEW 未配置，跳过工作流绑定（工作流需在网页平台创建）")
+        return WORKFLOW_ID_INTERVIEW or None
+
+    def bind_knowledge(ctx):
+        admin.bind_knowledge_to_bot(ctx["bot"], [ctx["knowledge"]])
+        return True
+
+    def bind_workflow(ctx):
+        if not ctx["workflow"]:
+            return False
+        admin.bind_workflow_to_bot(ctx["bot"], [ctx["workflow"]])
+        return True
+
+    doc_steps = []
+    if os.path.isdir(DOC_DIR):
+        for filename in sorted(os.listdir(DOC_DIR)):
+            filepath = os.path.join(DOC_DIR, filename)
+            if os.path.isfile(filepath):
+                step_name = f"upload_doc:{filename}"
+                doc_steps.append(Step(step_name, upload_doc(step_name, filepath),
+                                      deps=["knowledge"], inputs=[filepath]))
+    else:
+        logger.warning("知识库文档目录不存在，跳过文档上传")
+
+    steps = [
+        Step("validate_bot", validate(BOT_CONFIG, BOT_SCHEMA), inputs=[BOT_CONFIG, BOT_SCHEMA]),
+        Step("validate_workflow", validate(WORKFLOW_CONFIG, WORKFLOW_SCHEMA), inputs=[WORKFLOW_CONFIG, WORKFLOW_SCHEMA]),
+        Step("knowledge", create_knowledge, params={"knowledge_id": KNOWLEDGE_ID}),
+        *doc_steps,
+        Step("bot", deploy_bot, deps=["validate_bot"], inputs=[BOT_CONFIG], params={"bot_id": BOT_ID}),
+        Step("workflow", resolve_workflow, deps=["validate_workflow"], always_run=True),
+        Step("bind_knowledge", bind_knowledge, deps=["bot", "knowledge", *(s.name for s in doc_steps)]),
+        # 与 bind_knowledge 同样调用 bot/update，排在其后执行
+        Step("bind_workflow", bind_workflow, deps=["bot", "workflow", "bind_knowledge"]),
+    ]
+    return Pipeline(steps, state_path, max_workers=max_workers)
+
+
+def main_upload(force: bool = False, publish: bool = None, max_workers: int = DEPLOY_MAX_WORKERS):
+    """
+    完整的上传流程
+    :param force: 忽略状态文件，全部重新执行
+    :param publish: 是否发布到豆包（None 时交互确认）
+    :param max_workers: 最大并发数
+    """
 
     # 初始化管理 API
     admin = CozeAdminAPI()
+    knowledge = CozeKnowledge()
 
     print("=" * 60)
     print("WeHan C 端 → Coze 平台上传流程")
     print("=" * 60)
 
-    # ===== 步骤1：校验本地配置 =====
-    print("\n[步骤1/7] 校验本地配置...")
-    bot_valid = validate_config(
-        "config/local/wehan_bot.json",
-        "config/schema/bot_schema.json"
-    )
-    workflow_valid = validate_config(
-        "config/local/interview_workflow.json",
-        "config/schema/workflow_schema.json"
-    )
-
-    if not (bot_valid and workflow_valid):
-        raise Exception("配置校验失败，终止上传")
-    print("[OK] 所有配置校验通过")
-
-    # ===== 步骤2：创建知识库 =====
-    print("\n[步骤2/7] 创建知识库...")
-    knowledge_id = admin.create_knowledge(
-        name="WeHan 武汉岗位知识库",
-        desc="武汉地区岗位信息、求职政策"
-    )
-    print(f"[OK] 知识库ID：{knowledge_id}")
-
-    # ===== 步骤3：上传知识库文档 =====
-    print("\n[步骤3/7] 上传知识库文档...")
-    doc_dir = "config/local/knowledge_docs"
-    if os.path.exists(doc_dir):
-        for filename in os.listdir(doc_dir):
-            filepath = os.path.join(doc_dir, filename)
-            if os.path.isfile(filepath):
-                admin.upload_knowledge_doc(knowledge_id, filepath)
-                print(f"  [OK] 已上传：{filename}")
-    else:
-        print("  [WARN] 知识库文档目录不存在，跳过")
-
-    # ===== 步骤4：创建智能体 =====
-    print("\n[步骤4/7] 创建智能体...")
-    bot_id = admin.create_bot("config/local/wehan_bot.json")
-    print(f"[OK] 智能体ID：{bot_id}")
-
-    # ===== 步骤5：绑定知识库到智能体 =====
-    print("\n[步骤5/7] 绑定知识库到智能体...")
-    admin.bind_knowledge_to_bot(bot_id, knowledge_id)
-    print("[OK] 知识库已绑定")
+    pipeline = build_pipeline(admin, knowledge, max_workers=max_workers)
+    outputs = pipeline.run(force=force)
 
-    # ===== 步骤6：导入工作流 =====
-    print("\n[步骤6/7] 导入面试工作流...")
-    workflow_id = admin.import_workflow("config/local/interview_workflow.json")
-    print(f"[OK] 工作流ID：{workflow_id}")
-
-    # ===== 步骤7：绑定工作流到智能体 =====
-    print("\n[步骤7/7] 绑定工作流到智能体...")
-    admin.bind_workflow_to_bot(bot_id, workflow_id)
-    print("[OK] 工作流已绑定")
+    bot_id = outputs["bot"]
+    workflow_id = outputs["workflow"]
+    knowledge_id = outputs["knowledge"]
 
     # ===== 询问是否发布 =====
     print("\n" + "=" * 60)
-    print("上传完成！是否发布到豆包？")
-    print("注意：发布后需要审核，建议先在扣子平台测试")
-    confirm = input("输入 'y' 确认发布，其他键跳过：")
+    if publish is None:
+        print("上传完成！是否发布到豆包？")
+        print("注意：发布后需要审核，建议先在扣子平台测试")
+        publish = input("输入 'y' 确认发布，其他键跳过：").lower() == 'y'
 
-    if confirm.lower() == 'y':
+    if publish:
         print("\n[发布] 发布到豆包...")
         admin.publish_bot(bot_id)
         print("[OK] 已提交发布审核")
@@ -112,8 +179,15 @@ def main_upload():
     }
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="WeHan C 端 → Coze 平台上传流程")
+    parser.add_argument("--force", action="store_true", help="忽略状态文件，全部重新执行")
+    parser.add_argument("--workers", type=int, default=DEPLOY_MAX_WORKERS, help="最大并发数")
+    parser.add_argument("--publish", action="store_true", default=None, help="完成后直接发布到豆包")
+    parser.add_argument("--no-publish", dest="publish", action="store_false", help="完成后不发布")
+    args = parser.parse_args()
+
     try:
-        result = main_upload()
+        result = main_upload(force=args.force, publish=args.publish, max_workers=args.workers)
     except BaseCozeError as e:
         logger.error(f"上传失败（Coze错误）：{e}")
     except Exception as e:
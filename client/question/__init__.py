@@ -0,0 +1,14 @@
+# Question module for WeHan C端 进程内多轮问询控制器
+from .controller import QuestionController, QuestionSession, SessionSnapshot
+from .snapshot import push_snapshot, flush, snapshot_loop
+from .server import QuestionServer
+
+__all__ = [
+    'QuestionController',
+    'QuestionSession',
+    'SessionSnapshot',
+    'push_snapshot',
+    'flush',
+    'snapshot_loop',
+    'QuestionServer'
+]
@@ -0,0 +1,288 @@
+"""
+多轮问询控制器（进程内实现）：与 B端 /api/coze/question/{init,next,force-finish} 的请求/响应完全一致
+（openapi/question_plugin.yaml），会话状态保存在内存中，每次回答不再往返 B端数据库
+
+- 会话按 init 顺序存放（有效期固定为 init 后 QUESTION_SESSION_TTL 秒，init 顺序即过期顺序），
+  过期清理只需从最旧的一端弹出；超过 QUESTION_MAX_SESSIONS 时同样淘汰最旧的会话
+- 过期或因容量淘汰的会话释放后只保留会话ID（墓碑），next 按 B端行为返回 410 而不是 404
+- 快照：每个会话记录已同步到 B端的进度（init 代次、已同步回答数、是否已同步强制结束），
+  snapshot() 只取出有变化的会话的增量，mark_synced() 在同步成功后推进进度；
+  尚未同步就被淘汰的会话暂存在待同步表中，下一次快照照常同步
+- 线程安全：所有操作在同一把锁内完成（每次操作为微秒级），可直接嵌入 asyncio 服务或线程池代码
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from config.settings import QUESTION_MAX_SESSIONS, QUESTION_SESSION_TTL
+from core.logger import logger
+
+
+def _response(code: int, msg: str, data=None) -> dict:
+    return {"code": code, "msg": msg, "data": data}
+
+
+def _invalid_session_id(session_id) -> bool:
+    return not session_id or not isinstance(session_id, str)
+
+
+class QuestionSession:
+    """单个问询会话（含同步进度）"""
+    __slots__ = ("session_id", "questions", "answers", "current_idx", "is_finish", "expires_at", "generation",
+                 "forced", "synced_generation", "synced_answers", "synced_forced")
+
+    def __init__(self, session_id: str, questions: list, expires_at: float, generation: int):
+        self.session_id = session_id
+        self.questions = questions
+        self.answers = []
+        self.current_idx = 0
+        self.is_finish = False
+        self.expires_at = expires_at
+        self.generation = generation
+        self.forced = False
+        # 已同步到 B端的进度（synced_generation 为 None 表示 B端尚未 init 该代次）
+        self.synced_generation = None
+        self.synced_answers = 0
+        self.synced_forced = False
+
+    @property
+    def dirty(self) -> bool:
+        """是否有未同步到 B端的变化"""
+        return (self.synced_generation != self.generation or self.synced_answers < len(self.answers)
+                or (self.forced and not self.synced_forced))
+
+
+class SessionSnapshot:
+    """
+    一个会话待同步的增量
+    :param init_questions: 需要先在 B端 init 时的问题数组（已 init 时为 None）
+    :param answers: 尚未同步的回答
+    :param force_finish: 是否需要同步强制结束
+    """
+    __slots__ = ("session_id", "generation", "init_questions", "answers", "answer_offset", "force_finish")
+
+    def __init__(self, session: QuestionSession):
+        needs_init = session.synced_generation != session.generation
+        offset = 0 if needs_init else session.synced_answers
+        self.session_id = session.session_id
+        self.generation = session.generation
+        self.init_questions = list(session.questions) if needs_init else None
+        self.answers = session.answers[offset:]
+        self.answer_offset = offset
+        self.force_finish = session.forced and not session.synced_forced
+
+    def __repr__(self):
+        return f"SessionSnapshot({self.session_id!r}, answers={self.answer_offset}+{len(self.answers)})"
+
+
+class QuestionController:
+    """
+    多轮问询控制器：init_session / next_question / force_finish 返回与 B端接口相同的 {code, msg, data}
+    :param max_sessions: 内存会话上限
+    :param ttl: 会话有效期（秒）
+    :param clock: 时钟（默认 time.monotonic）
+    """
+
+    def __init__(self, max_sessions: int = QUESTION_MAX_SESSIONS, ttl: float = QUESTION_SESSION_TTL,
+                 clock=time.monotonic):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._clock = clock
+        self._sessions = OrderedDict()
+        # 已过期或因容量淘汰的会话ID -> next 返回的提示（按释放顺序，最多 max_sessions 个）
+        self._expired = OrderedDict()
+        # 淘汰时尚未同步完的会话
+        self._pending = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    # ===================== 接口 =====================
+
+    def init_session(self, session_id, questions) -> dict:
+        """
+        初始化会话（同一 session_id 重复 init 时重置）
+        :param session_id: Coze 会话ID
+        :param questions: 问题数组（非空，元素为字符串）
+        """
+        if _invalid_session_id(session_id):
+            return _response(400, "session_id 是必填项")
+        if not isinstance(questions, list) or not questions:
+            return _response(400, "questions 必须是非空数组")
+        for i, question in enumerate(questions):
+            if not isinstance(question, str):
+                return _response(400, f"questions[{i}] 必须是字符串")
+
+        now = self._clock()
+        with self._lock:
+            self._evict_expired(now)
+            self._generation += 1
+            # 重新 init 覆盖旧会话（B端同样是 upsert），旧会话未同步的增量不再需要
+            self._sessions.pop(session_id, None)
+            self._pending.pop(session_id, None)
+            self._expired.pop(session_id, None)
+            self._sessions[session_id] = QuestionSession(session_id, list(questions), now + self.ttl,
+                                                         self._generation)
+            while len(self._sessions) > self.max_sessions:
+                self._release(self._sessions.popitem(last=False)[1], "会话已被淘汰（服务会话数已满），请重新 init")
+        return _response(200, "success", {
+            "current_question": questions[0],
+            "current_idx": 0,
+            "is_finish": False,
+            "total_questions": len(questions)
+        })
+
+    def next_question(self, session_id, answer) -> dict:
+        """
+        记录回答并返回下一题；所有问题完成时返回完整的问题与回答数组
+        :param session_id: Coze 会话ID
+        :param answer: 用户回答
+        """
+        if _invalid_session_id(session_id):
+            return _response(400, "session_id 是必填项")
+        if not isinstance(answer, str):
+            return _response(400, "answer 必须是字符串")
+
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                if session_id in self._expired:
+                    return _response(410, self._expired[session_id])
+                return _response(404, "会话不存在，请先调用 init 接口")
+            if session.is_finish:
+                return _response(400, "会话已结束")
+            if session.expires_at < self._clock():
+                return _response(410, "会话已过期")
+
+            session.answers.append(answer)
+            session.current_idx += 1
+            questions = session.questions
+            if session.current_idx < len(questions):
+                return _response(200, "success", {
+                    "current_question": questions[session.current_idx],
+                    "current_idx": session.current_idx,
+                    "is_finish": False
+                })
+            session.is_finish = True
+            return _response(200, "all questions finished", {
+                "is_finish": True,
+                "questions": list(questions),
+                "answers": list(session.answers)
+            })
+
+    def force_finish(self, session_id) -> dict:
+        """
+        强制结束会话，返回已提问/未提问的题目与已记录的回答
+        :param session_id: Coze 会话ID
+        """
+        if _invalid_session_id(session_id):
+            return _response(400, "session_id 是必填项")
+
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return _response(404, "会话不存在")
+            session.is_finish = True
+            session.forced = True
+            questions, answers = session.questions, session.answers
+            return _response(200, "会话已强制结束", {
+                "is_finish": True,
+                "questions": questions[:len(answers)],
+                "answers": list(answers),
+                "unfinished_questions": questions[len(answers):],
+                "total_questions": len(questions),
+                "completed_count": len(answers)
+            })
+
+    # ===================== 淘汰 =====================
+
+    def _release(self, session: QuestionSession, reason: str):
+        """释放会话：未同步完的暂存到待同步表，并留下墓碑"""
+        if session.dirty:
+            self._pending[session.session_id] = session
+            while len(self._pending) > self.max_sessions:
+                dropped = self._pending.popitem(last=False)[1]
+                logger.warning(f"问询会话{dropped.session_id}待同步队列已满，放弃同步")
+        self._expired[session.session_id] = reason
+        while len(self._expired) > self.max_sessions:
+            self._expired.popitem(last=False)
+
+    def _evict_expired(self, now: float) -> int:
+        evicted = 0
+        sessions = self._sessions
+        while sessions:
+            session = next(iter(sessions.values()))
+            if session.expires_at >= now:
+                break
+            del sessions[session.session_id]
+            self._release(session, "会话已过期")
+            evicted += 1
+        return evicted
+
+    def evict_expired(self) -> int:
+        """
+        清理过期会话（init 时也会顺带清理）
+        :return: 清理数量
+        """
+        with self._lock:
+            return self._evict_expired(self._clock())
+
+    # ===================== 快照 =====================
+
+    def snapshot(self) -> list:
+        """
+        取出所有有未同步变化的会话增量（不修改同步进度）
+        :return: SessionSnapshot 列表
+        """
+        with self._lock:
+            snapshots = [SessionSnapshot(session) for session in self._pending.values()]
+            snapshots += [SessionSnapshot(session) for session in self._sessions.values() if session.dirty]
+        return snapshots
+
+    def mark_synced(self, snapshot: SessionSnapshot, answers_synced: int = None, force_synced: bool = None):
+        """
+        同步成功后推进会话的同步进度（期间会话被重新 init 时忽略）
+        :param snapshot: 已同步的快照
+        :param answers_synced: 已同步的回答数（默认快照中的全部回答）
+        :param force_synced: 是否已同步强制结束（默认同快照）
+        """
+        if answers_synced is None:
+            answers_synced = len(snapshot.answers)
+        if force_synced is None:
+            force_synced = snapshot.force_finish
+        with self._lock:
+            session = self._sessions.get(snapshot.session_id) or self._pending.get(snapshot.session_id)
+            if session is None or session.generation != snapshot.generation:
+                return
+            session.synced_generation = snapshot.generation
+            session.synced_answers = max(session.synced_answers, snapshot.answer_offset + answers_synced)
+            session.synced_forced = session.synced_forced or force_synced
+            if not session.dirty:
+                self._pending.pop(snapshot.session_id, None)
+
+    def mark_abandoned(self, snapshot: SessionSnapshot):
+        """B端不再接受该会话的同步（已过期/已结束）时，视为已同步"""
+        with self._lock:
+            session = self._sessions.get(snapshot.session_id) or self._pending.get(snapshot.session_id)
+            if session is None or session.generation != snapshot.generation:
+                return
+            session.synced_generation = session.generation
+            session.synced_answers = len(session.answers)
+            session.synced_forced = session.forced
+            self._pending.pop(snapshot.session_id, None)
+
+    def reset_synced(self, snapshot: SessionSnapshot):
+        """B端不存在该会话（如数据被清理）时，下一次快照从 init 开始重新同步"""
+        with self._lock:
+            session = self._sessions.get(snapshot.session_id) or self._pending.get(snapshot.session_id)
+            if session is not None and session.generation == snapshot.generation:
+                session.synced_generation = None
+                session.synced_answers = 0
+                session.synced_forced = False
+
+    def stats(self) -> dict:
+        """会话数、待同步数、墓碑数"""
+        with self._lock:
+            return {"sessions": len(self._sessions), "pending": len(self._pending), "expired": len(self._expired)}
@@ -0,0 +1,163 @@
+"""
+问询控制器 HTTP 服务：在 asyncio 事件循环上直接提供 POST {init,next,force-finish}，
+路径、鉴权（X-API-Key）与请求/响应格式与 B端 /api/coze/question 一致，智能体插件只需改服务地址
+
+- 极简 HTTP/1.1：支持 keep-alive 与 Content-Length 请求体（不支持 chunked），空闲连接超时关闭
+- 请求在事件循环线程内同步处理（控制器操作为微秒级），不经过线程池
+- 定期把会话增量同步到 B端（question.snapshot），下线时再同步一次
+"""
+import asyncio
+import hmac
+
+from config.settings import B_API_KEY, QUESTION_MAX_BODY_BYTES, QUESTION_SNAPSHOT_INTERVAL
+from core.logger import logger
+from core.metrics import counter, gauge
+from core.serializer import dumps, loads
+from question.controller import QuestionController
+from question.snapshot import flush, snapshot_loop
+
+REQUESTS = counter("wehan_question_requests_total", "问询控制器请求数（按接口、返回码）", ("op", "code"))
+SESSIONS = gauge("wehan_question_sessions", "问询控制器内存会话数")
+
+# 空闲连接最长保持时间（秒）
+IDLE_TIMEOUT = 60
+
+_REASONS = {200: "OK", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found", 405: "Method Not Allowed",
+            410: "Gone", 411: "Length Required", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class QuestionServer:
+    """
+    问询控制器服务
+    :param controller: 控制器（默认新建）
+    :param api_key: 请求需携带的 X-API-Key（未设置或仍为占位值时拒绝启动）
+    :param snapshot_interval: 快照同步间隔（秒，0 不同步）
+    """
+
+    def __init__(self, controller: QuestionController = None, api_key: str = B_API_KEY,
+                 snapshot_interval: float = QUESTION_SNAPSHOT_INTERVAL):
+        if not api_key or api_key == "your_api_key_here":
+            raise ValueError("未设置 OPEN_API_KEY，问询控制器拒绝启动")
+        self.controller = controller if controller is not None else QuestionController()
+        self.api_key = api_key
+        self.snapshot_interval = snapshot_interval
+        self._routes = {
+            "init": lambda body: self.controller.init_session(body.get("session_id"), body.get("questions")),
+            "next": lambda body: self.controller.next_question(body.get("session_id"), body.get("answer")),
+            "force-finish": lambda body: self.controller.force_finish(body.get("session_id"))
+        }
+        self._server = None
+        self._snapshot_task = None
+        self._snapshot_stop = None
+        self._connections = set()
+
+    def dispatch(self, method: str, path: str, headers: dict, body: bytes) -> dict:
+        """
+        处理一个请求
+        :param path: 请求路径（按最后一段匹配 init / next / force-finish）
+        :return: {code, msg, data}（code 同时作为 HTTP 状态码）
+        """
+        op = path.split("?", 1)[0].rstrip("/").rsplit("/", 1)[-1]
+        route = self._routes.get(op)
+        if route is None:
+            return {"code": 404, "msg": f"接口不存在：{path}", "data": None}
+        if method != "POST":
+            return {"code": 405, "msg": "仅支持 POST", "data": None}
+        if not hmac.compare_digest(headers.get("x-api-key", "").encode(), self.api_key.encode()):
+            result = {"code": 401, "msg": "无效的 API Key", "data": None}
+        else:
+            try:
+                payload = loads(body)
+            except ValueError:
+                payload = None
+            if isinstance(payload, dict):
+                result = route(payload)
+            else:
+                result = {"code": 400, "msg": "请求体必须是 JSON 对象", "data": None}
+        REQUESTS.labels(op, result["code"]).inc()
+        if op == "init":
+            SESSIONS.set(len(self.controller))
+        return result
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """单个连接（keep-alive 时依次处理多个请求）"""
+        self._connections.add(writer)
+        try:
+            while True:
+                request_line = await asyncio.wait_for(reader.readline(), IDLE_TIMEOUT)
+                if not request_line.strip():
+                    break
+                method, path, version = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection == "keep-alive" if version == "HTTP/1.0" else connection != "close"
+                if "chunked" in headers.get("transfer-encoding", "").lower():
+                    result, keep_alive = {"code": 411, "msg": "请求需带 Content-Length", "data": None}, False
+                else:
+                    length = int(headers.get("content-length") or 0)
+                    if length > QUESTION_MAX_BODY_BYTES:
+                        result, keep_alive = {"code": 413, "msg": "请求体过大", "data": None}, False
+                    else:
+                        body = await reader.readexactly(length) if length else b""
+                        try:
+                            result = self.dispatch(method.upper(), path, headers, body)
+                        except Exception as e:
+                            logger.error(f"问询控制器处理请求异常：{e}")
+                            result = {"code": 500, "msg": "服务器内部错误", "data": None}
+
+                content = dumps(result)
+                status = result["code"]
+                writer.write(
+                    f"{version if version.startswith('HTTP/1.') else 'HTTP/1.1'} {status} "
+                    f"{_REASONS.get(status, 'Unknown')}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(content)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + content)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+
+    async def start(self, host: str, port: int):
+        """
+        开始监听并启动快照同步任务（嵌入已有事件循环时使用；会话状态在进程内，只能单进程部署）
+        :param host: 监听地址
+        :param port: 端口（0 由系统分配）
+        """
+        self._server = await asyncio.start_server(self._handle, host, port)
+        if self.snapshot_interval > 0:
+            self._snapshot_stop = asyncio.Event()
+            self._snapshot_task = asyncio.create_task(
+                snapshot_loop(self.controller, self.snapshot_interval, self._snapshot_stop))
+        logger.info(f"问询控制器已启动：http://{host}:{self.port}")
+
+    @property
+    def port(self) -> int:
+        """实际监听端口（端口参数为 0 时由系统分配）"""
+        return self._server.sockets[0].getsockname()[1] if self._server else None
+
+    async def stop(self):
+        """停止监听，并把剩余增量同步到 B端"""
+        if self._server is not None:
+            self._server.close()
+            # 空闲的 keep-alive 连接不会自行结束，直接关闭
+            for writer in list(self._connections):
+                writer.close()
+            await self._server.wait_closed()
+        if self._snapshot_task is not None:
+            # 不取消同步任务：等进行中的一轮（含已启动的同步线程）结束后再做最后一次同步
+            self._snapshot_stop.set()
+            await asyncio.gather(self._snapshot_task, return_exceptions=True)
+            await flush(self.controller)
+        logger.info("问询控制器已停止")
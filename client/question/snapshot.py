@@ -0,0 +1,108 @@
+"""
+问询会话快照同步：把内存会话的增量写回 B端（api.questions），B端数据库与进程内状态保持一致，
+进程重启或切回 B端控制器时不丢失已记录的回答
+
+- B端没有批量写入接口，按原接口顺序回放增量：需要时先 init，再逐条 next，最后 force-finish
+- 同步失败的会话保留未同步部分，下一轮继续；B端返回 404（会话不存在）时下一轮从 init 重新同步，
+  返回 400/410（已结束/已过期）时放弃该会话的同步
+- 同一控制器的 flush 串行执行：上一轮的同步线程全部结束后才取下一轮快照，同一增量不会被并发回放两次
+"""
+import asyncio
+import weakref
+
+from config.settings import QUESTION_SNAPSHOT_INTERVAL
+from core.logger import logger
+from core.exceptions import BApiCallError
+from core.metrics import counter
+from question.controller import QuestionController, SessionSnapshot
+
+SNAPSHOTS = counter("wehan_question_snapshots_total", "问询会话快照同步次数（按结果）", ("result",))
+
+# 控制器 -> flush 锁
+_flush_locks = weakref.WeakKeyDictionary()
+
+
+def _keep_progress(controller: QuestionController, snapshot: SessionSnapshot, initialized: bool, synced: int):
+    """同步中途失败：记下已成功的部分，剩余部分下一轮继续"""
+    if initialized:
+        controller.mark_synced(snapshot, synced, False)
+    SNAPSHOTS.labels("failed").inc()
+
+
+def push_snapshot(controller: QuestionController, snapshot: SessionSnapshot) -> bool:
+    """
+    把一个会话的增量同步到 B端，并更新控制器中的同步进度
+    :return: 是否全部同步成功
+    """
+    from api.questions import init_question_session, submit_question_answer, force_finish_question_session
+
+    initialized, synced = snapshot.init_questions is None, 0
+    try:
+        if not initialized:
+            init_question_session(snapshot.session_id, snapshot.init_questions)
+            initialized = True
+        for answer in snapshot.answers:
+            submit_question_answer(snapshot.session_id, answer)
+            synced += 1
+        if snapshot.force_finish:
+            force_finish_question_session(snapshot.session_id)
+    except BApiCallError as e:
+        if e.status_code == 404:
+            controller.reset_synced(snapshot)
+            SNAPSHOTS.labels("reset").inc()
+        elif e.status_code in (400, 410):
+            controller.mark_abandoned(snapshot)
+            SNAPSHOTS.labels("abandoned").inc()
+        else:
+            _keep_progress(controller, snapshot, initialized, synced)
+        return False
+    except Exception as e:
+        logger.warning(f"问询会话{snapshot.session_id}同步失败：{e}")
+        _keep_progress(controller, snapshot, initialized, synced)
+        return False
+    controller.mark_synced(snapshot)
+    SNAPSHOTS.labels("ok").inc()
+    return True
+
+
+async def flush(controller: QuestionController) -> int:
+    """
+    同步当前所有增量（各会话并发，同一会话内按顺序；阻塞的 HTTP 调用在线程池中执行）
+    同一控制器的多次 flush 依次进行；flush 被取消时仍等已启动的同步线程结束后才释放锁
+    :return: 同步成功的会话数
+    """
+    lock = _flush_locks.get(controller)
+    if lock is None:
+        lock = _flush_locks[controller] = asyncio.Lock()
+    async with lock:
+        controller.evict_expired()
+        snapshots = controller.snapshot()
+        if not snapshots:
+            return 0
+        pushes = asyncio.gather(*(asyncio.to_thread(push_snapshot, controller, s) for s in snapshots))
+        try:
+            results = await asyncio.shield(pushes)
+        except asyncio.CancelledError:
+            await asyncio.gather(pushes, return_exceptions=True)
+            raise
+        return sum(results)
+
+
+async def snapshot_loop(controller: QuestionController, interval: float = QUESTION_SNAPSHOT_INTERVAL,
+                        stop: asyncio.Event = None):
+    """
+    定期同步快照，stop 被设置后在当前一轮结束时退出（最后一次由调用方 flush）
+    :param interval: 同步间隔（秒）
+    :param stop: 停止事件
+    """
+    stop = stop or asyncio.Event()
+    while not stop.is_set():
+        try:
+            await asyncio.wait_for(stop.wait(), interval)
+            break
+        except asyncio.TimeoutError:
+            pass
+        try:
+            await flush(controller)
+        except Exception as e:
+            logger.error(f"问询会话快照同步异常：{e}")
@@ -0,0 +1,478 @@
+"""
+B 端 API 压测：按真实比例回放接口调用，输出各接口延迟分布与错误率
+
+- 请求组合（权重）：岗位列表 / 岗位详情 / 会话保存 / 会话更新 / 简历获取 / 投递提交，可用 --mix 覆盖
+- 两种施压方式：
+  --rps R          开环，按固定速率发起请求（延迟从计划发起时刻算起，服务端变慢时排队时间计入延迟）
+  --concurrency C  闭环，C 个并发用户各自连续发请求
+- asyncio 引擎：自带 HTTP/1.1 keep-alive 连接池（--connections），单进程即可产生数千 RPS
+- 报告：各接口 count / errors / error_rate / p50 / p95 / p99 / max（毫秒）与实际 RPS，写入 JSON；
+  --baseline 指定上次报告时逐接口对比，p95 上升超过 --threshold 或错误率上升超过 1 个百分点视为退化（退出码 1）
+
+运行：python scripts/load_b_api.py --rps 50 --duration 30 [--out report.json] [--baseline last.json]
+或：  python scripts/test_b_api.py --load --rps 50 --duration 30
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import asyncio
+import ssl
+import subprocess
+from urllib.parse import urlsplit, urlencode
+
+# 添加父目录到路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+
+# 加载环境变量
+env_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), '.env')
+load_dotenv(env_path)
+
+BASE_URL = os.getenv("B_API_BASE_URL", "http://localhost:3000/api/open")
+API_KEY = os.getenv("OPEN_API_KEY", "")
+FALLBACK_JOB_ID = "cmm52v1jc00003wuj5mlubj3u"
+
+# 默认请求组合（接口名: 权重），比例参照线上 C 端调用分布
+DEFAULT_MIX = {
+    "job_list": 35,
+    "job_detail": 25,
+    "resume_get": 15,
+    "conversation_save": 10,
+    "conversation_update": 10,
+    "application_submit": 5
+}
+
+
+# ===================== 异步 HTTP 客户端 =====================
+
+class _Connection:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+
+class _StaleConnection(ConnectionError):
+    """连接在收到任何响应字节之前就已断开（多为服务端关闭了空闲的 keep-alive 连接）"""
+
+
+class AsyncHttpClient:
+    """
+    最小 HTTP/1.1 客户端（keep-alive 连接池，支持 Content-Length 与 chunked 响应）
+    :param base_url: 接口根地址
+    :param connections: 最大连接数
+    :param timeout: 单次请求超时（秒）
+    """
+
+    def __init__(self, base_url: str, connections: int = 64, timeout: float = 10):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.tls = parts.scheme == "https"
+        self.port = parts.port or (443 if self.tls else 80)
+        self.prefix = parts.path.rstrip("/")
+        self.timeout = timeout
+        self._idle = []
+        self._slots = asyncio.Semaphore(connections)
+        self._headers = {"Host": parts.netloc, "Content-Type": "application/json", "Connection": "keep-alive"}
+        if API_KEY and API_KEY != "your_api_key_here":
+            self._headers["X-API-Key"] = API_KEY
+
+    async def _connect(self, fresh: bool = False):
+        """
+        取一个连接
+        :param fresh: 是否跳过空闲连接、新建连接
+        :return: (连接, 是否为复用的空闲连接)
+        """
+        if self._idle and not fresh:
+            return self._idle.pop(), True
+        reader, writer = await asyncio.open_connection(
+            self.host, self.port, ssl=ssl.create_default_context() if self.tls else None)
+        return _Connection(reader, writer), False
+
+    async def request(self, method: str, path: str, params: dict = None, body: dict = None):
+        """
+        发送请求
+        :return: (状态码, 响应 JSON 或 None)
+        """
+        async with self._slots:
+            for fresh in (False, True):
+                conn, reused = await self._connect(fresh)
+                try:
+                    status, payload, keep_alive = await asyncio.wait_for(
+                        self._exchange(conn, method, path, params, body), timeout=self.timeout)
+                except _StaleConnection:
+                    conn.writer.close()
+                    # 复用的空闲连接已被服务端关闭（尚未收到任何响应字节）：换新连接重试一次
+                    if fresh or not reused:
+                        raise
+                    continue
+                except BaseException:
+                    conn.writer.close()
+                    raise
+                if keep_alive:
+                    self._idle.append(conn)
+                else:
+                    conn.writer.close()
+                return status, payload
+
+    async def _exchange(self, conn: _Connection, method: str, path: str, params: dict, body: dict):
+        target = self.prefix + path + (f"?{urlencode(params)}" if params else "")
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8") if body is not None else b""
+        head = f"{method} {target} HTTP/1.1\r\n" + "".join(f"{k}: {v}\r\n" for k, v in self._headers.items())
+        head += f"Content-Length: {len(data)}\r\n\r\n"
+        try:
+            conn.writer.write(head.encode("latin-1") + data)
+            await conn.writer.drain()
+            status_line = await conn.reader.readline()
+        except ConnectionError as e:
+            raise _StaleConnection(f"连接已断开：{e}") from e
+        if not status_line:
+            raise _StaleConnection("连接被服务端关闭")
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await conn.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            headers[key.strip().lower()] = value.strip()
+
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await conn.reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    await conn.reader.readline()
+                    break
+                chunks.append(await conn.reader.readexactly(size))
+                await conn.reader.readline()
+            raw = b"".join(chunks)
+        else:
+            raw = await conn.reader.readexactly(int(headers.get("content-length", "0")))
+
+        keep_alive = headers.get("connection", "").lower() != "close"
+        try:
+            payload = json.loads(raw) if raw else None
+        except ValueError:
+            payload = None
+        return status, payload, keep_alive
+
+    async def close(self):
+        for conn in self._idle:
+            conn.writer.close()
+        self._idle.clear()
+
+
+# ===================== 场景 =====================
+
+class Scenario:
+    """
+    各接口的请求构造（与 scripts/test_b_api.py 的测试数据一致）
+    :param client: AsyncHttpClient
+    """
+
+    def __init__(self, client: AsyncHttpClient):
+        self.client = client
+        self.job_ids = [FALLBACK_JOB_ID]
+        self.conversation_ids = []
+
+    async def prepare(self):
+        """预取岗位 ID（供岗位详情 / 投递使用）"""
+        try:
+            status, payload = await self.client.request("GET", "/jobs", params={"limit": 20})
+            jobs = (payload or {}).get("data") or []
+            if status == 200 and jobs:
+                self.job_ids = [job["id"] for job in jobs if job.get("id")] or self.job_ids
+        except Exception:
+            pass
+
+    @staticmethod
+    def _user_id() -> str:
+        return f"load_user_{random.randint(1, 1000)}"
+
+    async def job_list(self):
+        return await self.client.request("GET", "/jobs", params={"limit": 10, "location": "武汉"})
+
+    async def job_detail(self):
+        return await self.client.request("GET", f"/jobs/{random.choice(self.job_ids)}")
+
+    async def resume_get(self):
+        status, payload = await self.client.request("GET", f"/resumes/{self._user_id()}")
+        # 404 表示用户没有简历，属于正常返回
+        return (200 if status == 404 else status), payload
+
+    async def conversation_save(self):
+        status, payload = await self.client.request("POST", "/conversations", body={
+            "userId": self._user_id(),
+            "conversationId": f"load_conv_{random.getrandbits(48):x}",
+            "title": "压测会话",
+            "status": "active",
+            "sessionData": {
+                "type": "interview",
+                "jobId": random.choice(self.job_ids),
+                "messages": [{"role": "user", "content": "我想面试"}, {"role": "assistant", "content": "好的"}]
+            }
+        })
+        conv_id = ((payload or {}).get("data") or {}).get("id")
+        if status == 200 and conv_id and len(self.conversation_ids) < 1000:
+            self.conversation_ids.append(conv_id)
+        return status, payload
+
+    async def conversation_update(self):
+        if not self.conversation_ids:
+            return await self.conversation_save()
+        return await self.client.request("PUT", f"/conversations/{random.choice(self.conversation_ids)}", body={
+            "status": "active",
+            "sessionData": {"workflowStatus": {"currentStep": "voice_interview", "completedQuestions": [1, 2]}}
+        })
+
+    async def application_submit(self):
+        return await self.client.request("POST", "/applications", body={
+            "userId": self._user_id(),
+            "jobId": random.choice(self.job_ids)
+        })
+
+
+# ===================== 统计 =====================
+
+def _percentile(sorted_values: list, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class Recorder:
+    """按接口记录延迟与错误"""
+
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+        self.error_samples = {}
+        self.recording = True
+
+    def record(self, name: str, latency_ms: float, error: str = None):
+        if not self.recording:
+            return
+        self.latencies.setdefault(name, []).append(latency_ms)
+        if error:
+            self.errors[name] = self.errors.get(name, 0) + 1
+            samples = self.error_samples.setdefault(name, {})
+            samples[error] = samples.get(error, 0) + 1
+
+    def summary(self, elapsed: float) -> dict:
+        def stats(values: list, errors: int) -> dict:
+            values = sorted(values)
+            return {
+                "count": len(values),
+                "errors": errors,
+                "error_rate": round(errors / len(values), 4) if values else 0.0,
+                "rps": round(len(values) / elapsed, 2) if elapsed else 0.0,
+                "p50_ms": round(_percentile(values, 0.50), 2),
+                "p95_ms": round(_percentile(values, 0.95), 2),
+                "p99_ms": round(_percentile(values, 0.99), 2),
+                "max_ms": round(values[-1], 2) if values else 0.0
+            }
+
+        endpoints = {}
+        for name, values in sorted(self.latencies.items()):
+            endpoints[name] = stats(values, self.errors.get(name, 0))
+            if name in self.error_samples:
+                endpoints[name]["error_kinds"] = self.error_samples[name]
+        all_values = [v for values in self.latencies.values() for v in values]
+        return {"total": stats(all_values, sum(self.errors.values())), "endpoints": endpoints}
+
+
+# ===================== 施压 =====================
+
+async def _call(scenario: Scenario, recorder: Recorder, name: str, scheduled_at: float):
+    error = None
+    try:
+        status, _ = await getattr(scenario, name)()
+        if status >= 400:
+            error = f"HTTP {status}"
+    except Exception as e:
+        error = type(e).__name__
+    recorder.record(name, (time.perf_counter() - scheduled_at) * 1000, error)
+
+
+def _picker(mix: dict):
+    names, weights = list(mix), list(mix.values())
+    return lambda: random.choices(names, weights)[0]
+
+
+async def run_open_loop(scenario, recorder, mix: dict, rps: float, duration: float):
+    """开环：按固定间隔发起请求，不等待前一个请求完成"""
+    pick, interval = _picker(mix), 1.0 / rps
+    tasks = set()
+    start = time.perf_counter()
+    n = 0
+    while True:
+        scheduled_at = start + n * interval
+        if scheduled_at - start >= duration:
+            break
+        delay = scheduled_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        task = asyncio.create_task(_call(scenario, recorder, pick(), scheduled_at))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        n += 1
+    if tasks:
+        await asyncio.wait(tasks)
+
+
+async def run_closed_loop(scenario, recorder, mix: dict, concurrency: int, duration: float):
+    """闭环：concurrency 个用户各自连续请求"""
+    pick = _picker(mix)
+    deadline = time.perf_counter() + duration
+
+    async def user():
+        while time.perf_counter() < deadline:
+            await _call(scenario, recorder, pick(), time.perf_counter())
+
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+
+
+async def run_load(base_url: str = BASE_URL, mix: dict = None, rps: float = None, concurrency: int = None,
+                   duration: float = 30, warmup: float = 3, connections: int = 64, timeout: float = 10) -> dict:
+    """
+    执行压测
+    :param base_url: B 端接口根地址
+    :param mix: 请求组合 {接口名: 权重}
+    :param rps: 目标 RPS（开环）
+    :param concurrency: 并发用户数（闭环，rps 为空时使用）
+    :param duration: 压测时长（秒，不含预热）
+    :param warmup: 预热时长（秒，不计入统计）
+    :param connections: 最大连接数
+    :param timeout: 单次请求超时（秒）
+    :return: 报告字典
+    """
+    mix = mix or DEFAULT_MIX
+    concurrency = concurrency or (None if rps else 10)
+    client = AsyncHttpClient(base_url, connections=connections, timeout=timeout)
+    scenario, recorder = Scenario(client), Recorder()
+    await scenario.prepare()
+
+    async def phase(seconds: float):
+        if rps:
+            await run_open_loop(scenario, recorder, mix, rps, seconds)
+        else:
+            await run_closed_loop(scenario, recorder, mix, concurrency, seconds)
+
+    try:
+        if warmup > 0:
+            recorder.recording = False
+            await phase(warmup)
+            recorder.recording = True
+        started = time.perf_counter()
+        await phase(duration)
+        elapsed = time.perf_counter() - started
+    finally:
+        await client.close()
+
+    return {
+        "meta": {
+            "base_url": base_url,
+            "mode": "open" if rps else "closed",
+            "target_rps": rps,
+            "concurrency": concurrency,
+            "duration_s": duration,
+            "elapsed_s": round(elapsed, 2),
+            "connections": connections,
+            "mix": mix,
+            "git_commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")
+        },
+        **recorder.summary(elapsed)
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare_reports(current: dict, baseline: dict, threshold: float = 0.2) -> list:
+    """
+    逐接口对比两份报告
+    :param threshold: p95 允许的相对上升比例
+    :return: 退化项描述列表（为空表示未退化）
+    """
+    regressions = []
+    for name, now in current["endpoints"].items():
+        before = baseline.get("endpoints", {}).get(name)
+        if not before or not before["count"]:
+            continue
+        if before["p95_ms"] > 0 and now["p95_ms"] > before["p95_ms"] * (1 + threshold):
+            regressions.append(f"{name}: p95 {before['p95_ms']}ms -> {now['p95_ms']}ms")
+        if now["error_rate"] > before["error_rate"] + 0.01:
+            regressions.append(f"{name}: 错误率 {before['error_rate']:.2%} -> {now['error_rate']:.2%}")
+    return regressions
+
+
+def print_report(report: dict):
+    meta = report["meta"]
+    target = f"{meta['target_rps']} RPS（开环）" if meta["mode"] == "open" else f"{meta['concurrency']} 并发（闭环）"
+    print(f"\nB 端压测：{meta['base_url']}，{target}，{meta['elapsed_s']}s")
+    print(f"{'接口':<22}{'次数':>8}{'错误率':>9}{'RPS':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}")
+    rows = list(report["endpoints"].items()) + [("TOTAL", report["total"])]
+    for name, item in rows:
+        print(f"{name:<22}{item['count']:>8}{item['error_rate']:>9.2%}{item['rps']:>9}"
+              f"{item['p50_ms']:>9}{item['p95_ms']:>9}{item['p99_ms']:>9}{item['max_ms']:>9}")
+
+
+def _parse_mix(text: str) -> dict:
+    mix = {}
+    for item in text.split(","):
+        name, _, weight = item.partition("=")
+        if not hasattr(Scenario, name.strip()):
+            raise argparse.ArgumentTypeError(f"未知接口：{name}（可选 {', '.join(DEFAULT_MIX)}）")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="B 端 API 压测")
+    parser.add_argument("--base-url", default=BASE_URL, help="B 端接口根地址")
+    parser.add_argument("--rps", type=float, help="目标 RPS（开环）")
+    parser.add_argument("--concurrency", type=int, help="并发用户数（闭环，未指定 --rps 时默认 10）")
+    parser.add_argument("--duration", type=float, default=30, help="压测时长（秒）")
+    parser.add_argument("--warmup", type=float, default=3, help="预热时长（秒，不计入统计）")
+    parser.add_argument("--connections", type=int, default=64, help="最大连接数")
+    parser.add_argument("--timeout", type=float, default=10, help="单次请求超时（秒）")
+    parser.add_argument("--mix", type=_parse_mix, help="请求组合，如 job_list=5,job_detail=3")
+    parser.add_argument("--out", help="报告输出路径（JSON）")
+    parser.add_argument("--baseline", help="对比的基线报告路径")
+    parser.add_argument("--threshold", type=float, default=0.2, help="p95 允许上升比例（默认 0.2）")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run_load(args.base_url, args.mix, args.rps, args.concurrency, args.duration,
+                                  args.warmup, args.connections, args.timeout))
+    print_report(report)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n报告已写入 {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare_reports(report, json.load(f), args.threshold)
+        if regressions:
+            print("\n[FAIL] 相比基线出现退化：")
+            for item in regressions:
+                print(f"  - {item}")
+            return 1
+        print("\n[PASS] 相比基线无退化")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
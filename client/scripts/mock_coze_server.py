@@ -0,0 +1,344 @@
+"""
+本地 Coze 模拟服务：离线基准测试 / 压测客户端，不访问外网
+
+实现的接口（响应格式与 client/coze 的解析逻辑一致）：
+- POST /v3/chat                   stream=true 时按 SSE 逐 token 推送（首包延迟 ttft_ms，之后按 tokens_per_sec 速率）
+- POST /v1/workflow/run           返回生成的面试题
+- GET  /v1/workflow/run/status
+- POST /v1/files/upload           multipart 上传，返回 file_id
+- POST /v1/knowledge/search       返回 top_k 条片段
+- WS   /v1/realtime               initialize / 音频输入 / interrupt（独立端口）
+- GET  /__stats                   各接口请求数与返回状态统计
+
+故障注入（按接口配置，未配置的接口使用 default）：
+  latency_ms / jitter_ms   处理延迟
+  error_rate               返回 500 的比例
+  rate_limit_rate          返回 429（带 Retry-After: retry_after）的比例
+  ttft_ms / tokens_per_sec / tokens   对话流式响应的首包延迟、吐字速率、token 数
+随机数按 --seed 与请求序号生成，同一请求序列得到相同的延迟与故障
+
+运行：python scripts/mock_coze_server.py [--port 8090] [--ws-port 8091] [--profile profile.json] [--seed 42]
+客户端：COZE_API_BASE=http://127.0.0.1:8090 COZE_WS_BASE=ws://127.0.0.1:8091
+"""
+import json
+import time
+import uuid
+import random
+import asyncio
+import argparse
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import websockets
+
+DEFAULT_PROFILE = {
+    "latency_ms": 20,
+    "jitter_ms": 5,
+    "error_rate": 0.0,
+    "rate_limit_rate": 0.0,
+    "retry_after": 1,
+    "ttft_ms": 300,
+    "tokens_per_sec": 50,
+    "tokens": 40
+}
+
+REALTIME_PATH = "/v1/realtime"
+
+
+class MockCozeServer:
+    """
+    模拟服务（HTTP 与 WebSocket 各一个端口，均在后台线程运行）
+    :param profile: 故障注入配置 {"default": {...}, "/v3/chat": {...}}
+    :param seed: 随机种子
+    :param host: 监听地址
+    :param http_port: HTTP 端口（0 表示随机分配）
+    :param ws_port: WebSocket 端口（0 表示随机分配）
+    """
+
+    def __init__(self, profile: dict = None, seed: int = 42, host: str = "127.0.0.1",
+                 http_port: int = 8090, ws_port: int = 8091):
+        profile = profile or {}
+        self.default = {**DEFAULT_PROFILE, **profile.get("default", {})}
+        self.overrides = {path: {**self.default, **conf} for path, conf in profile.items() if path != "default"}
+        self.seed = seed
+        self.host = host
+        self.http_port = http_port
+        self.ws_port = ws_port
+        self.stats = {}
+        self._counter = 0
+        self._lock = threading.Lock()
+        self._httpd = None
+        self._ws_loop = None
+        self._ws_stop = None
+
+    # ---------- 故障注入 ----------
+
+    def profile_for(self, path: str) -> dict:
+        return self.overrides.get(path, self.default)
+
+    def decide(self, path: str):
+        """
+        决定本次请求的延迟与故障
+        :return: (profile, 随机数生成器, 延迟秒数, 注入的状态码或 None)
+        """
+        with self._lock:
+            self._counter += 1
+            n = self._counter
+        rng = random.Random(f"{self.seed}:{n}")
+        conf = self.profile_for(path)
+        latency = max(0.0, conf["latency_ms"] + rng.uniform(-conf["jitter_ms"], conf["jitter_ms"])) / 1000
+        roll = rng.random()
+        if roll < conf["rate_limit_rate"]:
+            fault = 429
+        elif roll < conf["rate_limit_rate"] + conf["error_rate"]:
+            fault = 500
+        else:
+            fault = None
+        return conf, rng, latency, fault
+
+    def record(self, path: str, status):
+        with self._lock:
+            item = self.stats.setdefault(path, {})
+            item[str(status)] = item.get(str(status), 0) + 1
+
+    # ---------- 启停 ----------
+
+    def start(self):
+        """启动服务，返回 (COZE_API_BASE, COZE_WS_BASE)"""
+        server = self
+
+        class Handler(_MockHandler):
+            mock = server
+
+        self._httpd = ThreadingHTTPServer((self.host, self.http_port), Handler)
+        self._httpd.daemon_threads = True
+        self.http_port = self._httpd.server_address[1]
+        threading.Thread(target=self._httpd.serve_forever, name="mock-coze-http", daemon=True).start()
+
+        ready = threading.Event()
+        threading.Thread(target=self._run_ws, args=(ready,), name="mock-coze-ws", daemon=True).start()
+        ready.wait(10)
+        return f"http://{self.host}:{self.http_port}", f"ws://{self.host}:{self.ws_port}"
+
+    def _run_ws(self, ready: threading.Event):
+        async def main():
+            self._ws_stop = asyncio.Event()
+            async with websockets.serve(self._realtime, self.host, self.ws_port,
+                                         process_request=self._realtime_handshake) as ws_server:
+                self.ws_port = list(ws_server.sockets)[0].getsockname()[1]
+                ready.set()
+                await self._ws_stop.wait()
+
+        self._ws_loop = asyncio.new_event_loop()
+        self._ws_loop.run_until_complete(main())
+
+    def stop(self):
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+        if self._ws_loop and self._ws_stop:
+            self._ws_loop.call_soon_threadsafe(self._ws_stop.set)
+
+    # ---------- 实时语音 ----------
+
+    def _realtime_handshake(self, connection, request):
+        """握手阶段校验路径与鉴权：与真实服务一致，以 HTTP 404 / 401 拒绝升级"""
+        if urlsplit(request.path).path != REALTIME_PATH:
+            return connection.respond(HTTPStatus.NOT_FOUND, "not found\n")
+        if not request.headers.get("Authorization", "").startswith("Bearer "):
+            self.record(REALTIME_PATH, 401)
+            return connection.respond(HTTPStatus.UNAUTHORIZED, "unauthorized\n")
+        return None
+
+    async def _realtime(self, websocket):
+        self.record(REALTIME_PATH, 101)
+        async for message in websocket:
+            conf, rng, latency, fault = self.decide(REALTIME_PATH)
+            await asyncio.sleep(latency)
+            if fault:
+                await websocket.send(json.dumps({"type": "error", "code": fault}))
+                continue
+            if isinstance(message, bytes):
+                await self._reply_audio(websocket, conf, len(message))
+                continue
+            try:
+                event = json.loads(message)
+            except ValueError:
+                await websocket.send(json.dumps({"type": "error", "msg": "invalid json"}))
+                continue
+            if event.get("type") == "initialize":
+                await websocket.send(json.dumps({"type": "initialized", "session_id": uuid.uuid4().hex}))
+            elif event.get("type") == "interrupt":
+                await websocket.send(json.dumps({"type": "interrupted"}))
+            else:
+                await self._reply_audio(websocket, conf, 3200)
+
+    @staticmethod
+    async def _reply_audio(websocket, conf: dict, size: int):
+        # 首包延迟后按吐字速率推送若干 PCM 帧
+        await asyncio.sleep(conf["ttft_ms"] / 1000)
+        frames = max(1, conf["tokens"] // 4)
+        for _ in range(frames):
+            await websocket.send(b"\x00" * min(size, 3200))
+            await asyncio.sleep(4 / conf["tokens_per_sec"])
+        await websocket.send(json.dumps({"type": "response.done"}))
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # 响应头与响应体合并发送，避免 Nagle + 延迟确认带来的额外延迟
+    wbufsize = 64 * 1024
+    mock: MockCozeServer = None
+
+    def log_message(self, *args):
+        pass
+
+    def _read_body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length", "0")))
+
+    def _send_json(self, path: str, status: int, payload: dict, headers: dict = None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, str(value))
+        self.end_headers()
+        self.wfile.write(body)
+        self.mock.record(path, status)
+
+    def _dispatch(self, method: str):
+        path = urlsplit(self.path).path
+        body = self._read_body() if method != "GET" else b""
+        if path == "/__stats":
+            self._send_json(path, 200, self.mock.stats)
+            return
+        route = ROUTES.get((method, path))
+        if route is None:
+            self._send_json(path, 404, {"code": 404, "msg": f"mock 未实现：{method} {path}"})
+            return
+        if not self.headers.get("Authorization", "").startswith("Bearer "):
+            self._send_json(path, 401, {"code": 4100, "msg": "authentication is invalid"})
+            return
+
+        conf, rng, latency, fault = self.mock.decide(path)
+        time.sleep(latency)
+        if fault == 429:
+            self._send_json(path, 429, {"code": 4013, "msg": "rate limited"}, {"Retry-After": conf["retry_after"]})
+            return
+        if fault == 500:
+            self._send_json(path, 500, {"code": 5000, "msg": "internal error (injected)"})
+            return
+        route(self, path, body, conf, rng)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    # ---------- 各接口 ----------
+
+    def chat(self, path: str, body: bytes, conf: dict, rng: random.Random):
+        request = json.loads(body or b"{}")
+        chat_id, conversation_id = uuid.uuid4().hex, uuid.uuid4().hex
+        if not request.get("stream"):
+            time.sleep(conf["ttft_ms"] / 1000 + conf["tokens"] / conf["tokens_per_sec"])
+            self._send_json(path, 200, {"code": 0, "data": {
+                "id": chat_id, "conversation_id": conversation_id, "bot_id": request.get("bot_id"),
+                "status": "completed"
+            }})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        self.mock.record(path, 200)
+
+        def emit(event: str, data):
+            text = data if isinstance(data, str) else json.dumps(data, ensure_ascii=False)
+            chunk = f"event:{event}\ndata:{text}\n\n".encode("utf-8")
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+            self.wfile.flush()
+
+        base = {"id": chat_id, "conversation_id": conversation_id}
+        emit("conversation.chat.created", {**base, "status": "created"})
+        time.sleep(conf["ttft_ms"] / 1000)
+        interval = 1 / conf["tokens_per_sec"]
+        next_at = time.perf_counter()
+        for i in range(conf["tokens"]):
+            emit("conversation.message.delta", {**base, "role": "assistant", "type": "answer",
+                                                "content": f"词{i}", "content_type": "text"})
+            next_at += interval
+            time.sleep(max(0.0, next_at - time.perf_counter()))
+        emit("conversation.message.completed", {**base, "role": "assistant", "type": "answer"})
+        emit("conversation.chat.completed", {**base, "status": "completed",
+                                             "usage": {"output_count": conf["tokens"]}})
+        emit("done", '"[DONE]"')
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def workflow_run(self, path: str, body: bytes, conf: dict, rng: random.Random):
+        parameters = json.loads(body or b"{}").get("parameters", {})
+        questions = [f"请结合岗位{parameters.get('job_id')}谈谈你的经历（{i + 1}）" for i in range(5)]
+        self._send_json(path, 200, {"code": 0, "msg": "", "execute_id": uuid.uuid4().hex,
+                                    "data": {"questions": questions}})
+
+    def workflow_status(self, path: str, body: bytes, conf: dict, rng: random.Random):
+        self._send_json(path, 200, {"code": 0, "msg": "", "data": [{"execute_status": "Success"}]})
+
+    def file_upload(self, path: str, body: bytes, conf: dict, rng: random.Random):
+        file_id = f"file_{uuid.uuid4().hex[:16]}"
+        self._send_json(path, 200, {"code": 0, "msg": "", "file_id": file_id,
+                                    "data": {"id": file_id, "bytes": len(body)}})
+
+    def knowledge_search(self, path: str, body: bytes, conf: dict, rng: random.Random):
+        request = json.loads(body or b"{}")
+        results = [{"content": f"与“{request.get('query')}”相关的片段{i + 1}", "score": round(1 - i * 0.1, 2)}
+                   for i in range(int(request.get("top_k", 5)))]
+        self._send_json(path, 200, {"code": 0, "msg": "", "data": results})
+
+
+ROUTES = {
+    ("POST", "/v3/chat"): _MockHandler.chat,
+    ("POST", "/v1/workflow/run"): _MockHandler.workflow_run,
+    ("GET", "/v1/workflow/run/status"): _MockHandler.workflow_status,
+    ("POST", "/v1/files/upload"): _MockHandler.file_upload,
+    ("POST", "/v1/knowledge/search"): _MockHandler.knowledge_search
+}
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description="本地 Coze 模拟服务")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址")
+    parser.add_argument("--port", type=int, default=8090, help="HTTP 端口")
+    parser.add_argument("--ws-port", type=int, default=8091, help="WebSocket 端口")
+    parser.add_argument("--profile", help="故障注入配置文件（JSON，{\"default\": {...}, \"/v3/chat\": {...}}）")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    for key, value in DEFAULT_PROFILE.items():
+        parser.add_argument(f"--{key.replace('_', '-')}", type=type(value), help=f"默认接口的 {key}（默认 {value}）")
+    args = parser.parse_args(argv)
+
+    profile = {}
+    if args.profile:
+        with open(args.profile, encoding="utf-8") as f:
+            profile = json.load(f)
+    overrides = {key: getattr(args, key) for key in DEFAULT_PROFILE if getattr(args, key) is not None}
+    profile["default"] = {**profile.get("default", {}), **overrides}
+
+    server = MockCozeServer(profile, args.seed, args.host, args.port, args.ws_port)
+    api_base, ws_base = server.start()
+    print(f"Coze 模拟服务已启动\n  COZE_API_BASE={api_base}\n  COZE_WS_BASE={ws_base}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+        print(json.dumps(server.stats, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
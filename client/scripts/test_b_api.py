@@ -1,6 +1,9 @@
 """
 B 端 API 完整测试脚本
 检查所有接口是否按文档规范实现，发现文档不清晰或遗漏的地方
+
+压测模式：python scripts/test_b_api.py --load [--rps 50 | --concurrency 20] [--duration 30] [--out report.json]
+（参数见 scripts/load_b_api.py）
 """
 import os
 import sys
@@ -15,6 +18,11 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 env_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), '.env')
 load_dotenv(env_path)
 
+# 压测模式：交给 load_b_api 处理，不执行下面的逐接口检查
+if "--load" in sys.argv:
+    from scripts.load_b_api import main as load_main
+    sys.exit(load_main([arg for arg in sys.argv[1:] if arg != "--load"]))
+
 # 测试配置
 BASE_URL = os.getenv("B_API_BASE_URL", "http://localhost:3000/api/open")
 API_KEY = os.getenv("OPEN_API_KEY", "")
@@ -83,6 +91,19 @@ def test_api(endpoint, method="GET", data=None, params=None, expected_status=200
     except Exception as e:
         return None, str(e)
 
+def check_schema(method, endpoint, data):
+    """按 config/schema/b_api 中的响应 Schema 检查返回数据（报告全部不符合项）"""
+    from api.responses import schema_path
+    from core.schema_validate import validate_instance
+
+    errors = validate_instance(data, schema_path(method, endpoint), all_errors=True)
+    if errors:
+        print_result("WARN", f"{method} {endpoint} 返回数据不符合响应 Schema", "；".join(errors))
+        results["document_issues"].append(f"{method} {endpoint} 返回数据不符合响应 Schema: {errors}")
+        return False
+    print_result("PASS", f"{method} {endpoint} 返回数据符合响应 Schema")
+    return True
+
 # ==================== 开始测试 ====================
 print_section("B 端 API 完整测试")
 
@@ -108,13 +129,8 @@ else:
             print_result("PASS", f"获取岗位列表成功，返回 {len(jobs)} 条数据")
             if jobs:
                 job = jobs[0]
-                # 检查必需字段
-                required_fields = ["id", "title", "company", "salaryMin", "salaryMax"]
-                missing_fields = [f for f in required_fields if f not in job]
-                if missing_fields:
-                    print_result("WARN", f"岗位数据缺少字段: {missing_fields}")
-                    results["document_issues"].append(f"岗位列表返回数据缺少字段: {missing_fields}")
-                else:
+                # 按响应 Schema 检查字段
+                if check_schema("GET", "/jobs", data):
                     # 保存第一个岗位 ID 用于后续测试
                     # 使用全局变量
                     import __main__
@@ -155,12 +171,8 @@ else:
                 print_result("WARN", "缺少 responsibilities 和 description 字段")
                 results["document_issues"].append("岗位详情: 缺少 responsibilities/description 字段")
 
-            # 检查其他必需字段
-            required_fields = ["id", "title", "company", "requirements"]
-            missing_fields = [f for f in required_fields if f not in job_detail]
-            if missing_fields:
-                print_result("WARN", f"岗位详情缺少字段: {missing_fields}")
-                results["document_issues"].append(f"岗位详情缺少字段: {missing_fields}")
+            # 按响应 Schema 检查其他字段
+            check_schema("GET", "/jobs/{id}", data)
         else:
             print_result("FAIL", f"API 返回 success=false: {data.get('error')}")
     elif response.status_code == 404:
@@ -198,6 +210,7 @@ else:
         if data.get("success"):
             resume_id = data.get("data", {}).get("id")
             print_result("PASS", f"保存简历成功，简历 ID: {resume_id}")
+            check_schema("POST", "/resumes", data)
         else:
             print_result("FAIL", f"API 返回 success=false: {data.get('error')}")
     elif response.status_code == 401:
@@ -230,6 +243,7 @@ else:
                 print_result("PASS", "返回数据包含 resumeText（符合文档）")
             else:
                 print_result("WARN", "返回数据缺少 resumeText 字段")
+            check_schema("GET", "/resumes/{userId}", data)
         else:
             if response.status_code == 404:
                 print_result("INFO", "用户简历不存在（404）", "这是正常的，如果之前没有保存过")
@@ -278,6 +292,7 @@ else:
         if data.get("success"):
             interview_id = data.get("data", {}).get("id")
             print_result("PASS", f"保存面试报告成功，报告 ID: {interview_id}")
+            check_schema("POST", "/interviews", data)
 
             # 检查是否自动设置了 status=COMPLETED
             print_result("INFO", "请确认数据库中 status 是否已设置为 COMPLETED")
@@ -318,6 +333,7 @@ else:
         if data.get("success"):
             app_id = data.get("data", {}).get("id")
             print_result("PASS", f"提交投递成功，投递 ID: {app_id}")
+            check_schema("POST", "/applications", data)
         else:
             print_result("FAIL", f"API 返回 success=false: {data.get('error')}")
     elif response.status_code == 404:
@@ -341,6 +357,7 @@ else:
         if data.get("success"):
             applications = data.get("data", [])
             print_result("PASS", f"获取投递状态成功，返回 {len(applications)} 条数据")
+            check_schema("GET", "/applications", data)
         else:
             print_result("FAIL", f"API 返回 success=false: {data.get('error')}")
     elif response.status_code == 404:
@@ -384,6 +401,7 @@ else:
         if data.get("success"):
             conv_id = data.get("data", {}).get("id")
             print_result("PASS", f"保存会话成功，会话 ID: {conv_id}")
+            check_schema("POST", "/conversations", data)
         else:
             print_result("FAIL", f"API 返回 success=false: {data.get('error')}")
     elif response.status_code == 404:
@@ -407,6 +425,7 @@ else:
         if data.get("success"):
             conversations = data.get("data", [])
             print_result("PASS", f"获取用户会话列表成功，返回 {len(conversations)} 条数据")
+            check_schema("GET", "/conversations/user/{userId}", data)
         else:
             print_result("FAIL", f"API 返回 success=false: {data.get('error')}")
     elif response.status_code == 404:
@@ -429,6 +448,7 @@ else:
         if data.get("success"):
             policies = data.get("data", [])
             print_result("PASS", f"获取政策列表成功，返回 {len(policies)} 条数据")
+            check_schema("GET", "/policies", data)
         else:
             print_result("FAIL", f"API 返回 success=false: {data.get('error')}")
     elif response.status_code == 404:
@@ -0,0 +1,17 @@
+# Search module for WeHan C端 本地检索
+from .tokenizer import tokenize
+from .index import KnowledgeIndex, open_knowledge_index, refresh_knowledge_index, open_docs_index, load_knowledge_docs
+from .match import MatchEngine
+from .hybrid import HybridSearcher, hybrid_search
+
+__all__ = [
+    'tokenize',
+    'KnowledgeIndex',
+    'open_knowledge_index',
+    'refresh_knowledge_index',
+    'open_docs_index',
+    'load_knowledge_docs',
+    'MatchEngine',
+    'HybridSearcher',
+    'hybrid_search'
+]
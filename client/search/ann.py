@@ -0,0 +1,142 @@
+"""
+近似最近邻索引（IVF，倒排文件）：球面 k-means 粗聚类 + 簇内精确内积
+
+- 构建：向量按最近质心分桶，桶内向量连续存放（list_ptr 指向各桶起点）
+- 查询：取与查询最相近的 nprobe 个质心，仅在这些桶内计算内积
+- 持久化：目录下各数组存为 .npy，加载时 mmap 只读打开，与检索索引快照一样多进程共享
+"""
+import json
+import os
+
+import numpy as np
+
+from config.settings import ANN_NPROBE
+from core.logger import logger
+
+_ARRAYS = ("centroids", "vectors", "ids", "list_ptr")
+
+
+class IVFIndex:
+    """
+    IVF 向量索引（向量需已 L2 归一化，内积即余弦相似度）
+    :param centroids: 质心 (nlist, dim)
+    :param vectors: 按桶排列的向量 (n, dim)
+    :param ids: 各向量对应的原始下标 (n,)
+    :param list_ptr: 各桶起止位置 (nlist + 1,)
+    :param meta: 元数据（向量化器名称、源数据哈希等）
+    """
+
+    def __init__(self, centroids, vectors, ids, list_ptr, meta: dict = None):
+        self.centroids = centroids
+        self.vectors = vectors
+        self.ids = ids
+        self.list_ptr = list_ptr
+        self.meta = meta or {}
+
+    @classmethod
+    def build(cls, vectors, nlist: int = None, n_iter: int = 10, seed: int = 0, meta: dict = None) -> "IVFIndex":
+        """
+        构建索引
+        :param vectors: float32 (n, dim)，已归一化
+        :param nlist: 桶数量（默认 4*sqrt(n)）
+        :param n_iter: k-means 迭代次数
+        :param seed: 随机种子
+        :param meta: 元数据
+        :return: IVFIndex
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        n = len(vectors)
+        if nlist is None:
+            nlist = max(1, int(4 * np.sqrt(n)))
+        nlist = max(1, min(nlist, n))
+
+        rng = np.random.default_rng(seed)
+        centroids = vectors[rng.choice(n, nlist, replace=False)].copy() if n else \
+            np.zeros((1, vectors.shape[1]), dtype=np.float32)
+        for _ in range(n_iter if n else 0):
+            assign = cls._assign(vectors, centroids)
+            # 按桶排序后分段求和（比逐行 add.at 快一个数量级）
+            order = np.argsort(assign, kind="stable")
+            counts = np.bincount(assign, minlength=len(centroids))
+            occupied = np.flatnonzero(counts)
+            starts = np.concatenate(([0], np.cumsum(counts)[:-1]))[occupied]
+            sums = np.add.reduceat(vectors[order], starts, axis=0)
+            # 空桶保留原质心
+            centroids[occupied] = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+        assign = cls._assign(vectors, centroids) if n else np.zeros(0, dtype=np.int64)
+
+        order = np.argsort(assign, kind="stable")
+        list_ptr = np.zeros(len(centroids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assign, minlength=len(centroids)), out=list_ptr[1:])
+        return cls(centroids.astype(np.float32), vectors[order], order.astype(np.int64), list_ptr, meta)
+
+    @staticmethod
+    def _assign(vectors, centroids, chunk: int = 8192):
+        assign = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), chunk):
+            assign[start:start + chunk] = np.argmax(vectors[start:start + chunk] @ centroids.T, axis=1)
+        return assign
+
+    def search(self, queries, top_k: int = 10, nprobe: int = ANN_NPROBE, allowed=None):
+        """
+        批量查询
+        :param queries: float32 (q, dim)，已归一化
+        :param top_k: 每个查询返回数量
+        :param nprobe: 探测桶数量（越大召回越高、越慢）
+        :param allowed: 按 id 索引的布尔数组，只返回其中为真的向量（None 表示全部）
+        :return: (ids, scores)，均为 (q, top_k)，不足 top_k 时 ids 以 -1 填充
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        nprobe = min(nprobe, len(self.centroids))
+        probes = np.argsort(-(queries @ self.centroids.T), axis=1)[:, :nprobe]
+
+        out_ids = np.full((len(queries), top_k), -1, dtype=np.int64)
+        out_scores = np.full((len(queries), top_k), -np.inf, dtype=np.float32)
+        for qi, query in enumerate(queries):
+            ranges = [np.arange(self.list_ptr[c], self.list_ptr[c + 1]) for c in probes[qi]]
+            candidates = np.concatenate(ranges) if ranges else np.empty(0, dtype=np.int64)
+            if allowed is not None:
+                candidates = candidates[allowed[self.ids[candidates]]]
+            if len(candidates) == 0:
+                continue
+            scores = self.vectors[candidates] @ query
+            k = min(top_k, len(candidates))
+            best = np.argpartition(-scores, k - 1)[:k]
+            best = best[np.argsort(-scores[best], kind="stable")]
+            out_ids[qi, :k] = self.ids[candidates[best]]
+            out_scores[qi, :k] = scores[best]
+        return out_ids, out_scores
+
+    def save(self, path: str):
+        """保存到目录（先写临时目录再改名；目录名含版本哈希，已存在说明其他进程已构建同一版本）"""
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        os.makedirs(tmp_path, exist_ok=True)
+        for name in _ARRAYS:
+            np.save(os.path.join(tmp_path, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(tmp_path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(self.meta, f, ensure_ascii=False)
+        try:
+            os.rename(tmp_path, path)
+            logger.info(f"向量索引已保存：{len(self.ids)}条向量，{len(self.centroids)}个桶 -> {path}")
+        except OSError:
+            for name in os.listdir(tmp_path):
+                os.remove(os.path.join(tmp_path, name))
+            os.rmdir(tmp_path)
+
+    @classmethod
+    def load(cls, path: str) -> "IVFIndex":
+        """从目录加载（mmap 只读）"""
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in _ARRAYS}
+        with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        return cls(meta=meta, **arrays)
+
+
+def exact_search(vectors, queries, top_k: int = 10):
+    """暴力内积检索（基准测试中作为召回率参照）"""
+    scores = np.atleast_2d(queries) @ np.asarray(vectors).T
+    k = min(top_k, scores.shape[1])
+    best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, best, axis=1), axis=1, kind="stable")
+    ids = np.take_along_axis(best, order, axis=1)
+    return ids, np.take_along_axis(scores, ids, axis=1)
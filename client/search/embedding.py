@@ -0,0 +1,136 @@
+"""
+本地文本向量化（纯 CPU，批量）
+
+默认使用特征哈希向量：分词词项 + 领域同义词扩展（如"后端"扩展为 java/go/服务端），
+经带符号哈希投影到固定维度并 L2 归一化，无需下载模型、结果跨进程稳定。
+若安装了 sentence-transformers 且配置了 EMBEDDING_MODEL，则改用该模型（CPU 推理）。
+"""
+import hashlib
+import math
+
+import numpy as np
+
+from config.settings import EMBEDDING_DIM, EMBEDDING_MODEL
+from core.logger import logger
+from search.tokenizer import tokenize
+
+# 领域同义词：岗位/政策常见的口语说法 -> 规范词项（双向扩展）
+SYNONYMS = {
+    "后端": ["java", "go", "python", "服务端", "后台", "spring"],
+    "前端": ["javascript", "typescript", "vue", "react", "web", "h5"],
+    "全栈": ["前端", "后端"],
+    "算法": ["机器学习", "深度学习", "pytorch", "tensorflow", "模型"],
+    "数据": ["数据分析", "sql", "hadoop", "spark", "bi"],
+    "测试": ["qa", "自动化测试", "质量"],
+    "运维": ["linux", "docker", "kubernetes", "devops"],
+    "嵌入式": ["c++", "单片机", "硬件"],
+    "产品": ["产品经理", "需求", "原型"],
+    "租房": ["住房", "人才公寓", "租赁", "青年人才之家"],
+    "落户": ["户口", "户籍", "迁户"],
+    "补贴": ["补助", "奖励", "资助"],
+    "创业": ["创业担保贷款", "初创企业", "孵化"]
+}
+
+# 同义词扩展特征的权重（相对原始词项）
+SYNONYM_WEIGHT = 0.5
+
+
+def _build_expansions() -> dict:
+    expansions = {}
+    for head, words in SYNONYMS.items():
+        expansions.setdefault(head, set()).update(words)
+        for word in words:
+            expansions.setdefault(word, set()).add(head)
+    return {phrase: sorted(words) for phrase, words in expansions.items()}
+
+
+_EXPANSIONS = _build_expansions()
+
+
+def _expand(text: str, tokens: set) -> list:
+    """文本命中的同义词扩展：英文词按整词匹配，中文词按子串匹配"""
+    expanded = []
+    for phrase, words in _EXPANSIONS.items():
+        hit = phrase in tokens if phrase.isascii() else phrase in text
+        if hit:
+            expanded.extend(words)
+    return expanded
+
+
+def _hash_feature(feature: str, dim: int):
+    """稳定哈希（不受 PYTHONHASHSEED 影响）：返回 (下标, 符号)"""
+    value = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+    return value % dim, 1.0 if (value >> 63) & 1 else -1.0
+
+
+class HashingEmbedder:
+    """特征哈希向量化器"""
+
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        self.name = f"hashing-{dim}"
+        self.dim = dim
+        self._cache = {}
+
+    def _slot(self, feature: str):
+        slot = self._cache.get(feature)
+        if slot is None:
+            slot = self._cache[feature] = _hash_feature(feature, self.dim)
+        return slot
+
+    def _features(self, text: str) -> dict:
+        weights = {}
+        text = (text or "").lower()
+        tokens = tokenize(text)
+        for token in tokens:
+            weights[token] = weights.get(token, 0.0) + 1.0
+        for word in _expand(text, set(tokens)):
+            for term in tokenize(word):
+                weights[term] = weights.get(term, 0.0) + SYNONYM_WEIGHT
+        return weights
+
+    def embed(self, texts: list, batch_size: int = 256):
+        """
+        批量向量化
+        :param texts: 文本列表
+        :param batch_size: 批大小（控制临时数组内存）
+        :return: float32 数组 (len(texts), dim)，行已 L2 归一化
+        """
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for batch_start in range(0, len(texts), batch_size):
+            rows, cols, values = [], [], []
+            for offset, text in enumerate(texts[batch_start:batch_start + batch_size]):
+                for feature, weight in self._features(text).items():
+                    col, sign = self._slot(feature)
+                    rows.append(batch_start + offset)
+                    cols.append(col)
+                    values.append(sign * (1.0 + math.log(weight)) if weight >= 1 else sign * weight)
+            np.add.at(out, (np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64)),
+                      np.asarray(values, dtype=np.float32))
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        return out / np.maximum(norms, 1e-12)
+
+
+class SentenceTransformerEmbedder:
+    """sentence-transformers 模型向量化器（可选依赖，CPU 推理）"""
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+
+        self.name = f"st:{model_name}"
+        self._model = SentenceTransformer(model_name, device="cpu")
+        self.dim = self._model.get_sentence_embedding_dimension()
+
+    def embed(self, texts: list, batch_size: int = 64):
+        vectors = self._model.encode(texts, batch_size=batch_size, normalize_embeddings=True,
+                                     show_progress_bar=False)
+        return np.asarray(vectors, dtype=np.float32)
+
+
+def get_embedder():
+    """按配置创建向量化器：配置了 EMBEDDING_MODEL 且依赖可用时使用模型，否则使用特征哈希"""
+    if EMBEDDING_MODEL:
+        try:
+            return SentenceTransformerEmbedder(EMBEDDING_MODEL)
+        except ImportError:
+            logger.warning("未安装 sentence-transformers，使用特征哈希向量")
+    return HashingEmbedder()
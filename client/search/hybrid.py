@@ -0,0 +1,128 @@
+"""
+混合检索：BM25 词法检索 + 向量语义检索，倒数排名融合（RRF）
+
+词法检索解决精确关键词（岗位名、公司名、政策编号），语义检索补充同义表达
+（如"后端"召回"Java开发工程师"），两路各取候选后按排名融合，不依赖两路分值的量纲。
+两路索引共用文档编号：向量索引由词法索引快照中的文档构建，并按相同源数据哈希持久化。
+按来源过滤时两路在召回阶段就只考虑该来源的文档，候选数量不会被其他来源占用。
+"""
+import os
+import time
+
+import numpy as np
+
+from config.settings import KNOWLEDGE_INDEX_DIR, KNOWLEDGE_INDEX_CHECK_INTERVAL, ANN_NPROBE
+from core.logger import logger
+from search.ann import IVFIndex
+from search.embedding import get_embedder
+from search.index import open_knowledge_index, refresh_knowledge_index
+
+# RRF 平滑常数（经验值）
+RRF_K = 60
+
+
+class HybridSearcher:
+    """
+    混合检索器
+    :param lexical: 词法索引（KnowledgeIndex），默认打开 knowledge_docs 快照
+    :param embedder: 向量化器，默认按配置创建
+    :param index_dir: 向量索引存放目录
+    """
+
+    def __init__(self, lexical=None, embedder=None, index_dir: str = KNOWLEDGE_INDEX_DIR):
+        self.lexical = lexical or open_knowledge_index()
+        self.embedder = embedder or get_embedder()
+        self.semantic = self._open_semantic(index_dir)
+        self._sources = None
+        self._source_masks = {}
+
+    def _open_semantic(self, index_dir: str) -> IVFIndex:
+        """打开与词法快照同版本的向量索引，不存在时构建"""
+        name = os.path.splitext(os.path.basename(self.lexical.path))[0]
+        path = os.path.join(index_dir, f"{name}-{self.embedder.name.replace('/', '_')}.ann")
+        if os.path.isdir(path):
+            index = IVFIndex.load(path)
+            if index.meta.get("source_hash") == self.lexical.source_hash:
+                return index
+
+        texts = []
+        for doc_no in range(self.lexical.n_docs):
+            doc = self.lexical.doc(doc_no)
+            texts.append(f"{doc.get('title', '')}\n{doc.get('content', '')}")
+        vectors = self.embedder.embed(texts)
+        index = IVFIndex.build(vectors, meta={
+            "source_hash": self.lexical.source_hash,
+            "embedder": self.embedder.name
+        })
+        os.makedirs(index_dir, exist_ok=True)
+        index.save(path)
+        return index
+
+    def _source_mask(self, source: str):
+        """来源文件 -> 按文档号索引的布尔数组（首次按来源过滤时读取全部文档的来源字段）"""
+        mask = self._source_masks.get(source)
+        if mask is None:
+            if self._sources is None:
+                sources = [self.lexical.doc(doc_no).get("source") for doc_no in range(self.lexical.n_docs)]
+                self._sources = np.array(sources, dtype=object)
+            mask = self._source_masks[source] = self._sources == source
+        return mask
+
+    def search(self, query: str, top_k: int = 5, source: str = None,
+               candidates: int = 50, semantic_weight: float = 1.0, nprobe: int = ANN_NPROBE) -> list:
+        """
+        混合检索
+        :param query: 查询文本
+        :param top_k: 返回结果数量
+        :param source: 仅返回指定来源文件的文档（如 jobs.csv / policies.md）
+        :param candidates: 每路召回候选数量
+        :param semantic_weight: 语义检索在融合中的权重（词法固定为 1.0）
+        :param nprobe: 向量索引探测桶数量
+        :return: [{id, source, title, content, meta, score, lexical_rank, semantic_rank}]
+        """
+        allowed = self._source_mask(source) if source else None
+        lexical_hits = self.lexical.rank(query, top_k=candidates, allowed=allowed)
+        ids, scores = self.semantic.search(self.embedder.embed([query]), top_k=candidates, nprobe=nprobe,
+                                           allowed=allowed)
+        semantic_hits = [(int(i), float(s)) for i, s in zip(ids[0], scores[0]) if i >= 0 and s > 0]
+
+        fused = {}
+        for weight, hits, key in ((1.0, lexical_hits, "lexical_rank"),
+                                  (semantic_weight, semantic_hits, "semantic_rank")):
+            for rank, (doc_no, _) in enumerate(hits, start=1):
+                entry = fused.setdefault(doc_no, {"score": 0.0, "lexical_rank": None, "semantic_rank": None})
+                entry["score"] += weight / (RRF_K + rank)
+                entry[key] = rank
+
+        results = []
+        for doc_no, entry in sorted(fused.items(), key=lambda item: item[1]["score"], reverse=True):
+            doc = self.lexical.doc(doc_no)
+            doc.update(entry, score=round(entry["score"], 6))
+            results.append(doc)
+            if len(results) >= top_k:
+                break
+        return results
+
+
+_default_searcher = None
+_checked = 0.0
+
+
+def hybrid_search(query: str, top_k: int = 5, source: str = None) -> list:
+    """
+    知识库混合检索（供智能体工具调用，进程内复用同一检索器；文档更新后按新快照重建）
+    :param query: 查询文本
+    :param top_k: 返回结果数量
+    :param source: 仅返回指定来源文件的文档（jobs.csv 为岗位，policies.md 为政策）
+    :return: 检索结果列表
+    """
+    global _default_searcher, _checked
+    if _default_searcher is None or time.monotonic() - _checked >= KNOWLEDGE_INDEX_CHECK_INTERVAL:
+        current = _default_searcher
+        lexical = refresh_knowledge_index(current.lexical if current else None)
+        if current is None or lexical is not current.lexical:
+            _default_searcher = HybridSearcher(lexical=lexical, embedder=current.embedder if current else None)
+            logger.info(f"混合检索器已就绪：{_default_searcher.lexical.n_docs}篇文档，"
+                        f"向量化器{_default_searcher.embedder.name}")
+        _checked = time.monotonic()
+    return _default_searcher.search(query, top_k=top_k, source=source)
@@ -0,0 +1,401 @@
+"""
+知识库本地检索索引：磁盘快照 + mmap 零拷贝读取
+
+进程启动时不再重建索引：首次构建后写入快照文件，之后直接 mmap 打开。
+快照按源数据哈希（knowledge_docs/* 或 B端数据）命名，源数据变化时自动重建；
+只读 mmap 由操作系统页缓存共享，多个 worker 进程打开同一快照不会重复占用内存。
+长期运行的进程用 refresh_knowledge_index() 定期比对源数据哈希，文档更新后切换到新快照。
+
+快照文件布局（全部为本机字节序，头部记录字节序，不一致时重建）：
+    header        魔数、版本、字节序、源数据哈希、文档数、词项数、平均文档长度、各段偏移
+    term_blob     按字节序排序后拼接的 UTF-8 词项
+    term_offsets  uint32[n_terms + 1]，词项在 term_blob 中的起止位置
+    post_offsets  uint32[n_terms + 1]，词项倒排表在 post_docs/post_tfs 中的起止位置
+    post_docs     uint32[n_postings]，文档号
+    post_tfs      uint32[n_postings]，词频
+    doc_lens      uint32[n_docs]，文档长度（词项数）
+    doc_offsets   uint64[n_docs + 1]，文档 JSON 在 doc_blob 中的起止位置
+    doc_blob      拼接的文档 JSON（UTF-8）
+"""
+import csv
+import hashlib
+import json
+import math
+import mmap
+import os
+import shutil
+import struct
+import sys
+from array import array
+from collections import Counter, defaultdict
+
+from config.settings import KNOWLEDGE_DOCS_DIR, KNOWLEDGE_INDEX_DIR
+from core.logger import logger
+from search.tokenizer import tokenize
+
+MAGIC = b"WHIX"
+# 快照格式版本（分词规则变化时同样递增，旧快照按新规则重建）
+FORMAT_VERSION = 2
+_BYTEORDER = 0 if sys.byteorder == "little" else 1
+
+# 魔数, 版本, 字节序, 源哈希, 文档数, 词项数, 平均文档长度, 9 个段偏移
+_HEADER = struct.Struct("<4sIB32sIId9Q")
+
+# BM25 参数
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+class IndexFormatError(Exception):
+    """快照文件损坏或版本不兼容"""
+    pass
+
+
+# ===================== 源数据 =====================
+
+def hash_source_files(doc_dir: str = KNOWLEDGE_DOCS_DIR) -> str:
+    """
+    计算知识库文档目录的内容哈希（文件名 + 内容）
+    :param doc_dir: 文档目录
+    :return: sha256 十六进制字符串
+    """
+    digest = hashlib.sha256()
+    for filename in sorted(os.listdir(doc_dir)):
+        filepath = os.path.join(doc_dir, filename)
+        if not os.path.isfile(filepath):
+            continue
+        digest.update(filename.encode("utf-8") + b"\0")
+        with open(filepath, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 16), b""):
+                digest.update(chunk)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def hash_docs(docs: list) -> str:
+    """计算文档列表的内容哈希（用于 B端数据等内存数据源）"""
+    payload = json.dumps(docs, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _load_jobs_csv(filepath: str) -> list:
+    """岗位 CSV：每行一个文档"""
+    docs = []
+    with open(filepath, "r", encoding="utf-8-sig", newline="") as f:
+        for i, row in enumerate(csv.DictReader(f)):
+            title = row.get("title", "")
+            text = " ".join(v for v in row.values() if v)
+            docs.append({
+                "id": f"job-{i}",
+                "source": os.path.basename(filepath),
+                "title": title,
+                "content": text,
+                "meta": row
+            })
+    return docs
+
+
+def _load_markdown(filepath: str) -> list:
+    """Markdown：按二/三级标题切分为段落文档"""
+    docs = []
+    name = os.path.basename(filepath)
+    title, lines = None, []
+
+    def flush():
+        content = "\n".join(lines).strip()
+        if title and content:
+            docs.append({
+                "id": f"{os.path.splitext(name)[0]}-{len(docs)}",
+                "source": name,
+                "title": title,
+                "content": content,
+                "meta": {}
+            })
+
+    with open(filepath, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if line.startswith("## ") or line.startswith("### "):
+                flush()
+                title, lines = line.lstrip("#").strip(), []
+            else:
+                lines.append(line)
+    flush()
+    return docs
+
+
+def load_knowledge_docs(doc_dir: str = KNOWLEDGE_DOCS_DIR) -> list:
+    """
+    读取知识库文档目录（jobs.csv / *.md / *.txt）为检索文档列表
+    :param doc_dir: 文档目录
+    :return: 文档列表 [{id, source, title, content, meta}]
+    """
+    docs = []
+    for filename in sorted(os.listdir(doc_dir)):
+        filepath = os.path.join(doc_dir, filename)
+        if not os.path.isfile(filepath):
+            continue
+        if filename.endswith(".csv"):
+            docs.extend(_load_jobs_csv(filepath))
+        elif filename.endswith((".md", ".txt")):
+            docs.extend(_load_markdown(filepath))
+        else:
+            logger.warning(f"知识库文档格式不支持，跳过：{filename}")
+    return docs
+
+
+# ===================== 构建 =====================
+
+def write_index(docs: list, path: str, source_hash: str):
+    """
+    构建索引并写入快照文件（先写临时文件再原子替换，多进程并发构建安全）
+    :param docs: 文档列表
+    :param path: 快照文件路径
+    :param source_hash: 源数据哈希（sha256 十六进制）
+    """
+    postings = defaultdict(list)
+    doc_lens = array("I")
+    doc_offsets = array("Q", [0])
+    doc_blob = bytearray()
+
+    for doc_no, doc in enumerate(docs):
+        terms = tokenize(f"{doc.get('title', '')} {doc.get('content', '')}")
+        doc_lens.append(len(terms))
+        for term, tf in Counter(terms).items():
+            postings[term].append((doc_no, tf))
+        doc_blob += json.dumps(doc, ensure_ascii=False).encode("utf-8")
+        doc_offsets.append(len(doc_blob))
+
+    encoded_terms = sorted(t.encode("utf-8") for t in postings)
+    term_blob = bytearray()
+    term_offsets = array("I", [0])
+    post_offsets = array("I", [0])
+    post_docs = array("I")
+    post_tfs = array("I")
+    for term in encoded_terms:
+        term_blob += term
+        term_offsets.append(len(term_blob))
+        for doc_no, tf in postings[term.decode("utf-8")]:
+            post_docs.append(doc_no)
+            post_tfs.append(tf)
+        post_offsets.append(len(post_docs))
+
+    sections = [term_blob, term_offsets, post_offsets, post_docs, post_tfs,
+                doc_lens, doc_offsets, doc_blob]
+    offsets = []
+    pos = _HEADER.size
+    for section in sections:
+        pos += -pos % 8  # 8 字节对齐，保证 memoryview.cast 可用
+        offsets.append(pos)
+        pos += len(memoryview(section).cast("B"))
+    offsets.append(pos)
+
+    avg_len = (sum(doc_lens) / len(doc_lens)) if doc_lens else 0.0
+    header = _HEADER.pack(
+        MAGIC, FORMAT_VERSION, _BYTEORDER, bytes.fromhex(source_hash),
+        len(docs), len(encoded_terms), avg_len, *offsets
+    )
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        for offset, section in zip(offsets, sections):
+            f.write(b"\0" * (offset - f.tell()))
+            f.write(memoryview(section).cast("B"))
+    os.replace(tmp_path, path)
+    logger.info(f"知识库索引已构建：{len(docs)}篇文档，{len(encoded_terms)}个词项 -> {path}")
+
+
+# ===================== 读取 =====================
+
+class KnowledgeIndex:
+    """mmap 打开的只读索引快照，所有数组均为 mmap 上的零拷贝视图"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buf = memoryview(self._mmap)
+
+        if len(buf) < _HEADER.size:
+            raise IndexFormatError(f"索引文件过短：{path}")
+        (magic, version, byteorder, source_hash, self.n_docs, self.n_terms,
+         self.avg_doc_len, *offsets) = _HEADER.unpack_from(buf)
+        if magic != MAGIC or version != FORMAT_VERSION or byteorder != _BYTEORDER:
+            raise IndexFormatError(f"索引文件版本不兼容：{path}")
+        if offsets[-1] != len(buf):
+            raise IndexFormatError(f"索引文件长度不匹配：{path}")
+
+        self.source_hash = source_hash.hex()
+        # 段尾可能含对齐填充，数组按元素个数截取，blob 按偏移表寻址
+        sections = [buf[offsets[i]:offsets[i + 1]] for i in range(8)]
+        self._term_blob = sections[0]
+        self._term_offsets = self._cast(sections[1], "I", self.n_terms + 1)
+        self._post_offsets = self._cast(sections[2], "I", self.n_terms + 1)
+        n_postings = self._post_offsets[-1] if self.n_terms else 0
+        self._post_docs = self._cast(sections[3], "I", n_postings)
+        self._post_tfs = self._cast(sections[4], "I", n_postings)
+        self._doc_lens = self._cast(sections[5], "I", self.n_docs)
+        self._doc_offsets = self._cast(sections[6], "Q", self.n_docs + 1)
+        self._doc_blob = sections[7]
+
+    @staticmethod
+    def _cast(view: memoryview, fmt: str, count: int) -> memoryview:
+        size = struct.calcsize(fmt)
+        return view[:count * size].cast(fmt)
+
+    def _term_at(self, i: int) -> bytes:
+        return bytes(self._term_blob[self._term_offsets[i]:self._term_offsets[i + 1]])
+
+    def _find_term(self, term: str) -> int:
+        """词典二分查找，返回词项序号，不存在返回 -1"""
+        key = term.encode("utf-8")
+        lo, hi = 0, self.n_terms
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._term_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.n_terms and self._term_at(lo) == key:
+            return lo
+        return -1
+
+    def postings(self, term: str):
+        """
+        获取词项倒排表
+        :return: (文档号视图, 词频视图)，词项不存在时返回空元组
+        """
+        i = self._find_term(term)
+        if i < 0:
+            return (), ()
+        start, end = self._post_offsets[i], self._post_offsets[i + 1]
+        return self._post_docs[start:end], self._post_tfs[start:end]
+
+    def doc(self, doc_no: int) -> dict:
+        """读取文档原文"""
+        start, end = self._doc_offsets[doc_no], self._doc_offsets[doc_no + 1]
+        return json.loads(bytes(self._doc_blob[start:end]).decode("utf-8"))
+
+    def rank(self, query: str, top_k: int = 5, allowed=None) -> list:
+        """
+        BM25 打分排序
+        :param query: 查询文本
+        :param top_k: 返回结果数量
+        :param allowed: 按文档号索引的布尔序列，只对其中为真的文档打分（None 表示全部）
+        :return: [(文档号, 得分)]，按得分降序
+        """
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            docs, tfs = self.postings(term)
+            if not docs:
+                continue
+            idf = math.log(1 + (self.n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            for doc_no, tf in zip(docs, tfs):
+                if allowed is not None and not allowed[doc_no]:
+                    continue
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self._doc_lens[doc_no] / (self.avg_doc_len or 1))
+                scores[doc_no] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+
+    def search(self, query: str, top_k: int = 5) -> list:
+        """
+        BM25 检索
+        :param query: 查询文本
+        :param top_k: 返回结果数量
+        :return: [{id, source, title, content, meta, score}]，按得分降序
+        """
+        results = []
+        for doc_no, score in self.rank(query, top_k):
+            doc = self.doc(doc_no)
+            doc["score"] = round(score, 4)
+            results.append(doc)
+        return results
+
+    def close(self):
+        """释放 mmap（需先释放所有视图）"""
+        for name in ("_term_blob", "_term_offsets", "_post_offsets", "_post_docs",
+                     "_post_tfs", "_doc_lens", "_doc_offsets", "_doc_blob"):
+            getattr(self, name).release()
+        self._mmap.close()
+
+
+def _snapshot_path(index_dir: str, name: str, source_hash: str) -> str:
+    return os.path.join(index_dir, f"{name}-v{FORMAT_VERSION}-{source_hash[:16]}.idx")
+
+
+def _prune_snapshots(path: str):
+    """
+    删除同名的旧版本快照及其向量索引目录（<快照名>-<向量化器>.ann，search.hybrid 构建）
+    其他进程仍在使用时删除失败，忽略即可
+    """
+    index_dir, filename = os.path.split(path)
+    prefix = filename.split("-v", 1)[0] + "-v"
+    current = os.path.splitext(filename)[0] + "-"
+    for name in os.listdir(index_dir):
+        if not name.startswith(prefix) or name == filename:
+            continue
+        target = os.path.join(index_dir, name)
+        try:
+            if name.endswith(".idx"):
+                os.remove(target)
+            elif name.endswith(".ann") and not name.startswith(current):
+                shutil.rmtree(target)
+        except OSError:
+            pass
+
+
+def _open_or_build(path: str, source_hash: str, load_docs) -> KnowledgeIndex:
+    if os.path.exists(path):
+        try:
+            index = KnowledgeIndex(path)
+            if index.source_hash == source_hash:
+                return index
+            index.close()
+        except (IndexFormatError, ValueError) as e:
+            logger.warning(f"索引快照不可用，重新构建：{e}")
+    write_index(load_docs(), path, source_hash)
+    _prune_snapshots(path)
+    return KnowledgeIndex(path)
+
+
+def open_knowledge_index(doc_dir: str = KNOWLEDGE_DOCS_DIR, index_dir: str = KNOWLEDGE_INDEX_DIR) -> KnowledgeIndex:
+    """
+    打开知识库文档目录对应的索引快照（不存在或源数据变化时自动构建）
+    :param doc_dir: 知识库文档目录
+    :param index_dir: 快照存放目录
+    :return: KnowledgeIndex
+    """
+    source_hash = hash_source_files(doc_dir)
+    path = _snapshot_path(index_dir, "knowledge", source_hash)
+    return _open_or_build(path, source_hash, lambda: load_knowledge_docs(doc_dir))
+
+
+def refresh_knowledge_index(index: KnowledgeIndex = None, doc_dir: str = KNOWLEDGE_DOCS_DIR,
+                            index_dir: str = KNOWLEDGE_INDEX_DIR) -> KnowledgeIndex:
+    """
+    源数据哈希与已打开的快照不一致（或尚未打开）时打开新快照，否则返回原索引
+    旧索引不主动关闭：其他线程可能仍在读取，引用释放后 mmap 随之关闭
+    :param index: 当前使用的索引
+    :return: 与文档目录当前内容一致的 KnowledgeIndex
+    """
+    if index is not None and index.source_hash == hash_source_files(doc_dir):
+        return index
+    if index is not None:
+        logger.info("知识库文档已更新，切换到新的索引快照")
+    return open_knowledge_index(doc_dir, index_dir)
+
+
+def open_docs_index(docs: list, name: str = "b_api", index_dir: str = KNOWLEDGE_INDEX_DIR) -> KnowledgeIndex:
+    """
+    打开内存文档列表（如 B端岗位/政策数据）对应的索引快照
+    :param docs: 文档列表 [{id, title, content, ...}]
+    :param name: 快照名称前缀
+    :param index_dir: 快照存放目录
+    :return: KnowledgeIndex
+    """
+    source_hash = hash_docs(docs)
+    path = _snapshot_path(index_dir, name, source_hash)
+    return _open_or_build(path, source_hash, lambda: docs)
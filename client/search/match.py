@@ -0,0 +1,236 @@
+"""
+简历-岗位匹配打分引擎：稀疏技能/词项向量 + NumPy 批量打分
+
+岗位与简历统一转为 TF-IDF 稀疏向量（分词词项 + 技能特征），余弦相似度即匹配分：
+- 一份简历 vs 全部岗位：按词项列存（CSC）倒排，bincount 一次聚合所有岗位得分
+- 多份简历 vs 一个岗位：简历按行存（CSR），与岗位稠密向量逐元素相乘后按行聚合
+返回 top-k 结果及命中/缺失技能，分值范围 0-100，与 Application.matchScore 一致
+
+岗位数据兼容 B端 /api/open/jobs 返回结构（skills[] + requirements）和 jobs.csv 行
+（requirements 为分号分隔字符串）；简历兼容 get_resume_from_cloud 返回结构
+（resumeText + skills[] / structuredData.skills）
+"""
+import csv
+import re
+
+import numpy as np
+
+from search.tokenizer import tokenize
+
+# 技能特征相对普通词项的权重
+SKILL_WEIGHT = 2.0
+
+_SKILL_PREFIX = "skill:"
+_REQUIREMENT_SPLIT_RE = re.compile(r"[;；\n]")
+_ASCII_SKILL_RE = re.compile(r"[a-z][a-z0-9+#.]*")
+
+
+def _normalize_skill(skill: str) -> str:
+    return skill.strip().lower().rstrip(".")
+
+
+def _requirement_items(requirements) -> list:
+    """requirements 兼容字符串（分号/换行分隔）和数组"""
+    if not requirements:
+        return []
+    if isinstance(requirements, str):
+        requirements = _REQUIREMENT_SPLIT_RE.split(requirements)
+    return [item.strip() for item in requirements if item and item.strip()]
+
+
+def job_skills(job: dict) -> list:
+    """
+    提取岗位技能关键词：显式 skills[] + requirements 中的英文技术词
+    :return: 去重后的技能列表（保持出现顺序）
+    """
+    skills = [_normalize_skill(s) for s in job.get("skills") or [] if s and s.strip()]
+    for item in _requirement_items(job.get("requirements")):
+        skills.extend(_ASCII_SKILL_RE.findall(item.lower()))
+    return list(dict.fromkeys(s for s in skills if s))
+
+
+def resume_skills(resume: dict) -> set:
+    """提取简历技能集合：显式 skills + 简历正文中的英文技术词"""
+    structured = resume.get("structuredData") or {}
+    explicit = resume.get("skills") or structured.get("skills") or []
+    skills = {_normalize_skill(s) for s in explicit if s and s.strip()}
+    skills.update(_ASCII_SKILL_RE.findall(_resume_text(resume).lower()))
+    return skills
+
+
+def _job_text(job: dict) -> str:
+    parts = [job.get("title") or "", job.get("description") or ""]
+    parts.extend(_requirement_items(job.get("requirements")))
+    parts.extend(job.get("skills") or [])
+    return " ".join(parts)
+
+
+def _resume_text(resume: dict) -> str:
+    text = resume.get("resumeText") or ""
+    structured = resume.get("structuredData") or {}
+    skills = resume.get("skills") or structured.get("skills") or []
+    return f"{text} {' '.join(skills)}"
+
+
+def _features(tokens: list, skills) -> dict:
+    """词项频次 + 技能特征，返回 {特征: 原始权重}"""
+    counts = {}
+    for token in tokens:
+        counts[token] = counts.get(token, 0) + 1
+    for skill in skills:
+        counts[_SKILL_PREFIX + skill] = counts.get(_SKILL_PREFIX + skill, 0) + SKILL_WEIGHT
+    return counts
+
+
+class MatchEngine:
+    """
+    岗位库匹配引擎（构建后只读，可在线程间共享）
+    :param jobs: 岗位列表（B端岗位 dict 或 jobs.csv 行 dict）
+    """
+
+    def __init__(self, jobs: list):
+        self.jobs = jobs
+        self._job_skills = [job_skills(job) for job in jobs]
+
+        vocab = {}
+        rows, cols, counts = [], [], []
+        for row, (job, skills) in enumerate(zip(jobs, self._job_skills)):
+            for feature, count in _features(tokenize(_job_text(job)), skills).items():
+                col = vocab.setdefault(feature, len(vocab))
+                rows.append(row)
+                cols.append(col)
+                counts.append(count)
+
+        self.vocab = vocab
+        n_jobs, n_terms = len(jobs), len(vocab)
+        rows = np.asarray(rows, dtype=np.int32)
+        cols = np.asarray(cols, dtype=np.int32)
+        counts = np.asarray(counts, dtype=np.float32)
+
+        # 平滑 IDF + 次线性 TF，按行 L2 归一化
+        df = np.bincount(cols, minlength=n_terms).astype(np.float32)
+        self.idf = np.log((1.0 + n_jobs) / (1.0 + df)) + 1.0
+        values = (1.0 + np.log(counts)) * self.idf[cols]
+        norms = np.sqrt(np.bincount(rows, weights=values * values, minlength=n_jobs))
+        values = (values / np.maximum(norms, 1e-12)[rows]).astype(np.float32)
+
+        # 行存（CSR）：岗位 -> 特征，用于多简历 vs 单岗位
+        self._row_ptr = np.zeros(n_jobs + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n_jobs), out=self._row_ptr[1:])
+        self._row_cols = cols
+        self._row_vals = values
+
+        # 列存（CSC）：特征 -> 岗位，用于单简历 vs 全部岗位
+        order = np.argsort(cols, kind="stable")
+        self._col_ptr = np.zeros(n_terms + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cols, minlength=n_terms), out=self._col_ptr[1:])
+        self._col_rows = rows[order]
+        self._col_vals = values[order]
+
+    @classmethod
+    def from_jobs_csv(cls, csv_path: str) -> "MatchEngine":
+        """从 jobs.csv（知识库岗位数据）构建"""
+        with open(csv_path, "r", encoding="utf-8-sig", newline="") as f:
+            return cls(list(csv.DictReader(f)))
+
+    def _resume_vector(self, resume: dict):
+        """简历 -> (特征下标数组, 归一化权重数组)，岗位库词表外的特征丢弃"""
+        features = _features(tokenize(_resume_text(resume)), resume_skills(resume))
+        cols, counts = [], []
+        for feature, count in features.items():
+            col = self.vocab.get(feature)
+            if col is not None:
+                cols.append(col)
+                counts.append(count)
+        cols = np.asarray(cols, dtype=np.int64)
+        values = (1.0 + np.log(np.asarray(counts, dtype=np.float32))) * self.idf[cols]
+        norm = np.sqrt(np.dot(values, values))
+        return cols, (values / norm if norm > 0 else values)
+
+    def _explain(self, job_index: int, skills: set) -> dict:
+        wanted = self._job_skills[job_index]
+        return {
+            "matched_skills": [s for s in wanted if s in skills],
+            "missing_skills": [s for s in wanted if s not in skills]
+        }
+
+    @staticmethod
+    def _top_k(scores, top_k: int):
+        top_k = min(top_k, len(scores))
+        if top_k <= 0:
+            return []
+        candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+        return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+    def score_jobs(self, resume: dict):
+        """
+        一份简历对全部岗位打分
+        :param resume: 简历 dict
+        :return: float32 数组，长度为岗位数，取值 0-1
+        """
+        cols, weights = self._resume_vector(resume)
+        if len(cols) == 0:
+            return np.zeros(len(self.jobs), dtype=np.float32)
+
+        # 拼接命中特征的倒排区间：下标 = 区间起点 + 区间内偏移
+        starts = self._col_ptr[cols]
+        lengths = self._col_ptr[cols + 1] - starts
+        total = int(lengths.sum())
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        positions = offsets + np.arange(total)
+
+        contributions = self._col_vals[positions] * np.repeat(weights, lengths)
+        return np.bincount(self._col_rows[positions], weights=contributions,
+                           minlength=len(self.jobs)).astype(np.float32)
+
+    def rank_jobs(self, resume: dict, top_k: int = 10) -> list:
+        """
+        为一份简历推荐岗位
+        :param resume: 简历 dict（get_resume_from_cloud 返回结构）
+        :param top_k: 返回数量
+        :return: [{job, score, matched_skills, missing_skills}]，按 score 降序
+        """
+        scores = self.score_jobs(resume)
+        skills = resume_skills(resume)
+        return [
+            {"job": self.jobs[i], "score": round(float(scores[i]) * 100, 2), **self._explain(i, skills)}
+            for i in self._top_k(scores, top_k)
+            if scores[i] > 0
+        ]
+
+    def score_resumes(self, resumes: list, job_index: int):
+        """
+        多份简历对一个岗位打分
+        :param resumes: 简历列表
+        :param job_index: 岗位在引擎中的下标
+        :return: float32 数组，长度为简历数，取值 0-1
+        """
+        job_vector = np.zeros(len(self.vocab), dtype=np.float32)
+        start, end = self._row_ptr[job_index], self._row_ptr[job_index + 1]
+        job_vector[self._row_cols[start:end]] = self._row_vals[start:end]
+
+        vectors = [self._resume_vector(resume) for resume in resumes]
+        lengths = np.asarray([len(cols) for cols, _ in vectors], dtype=np.int64)
+        if lengths.sum() == 0:
+            return np.zeros(len(resumes), dtype=np.float32)
+        cols = np.concatenate([cols for cols, _ in vectors])
+        weights = np.concatenate([w for _, w in vectors])
+        rows = np.repeat(np.arange(len(resumes)), lengths)
+        return np.bincount(rows, weights=weights * job_vector[cols],
+                           minlength=len(resumes)).astype(np.float32)
+
+    def rank_resumes(self, resumes: list, job_index: int, top_k: int = 10) -> list:
+        """
+        为一个岗位筛选简历
+        :param resumes: 简历列表
+        :param job_index: 岗位在引擎中的下标
+        :param top_k: 返回数量
+        :return: [{resume, score, matched_skills, missing_skills}]，按 score 降序
+        """
+        scores = self.score_resumes(resumes, job_index)
+        return [
+            {"resume": resumes[i], "score": round(float(scores[i]) * 100, 2),
+             **self._explain(job_index, resume_skills(resumes[i]))}
+            for i in self._top_k(scores, top_k)
+            if scores[i] > 0
+        ]
@@ -0,0 +1,33 @@
+"""
+分词工具：中英文混合文本切分为检索词项
+中文按相邻双字（bigram）切分，只有单个汉字的片段保留单字；英文/数字按单词切分并转小写
+
+单字（如"端"）同时出现在"前端"/"后端"等大量无关文本中，区分度低，
+与双字同时入索引会让"后端"查询按"端"字命中前端岗位，因此有双字时不再输出单字
+"""
+import re
+
+# 英文单词（含 C++ / C# / .NET / Node.js 等技术词）与连续中文片段
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*|[一-鿿]+")
+
+
+def tokenize(text: str) -> list:
+    """
+    切分文本为词项列表（保留重复，便于统计词频）
+    :param text: 原始文本
+    :return: 词项列表
+    """
+    if not text:
+        return []
+
+    tokens = []
+    for piece in _TOKEN_RE.findall(text.lower()):
+        if piece[0] < "一":
+            tokens.append(piece.rstrip("."))
+            continue
+        # 中文：相邻双字；单字片段保留单字
+        if len(piece) == 1:
+            tokens.append(piece)
+        else:
+            tokens.extend(piece[i:i + 2] for i in range(len(piece) - 1))
+    return tokens